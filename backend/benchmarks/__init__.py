@@ -0,0 +1,11 @@
+"""
+Бенчмарки бэкенда. Не входят в приложение и запускаются вручную из директории backend:
+
+    python -m benchmarks.retrieval --help
+    python -m benchmarks.chroma_modes --help
+    python -m benchmarks.render_lag --help
+    python -m benchmarks.template_selection --help
+    python -m benchmarks.auth_tokens --help
+
+Фикстуры (корпус и размеченные запросы) лежат в benchmarks/fixtures.
+"""
@@ -0,0 +1,73 @@
+"""
+Накладные расходы AuthService.read_token на запрос: полная проверка JWT (cache-size 0) и кэш проверенных токенов.
+Запросы идут от --sessions пользователей вперемешку, как опросы чата от множества открытых вкладок.
+
+Примеры запуска (из директории backend):
+
+    python -m benchmarks.auth_tokens
+    python -m benchmarks.auth_tokens --requests 200000 --sessions 5000 --cache-sizes 0 1000 10000
+"""
+
+import argparse
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Sequence
+
+from benchmarks.metrics import LatencyStats
+from src.core.users.auth_service import AuthService
+from src.core.users.types import UserInfo
+
+
+@dataclass
+class TokensReport:
+    cache_size: int
+    stats: LatencyStats
+
+    def format(self) -> str:
+        # задержки с кэшем меньше сотой миллисекунды, поэтому среднее дополнительно в микросекундах
+        return f"cache_size={self.cache_size:<6}  mean={self.stats.mean_ms * 1000:.1f}us  {self.stats.format()}"
+
+
+def issue_tokens(count: int) -> list[str]:
+    service = AuthService(cache_size=0)
+    return [service.authenticate(UserInfo(id=uuid.uuid4(), email=f"user{i}@example.com", sso_provider="google",
+                                          sso_id=str(i), first_name="", last_name="", avatar_url="")).access_token
+            for i in range(count)]
+
+
+def run(cache_size: int, tokens: list[str], requests: int, seed: int) -> TokensReport:
+    service = AuthService(cache_size=cache_size)
+    sequence = random.Random(seed).choices(tokens, k=requests)
+
+    samples = []
+    started = time.perf_counter()
+    for token in sequence:
+        call_started = time.perf_counter()
+        if service.read_token(token) is None:
+            raise RuntimeError("Token verification failed")
+        samples.append(time.perf_counter() - call_started)
+    wall_time = time.perf_counter() - started
+
+    return TokensReport(cache_size, LatencyStats.from_samples(samples, wall_time))
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="JWT verification overhead per request")
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--sessions", type=int, default=1000, help="количество разных токенов")
+    parser.add_argument("--cache-sizes", type=int, nargs="+", default=[0, 10_000], help="AUTH_TOKEN_CACHE_SIZE")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    tokens = issue_tokens(args.sessions)
+    for cache_size in args.cache_sizes:
+        print(run(cache_size, tokens, args.requests, args.seed).format())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Сравнение режимов подключения к Chroma: встроенный PersistentClient (CHROMA_MODE=embedded) и HTTP сервер.
+Замеряет пропускную способность загрузки документов батчами и задержки поиска через ChromaLawDocsRepository.
+
+Примеры запуска (из директории backend):
+
+    # только встроенный режим, база во временной директории
+    python -m benchmarks.chroma_modes --modes embedded --embedding hashing
+
+    # оба режима, Chroma из docker-compose.dev.yaml
+    python -m benchmarks.chroma_modes --modes embedded http --port 8004 --documents 5000
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Sequence
+
+import chromadb
+
+from benchmarks.local_chroma import HashingEmbeddingFunction, LocalAsyncChromaClient, WithEmbeddingFunction
+from benchmarks.metrics import LatencyStats, run_concurrent
+from benchmarks.retrieval import BENCH_COLLECTION_PREFIX, law_docs_search, load_laws_fixture
+from src.core.laws.types import LawFragment
+from src.storage.chroma.chroma_law_docs_repo import ChromaLawDocsRepository
+
+
+@dataclass
+class ModeReport:
+    mode: str
+    documents: int
+    ingest_seconds: float
+    sequential: LatencyStats
+    concurrent: LatencyStats
+    concurrency: int
+
+    @property
+    def ingest_docs_per_second(self) -> float:
+        return self.documents / self.ingest_seconds if self.ingest_seconds > 0 else 0.0
+
+    def format(self) -> str:
+        return "\n".join([
+            f"== chroma-{self.mode}",
+            f"ingest:      docs={self.documents}  time={self.ingest_seconds:.2f}s  "
+            f"throughput={self.ingest_docs_per_second:.1f} docs/s",
+            f"sequential:  {self.sequential.format()}",
+            f"concurrent ({self.concurrency}): {self.concurrent.format()}",
+        ])
+
+
+def build_corpus(fragments: Sequence[LawFragment], documents: int) -> list[LawFragment]:
+    """
+    Размножает фрагменты из фикстуры до нужного размера. Копии отличаются ID и номером в тексте,
+    чтобы Chroma не схлопывала одинаковые эмбеддинги.
+    """
+    corpus = []
+    for i in range(documents):
+        source = fragments[i % len(fragments)]
+        copy_no = i // len(fragments)
+        corpus.append(LawFragment(
+            f"{source.fragment_id}#{copy_no}",
+            source.document_id,
+            source.content if copy_no == 0 else f"{source.content} (редакция {copy_no})",
+        ))
+    return corpus
+
+
+async def ingest_async(client, collection_name: str, corpus: Sequence[LawFragment],
+                       batch_size: int, concurrency: int) -> float:
+    """
+    Загружает корпус батчами upsert в concurrency параллельных воркерах. Возвращает общее время в секундах.
+    """
+    collection = await client.get_or_create_collection(collection_name)
+    batches = [corpus[i:i + batch_size] for i in range(0, len(corpus), batch_size)]
+
+    async def _upsert(batch: Sequence[LawFragment]):
+        await collection.upsert(
+            ids=[f.fragment_id for f in batch],
+            documents=[f.content for f in batch],
+            metadatas=[{"law_doc_id": f.document_id} for f in batch],
+        )
+
+    started = time.perf_counter()
+    await run_concurrent(_upsert, batches, concurrency)
+    return time.perf_counter() - started
+
+
+async def _create_client(mode: str, args: argparse.Namespace, persist_dir: str):
+    embedding = HashingEmbeddingFunction() if args.embedding == "hashing" else None
+    if mode == "embedded":
+        return LocalAsyncChromaClient(embedding, path=persist_dir)
+
+    client = await chromadb.AsyncHttpClient(host=args.host, port=args.port)
+    return WithEmbeddingFunction(client, embedding) if embedding else client
+
+
+async def run_mode_async(mode: str, args: argparse.Namespace, persist_dir: str) -> ModeReport:
+    fragments, queries = load_laws_fixture()
+    corpus = build_corpus(fragments, args.documents)
+
+    client = await _create_client(mode, args, persist_dir)
+    collection_name = BENCH_COLLECTION_PREFIX + "modes_" + ChromaLawDocsRepository._COLLECTION_NAME
+    try:
+        await client.delete_collection(collection_name)
+    except Exception:
+        pass
+
+    try:
+        ingest_seconds = await ingest_async(client, collection_name, corpus, args.batch_size, args.concurrency)
+
+        repo = ChromaLawDocsRepository(client)
+        repo._COLLECTION_NAME = collection_name
+        await repo.init_async()
+        search = law_docs_search(repo)
+
+        texts = [q.query for q in queries]
+        sequential = await run_concurrent(search, texts, concurrency=1)
+        load = [texts[i % len(texts)] for i in range(args.requests)]
+        concurrent = await run_concurrent(search, load, concurrency=args.concurrency)
+    finally:
+        if not args.keep:
+            await client.delete_collection(collection_name)
+        if isinstance(client, LocalAsyncChromaClient):
+            client.close()
+
+    return ModeReport(mode, len(corpus), ingest_seconds, sequential, concurrent, args.concurrency)
+
+
+async def main_async(args: argparse.Namespace):
+    with tempfile.TemporaryDirectory(prefix="chroma_bench_") as tmp_dir:
+        persist_dir = args.persist_dir or tmp_dir
+        for mode in args.modes:
+            print((await run_mode_async(mode, args, persist_dir)).format())
+            print()
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Embedded vs HTTP Chroma benchmark")
+    parser.add_argument("--modes", choices=["embedded", "http"], nargs="+", default=["embedded", "http"])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8004)
+    parser.add_argument("--persist-dir", default=None,
+                        help="директория PersistentClient, по умолчанию временная")
+    parser.add_argument("--embedding", choices=["default", "hashing"], default="default",
+                        help="default - ONNX all-MiniLM-L6-v2 как в проде, hashing - без модели")
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--keep", action="store_true", help="не удалять bench_ коллекцию после прогона")
+    return parser.parse_args(argv)
+
+
+def main():
+    asyncio.run(main_async(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Локальная замена Chroma-серверу для бенчмарков.
+Использует тот же async адаптер in-process клиента, что и встроенный режим бэкенда (CHROMA_MODE=embedded).
+"""
+
+import hashlib
+import re
+
+import chromadb
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+from src.storage.chroma.embedded_client import EmbeddedAsyncChromaClient
+
+
+class HashingEmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    Детерминированный "векторайзер" на хешах слов.
+    Качество поиска с ним ниже реального, зато не нужна ONNX модель - подходит для замеров накладных расходов.
+    """
+
+    DIMENSIONS = 256
+
+    def __init__(self):
+        pass
+
+    def __call__(self, input: Documents) -> Embeddings:
+        result = []
+        for text in input:
+            vector = np.zeros(self.DIMENSIONS, dtype=np.float32)
+            for word in re.findall(r"\w+", text.lower()):
+                # грубый стемминг: русские окончания сильно размывают совпадения
+                stem = word[:6]
+                bucket = int(hashlib.md5(stem.encode()).hexdigest(), 16) % self.DIMENSIONS
+                vector[bucket] += 1
+            norm = np.linalg.norm(vector)
+            result.append(vector / norm if norm else vector)
+        return result
+
+    @staticmethod
+    def name() -> str:
+        return "benchmark-hashing"
+
+    def get_config(self) -> dict:
+        return {}
+
+    @staticmethod
+    def build_from_config(config: dict) -> "HashingEmbeddingFunction":
+        return HashingEmbeddingFunction()
+
+
+class WithEmbeddingFunction:
+    """
+    Подставляет векторайзер в get_or_create_collection любого async клиента.
+    Репозитории создают коллекции без embedding_function, а с HashingEmbeddingFunction размерности не совпадут.
+    """
+
+    def __init__(self, client, embedding_function: EmbeddingFunction):
+        self.__client = client
+        self.__embedding_function = embedding_function
+
+    async def get_or_create_collection(self, name: str, **kwargs):
+        kwargs.setdefault("embedding_function", self.__embedding_function)
+        return await self.__client.get_or_create_collection(name, **kwargs)
+
+    async def delete_collection(self, name: str):
+        await self.__client.delete_collection(name)
+
+    async def heartbeat(self) -> int:
+        return await self.__client.heartbeat()
+
+
+class LocalAsyncChromaClient(EmbeddedAsyncChromaClient):
+    """
+    Встроенный клиент из src.storage.chroma.embedded_client поверх EphemeralClient
+    или PersistentClient (если передан path).
+    """
+
+    def __init__(self, embedding_function: EmbeddingFunction | None = None, path: str | None = None):
+        super().__init__(chromadb.PersistentClient(path=path) if path else chromadb.EphemeralClient())
+        self.__embedding_function = embedding_function
+
+    async def get_or_create_collection(self, name: str, **kwargs):
+        if self.__embedding_function is not None:
+            kwargs.setdefault("embedding_function", self.__embedding_function)
+        return await super().get_or_create_collection(name, **kwargs)
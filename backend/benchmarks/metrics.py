@@ -0,0 +1,101 @@
+"""
+Общие метрики и утилиты замеров для бенчмарков.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterable, Sequence, Self
+
+
+def recall_at_k(retrieved_ids: Sequence[str], relevant_ids: Iterable[str], k: int) -> float:
+    """
+    Доля релевантных документов, попавших в первые k результатов.
+    """
+    relevant = set(relevant_ids)
+    if not relevant:
+        return 0.0
+    return len(relevant.intersection(retrieved_ids[:k])) / len(relevant)
+
+
+def reciprocal_rank(retrieved_ids: Sequence[str], relevant_ids: Iterable[str]) -> float:
+    """
+    1 / позиция первого релевантного документа. 0, если релевантных в выдаче нет.
+    """
+    relevant = set(relevant_ids)
+    for position, item_id in enumerate(retrieved_ids, start=1):
+        if item_id in relevant:
+            return 1 / position
+    return 0.0
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """
+    Перцентиль с линейной интерполяцией между соседними значениями.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+@dataclass(frozen=True)
+class LatencyStats:
+    """
+    Сводка по задержкам в миллисекундах и пропускной способности.
+    """
+    count: int
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    throughput_rps: float
+
+    @classmethod
+    def from_samples(cls, samples_s: Sequence[float], wall_time_s: float) -> Self:
+        samples_ms = [s * 1000 for s in samples_s]
+        return cls(
+            count=len(samples_ms),
+            mean_ms=sum(samples_ms) / len(samples_ms) if samples_ms else 0.0,
+            p50_ms=percentile(samples_ms, 50),
+            p95_ms=percentile(samples_ms, 95),
+            p99_ms=percentile(samples_ms, 99),
+            throughput_rps=len(samples_ms) / wall_time_s if wall_time_s > 0 else 0.0,
+        )
+
+    def format(self) -> str:
+        return (f"n={self.count}  mean={self.mean_ms:.2f}ms  p50={self.p50_ms:.2f}ms  "
+                f"p95={self.p95_ms:.2f}ms  p99={self.p99_ms:.2f}ms  throughput={self.throughput_rps:.1f} rps")
+
+
+async def run_concurrent[T](func: Callable[[T], Awaitable[object]],
+                            inputs: Sequence[T],
+                            concurrency: int) -> LatencyStats:
+    """
+    Прогоняет func по всем inputs в concurrency параллельных воркерах.
+    Замеряет задержку каждого вызова и общую пропускную способность.
+    """
+    queue: asyncio.Queue[T] = asyncio.Queue()
+    for item in inputs:
+        queue.put_nowait(item)
+
+    samples: list[float] = []
+
+    async def _worker():
+        while True:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            await func(item)
+            samples.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_worker() for _ in range(max(1, concurrency))))
+    wall_time = time.perf_counter() - started
+
+    return LatencyStats.from_samples(samples, wall_time)
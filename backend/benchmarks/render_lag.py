@@ -0,0 +1,141 @@
+"""
+Задержка event loop во время параллельной генерации документов.
+Сравнивает синхронный вызов TemplateContentService прямо в корутине (как было в нодах графа)
+с TemplateRenderingService на пуле потоков и на пуле процессов.
+
+Пока идут рендеры, отдельная задача каждые --tick-ms просыпается и замеряет, насколько позже положенного.
+Это та задержка, которую в это время получают все остальные запросы воркера.
+
+Примеры запуска (из директории backend):
+
+    python -m benchmarks.render_lag
+    python -m benchmarks.render_lag --modes inline thread --documents 100 --concurrency 16 --paragraphs 500
+"""
+
+import argparse
+import asyncio
+import io
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Sequence
+
+import docx
+
+from benchmarks.metrics import percentile
+from src.core.templates.content_service import TemplateContentService
+from src.core.templates.rendering_service import TemplateRenderingService
+from src.core.templates.types import Template
+from src.storage.filesystem.fs_templates_storage import FilesystemTemplatesStorage
+
+
+TEMPLATE_FILENAME = "bench_template.docx"
+
+
+@dataclass
+class LagReport:
+    mode: str
+    documents: int
+    wall_time_s: float
+    lag_ms: list[float]
+
+    def format(self) -> str:
+        return (f"{self.mode:>8}: docs={self.documents}  time={self.wall_time_s:.2f}s  "
+                f"docs/s={self.documents / self.wall_time_s:.1f}  "
+                f"loop lag p50={percentile(self.lag_ms, 50):.1f}ms  p95={percentile(self.lag_ms, 95):.1f}ms  "
+                f"max={max(self.lag_ms, default=0):.1f}ms")
+
+
+def write_template(directory: Path, paragraphs: int) -> Template:
+    document = docx.Document()
+    for i in range(paragraphs):
+        document.add_paragraph(f"Пункт {i}. Работник {{{{ employee }}}} просит {{{{ request_{i % 10} }}}} "
+                               f"в соответствии с трудовым договором.")
+    table = document.add_table(rows=10, cols=3)
+    for row in table.rows:
+        for cell in row.cells:
+            cell.text = "{{ employer }}"
+    document.save(directory / TEMPLATE_FILENAME)
+    return Template("bench", "bench", TEMPLATE_FILENAME, {})
+
+
+def _values() -> dict[str, str]:
+    return {"employee": "Иванов И. И.", "employer": "ООО Ромашка",
+            **{f"request_{i}": "выплатить задолженность" for i in range(10)}}
+
+
+async def _measure_lag(tick_s: float, stop: asyncio.Event, samples: list[float]):
+    while not stop.is_set():
+        expected = time.perf_counter() + tick_s
+        await asyncio.sleep(tick_s)
+        samples.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+
+async def run_mode_async(mode: str, template: Template, content_service: TemplateContentService,
+                         args: argparse.Namespace) -> LagReport:
+    rendering_service = None if mode == "inline" else TemplateRenderingService(content_service, mode, args.workers)
+
+    async def _generate():
+        output = io.BytesIO()
+        if rendering_service is None:
+            # старое поведение: синхронный рендер прямо в ноде графа
+            content_service.extract_text(template)
+            content_service.fill_with_values(template, _values(), output)
+        else:
+            await rendering_service.extract_text_async(template)
+            await rendering_service.fill_with_values_async(template, _values(), output)
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def _worker():
+        async with semaphore:
+            await _generate()
+
+    if rendering_service is not None:
+        # прогрев пула (запуск процессов, первый разбор шаблона)
+        await asyncio.gather(*(_generate() for _ in range(args.workers)))
+
+    lag_ms: list[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_measure_lag(args.tick_ms / 1000, stop, lag_ms))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_worker() for _ in range(args.documents)))
+    wall_time = time.perf_counter() - started
+
+    stop.set()
+    await ticker
+    if rendering_service is not None:
+        rendering_service.shutdown()
+
+    return LagReport(mode, args.documents, wall_time, lag_ms)
+
+
+async def main_async(args: argparse.Namespace):
+    with tempfile.TemporaryDirectory(prefix="render_bench_") as tmp_dir:
+        template = write_template(Path(tmp_dir), args.paragraphs)
+        content_service = TemplateContentService(FilesystemTemplatesStorage(Path(tmp_dir)), args.cache_size)
+        for mode in args.modes:
+            print((await run_mode_async(mode, template, content_service, args)).format())
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Event loop lag during concurrent document generation")
+    parser.add_argument("--modes", choices=["inline", "thread", "process"], nargs="+",
+                        default=["inline", "thread", "process"])
+    parser.add_argument("--documents", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--paragraphs", type=int, default=200, help="размер синтетического шаблона")
+    parser.add_argument("--cache-size", type=int, default=32, help="TEMPLATES_PARSE_CACHE_SIZE")
+    parser.add_argument("--tick-ms", type=float, default=5)
+    return parser.parse_args(argv)
+
+
+def main():
+    asyncio.run(main_async(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Бенчмарк поиска правовых актов и шаблонов.
+Считает recall@k и MRR на размеченных запросах из fixtures, задержки p50/p95/p99 и пропускную способность под нагрузкой.
+
+Примеры запуска (из директории backend):
+
+    # in-process Chroma без ONNX модели, быстрый прогон
+    python -m benchmarks.retrieval --backend local --embedding hashing
+
+    # Chroma из docker-compose.dev.yaml, подбор n_results
+    python -m benchmarks.retrieval --backend http --host localhost --port 8004 --n-results 8 --k 1 3 5 8
+
+    # произвольная реализация LawDocsRepositoryABC (async фабрика без аргументов)
+    python -m benchmarks.retrieval --law-repo my_module:create_repo_async --target laws
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Sequence
+
+import chromadb
+
+from benchmarks.local_chroma import LocalAsyncChromaClient, HashingEmbeddingFunction, WithEmbeddingFunction
+from benchmarks.metrics import LatencyStats, recall_at_k, reciprocal_rank, run_concurrent
+from src.core.laws.iface import LawDocsRepositoryABC
+from src.core.laws.types import LawFragment
+from src.core.templates.iface import TemplatesRepositoryABC
+from src.storage.chroma.chroma_law_docs_repo import ChromaLawDocsRepository
+from src.storage.chroma.chroma_templates_repo import ChromaTemplatesRepository
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+BENCH_COLLECTION_PREFIX = "bench_"
+"""
+Бенчмарк пишет в отдельные коллекции, чтобы не трогать рабочие laws и templates.
+"""
+
+
+@dataclass(frozen=True)
+class LabelledQuery:
+    query: str
+    relevant: tuple[str, ...]
+
+
+@dataclass
+class QualityReport:
+    recall: dict[int, float]
+    """
+    {k: средний recall@k}
+    """
+    mrr: float
+    queries: int
+
+    def format(self) -> str:
+        recall = "  ".join(f"recall@{k}={value:.3f}" for k, value in sorted(self.recall.items()))
+        return f"queries={self.queries}  {recall}  MRR={self.mrr:.3f}"
+
+
+@dataclass
+class RetrievalReport:
+    name: str
+    quality: QualityReport
+    sequential: LatencyStats
+    concurrent: LatencyStats
+    concurrency: int = field(default=1)
+
+    def format(self) -> str:
+        return "\n".join([
+            f"== {self.name}",
+            f"quality:     {self.quality.format()}",
+            f"sequential:  {self.sequential.format()}",
+            f"concurrent ({self.concurrency}): {self.concurrent.format()}",
+        ])
+
+
+type SearchFunc = Callable[[str], Awaitable[list[str]]]
+"""
+Поиск, возвращающий ID найденных объектов в порядке убывания релевантности.
+"""
+
+
+def _load_queries(raw: list[dict]) -> list[LabelledQuery]:
+    return [LabelledQuery(q["query"], tuple(q["relevant"])) for q in raw]
+
+
+def load_laws_fixture(path: Path = FIXTURES_DIR / "laws.json") -> tuple[list[LawFragment], list[LabelledQuery]]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    fragments = [LawFragment(f["fragment_id"], f["document_id"], f["content"]) for f in data["fragments"]]
+    return fragments, _load_queries(data["queries"])
+
+
+def load_templates_fixture(path: Path = FIXTURES_DIR / "templates.json") -> tuple[list[dict], list[LabelledQuery]]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return data["templates"], _load_queries(data["queries"])
+
+
+async def evaluate_async(name: str,
+                         search: SearchFunc,
+                         queries: Sequence[LabelledQuery],
+                         ks: Sequence[int],
+                         concurrency: int,
+                         requests: int) -> RetrievalReport:
+    """
+    Сначала последовательно прогоняет размеченные запросы (качество + задержка без конкуренции),
+    затем requests запросов по кругу в concurrency параллельных воркерах.
+    """
+    recalls = {k: 0.0 for k in ks}
+    rr_sum = 0.0
+    results: dict[str, list[str]] = {}
+
+    async def _search_and_store(query: LabelledQuery):
+        results[query.query] = await search(query.query)
+
+    sequential = await run_concurrent(_search_and_store, queries, concurrency=1)
+
+    for query in queries:
+        retrieved = results[query.query]
+        for k in ks:
+            recalls[k] += recall_at_k(retrieved, query.relevant, k)
+        rr_sum += reciprocal_rank(retrieved, query.relevant)
+
+    quality = QualityReport(
+        recall={k: value / len(queries) for k, value in recalls.items()},
+        mrr=rr_sum / len(queries),
+        queries=len(queries),
+    )
+
+    load = [queries[i % len(queries)].query for i in range(requests)]
+    concurrent = await run_concurrent(search, load, concurrency=concurrency)
+
+    return RetrievalReport(name, quality, sequential, concurrent, concurrency)
+
+
+async def seed_law_docs_async(repo: LawDocsRepositoryABC, fragments: Sequence[LawFragment]):
+    for fragment in fragments:
+        await repo.add_of_update_fragment_async(fragment)
+
+
+async def seed_chroma_templates_async(client: chromadb.AsyncClientAPI, collection_name: str, templates: Sequence[dict]):
+    """
+    У TemplatesRepositoryABC нет методов записи, поэтому шаблоны пишутся напрямую в коллекцию
+    в формате, который читает ChromaTemplatesRepository.
+    """
+    collection = await client.get_or_create_collection(collection_name)
+    await collection.upsert(
+        ids=[t["id"] for t in templates],
+        documents=[t["document"] for t in templates],
+        metadatas=[{
+            "type": t["type"],
+            "title": t["title"],
+            "storage_filename": t["storage_filename"],
+            "fields": json.dumps(t["fields"], ensure_ascii=False),
+        } for t in templates],
+    )
+
+
+def law_docs_search(repo: LawDocsRepositoryABC) -> SearchFunc:
+    async def _search(query: str) -> list[str]:
+        return [f.fragment_id for f in await repo.find_fragments_async(query)]
+    return _search
+
+
+def templates_search(repo: TemplatesRepositoryABC) -> SearchFunc:
+    async def _search(query: str) -> list[str]:
+        return [t.id for t in await repo.find_templates_async(query)]
+    return _search
+
+
+async def _create_chroma_client(args: argparse.Namespace):
+    if args.backend == "local":
+        embedding = HashingEmbeddingFunction() if args.embedding == "hashing" else None
+        return LocalAsyncChromaClient(embedding)
+
+    client = await chromadb.AsyncHttpClient(host=args.host, port=args.port)
+    if args.embedding == "hashing":
+        return WithEmbeddingFunction(client, HashingEmbeddingFunction())
+    return client
+
+
+async def _load_custom_repo(spec: str) -> LawDocsRepositoryABC:
+    module_name, _, factory_name = spec.partition(":")
+    factory = getattr(importlib.import_module(module_name), factory_name)
+    return await factory()
+
+
+async def main_async(args: argparse.Namespace):
+    reports: list[RetrievalReport] = []
+    client = None
+    created_collections: list[str] = []
+
+    if args.target in ("laws", "all"):
+        fragments, queries = load_laws_fixture()
+        if args.law_repo:
+            laws_repo = await _load_custom_repo(args.law_repo)
+            name = f"laws ({args.law_repo})"
+        else:
+            client = client or await _create_chroma_client(args)
+            laws_repo = ChromaLawDocsRepository(client)
+            laws_repo._COLLECTION_NAME = BENCH_COLLECTION_PREFIX + ChromaLawDocsRepository._COLLECTION_NAME
+            if args.n_results:
+                laws_repo._N_RESULTS = args.n_results
+            await laws_repo.init_async()
+            created_collections.append(laws_repo._COLLECTION_NAME)
+            name = f"laws (chroma-{args.backend}, n_results={laws_repo._N_RESULTS})"
+
+        await seed_law_docs_async(laws_repo, fragments)
+        reports.append(await evaluate_async(name, law_docs_search(laws_repo), queries,
+                                            args.k, args.concurrency, args.requests))
+
+    if args.target in ("templates", "all"):
+        templates, queries = load_templates_fixture()
+        client = client or await _create_chroma_client(args)
+        templates_repo = ChromaTemplatesRepository(client)
+        templates_repo._COLLECTION_NAME = BENCH_COLLECTION_PREFIX + ChromaTemplatesRepository._COLLECTION_NAME
+        if args.n_results:
+            templates_repo._N_RESULTS = args.n_results
+        await seed_chroma_templates_async(client, templates_repo._COLLECTION_NAME, templates)
+        await templates_repo.init_async()
+        created_collections.append(templates_repo._COLLECTION_NAME)
+
+        name = f"templates (chroma-{args.backend}, n_results={templates_repo._N_RESULTS})"
+        reports.append(await evaluate_async(name, templates_search(templates_repo), queries,
+                                            args.k, args.concurrency, args.requests))
+
+    if client is not None and not args.keep:
+        for collection_name in created_collections:
+            await client.delete_collection(collection_name)
+
+    for report in reports:
+        print(report.format())
+        print()
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Retrieval quality and latency benchmark")
+    parser.add_argument("--target", choices=["laws", "templates", "all"], default="all")
+    parser.add_argument("--backend", choices=["local", "http"], default="local",
+                        help="local - in-process Chroma, http - Chroma server")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8004)
+    parser.add_argument("--embedding", choices=["default", "hashing"], default="default",
+                        help="default - ONNX all-MiniLM-L6-v2 как в проде, hashing - без модели")
+    parser.add_argument("--law-repo", default=None,
+                        help="module:factory, async фабрика произвольного LawDocsRepositoryABC")
+    parser.add_argument("--n-results", type=int, default=None,
+                        help="переопределяет n_results репозиториев (по умолчанию 5 для актов и 3 для шаблонов)")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--keep", action="store_true", help="не удалять bench_ коллекции после прогона")
+    return parser.parse_args(argv)
+
+
+def main():
+    asyncio.run(main_async(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Сравнение выбора шаблона по полным текстам и по кратким описаниям (TEMPLATES_SELECTION_MODE=text/digest).
+Для каждого размеченного запроса из fixtures/templates.json формирует набор кандидатов (релевантный шаблон + случайные),
+вызывает analyze_templates_async в обоих режимах и считает точность выбора, размер промпта и задержку вызова.
+
+Нужна настоящая LLM, по умолчанию YandexCloudLLM (YC_AUTH_TOKEN и YC_FOLDER в окружении).
+
+Примеры запуска (из директории backend):
+
+    python -m benchmarks.template_selection
+    python -m benchmarks.template_selection --candidates 3 --repeats 3 --digests-file /tmp/digests.json
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Sequence
+
+from benchmarks.metrics import LatencyStats
+from benchmarks.retrieval import LabelledQuery, load_templates_fixture
+from src.core.chats.types import ChatMessage
+from src.core.llm.iface import LLMABC
+from src.core.llm import use_cases as llm_use_cases
+from src.core.templates.types import Template, TemplateField
+
+
+FREE_TEMPLATE_ID = "free_template"
+
+
+class _RecordingLLM(LLMABC):
+    """
+    Запоминает размер промпта последнего вызова.
+    """
+
+    def __init__(self, inner: LLMABC):
+        self.inner = inner
+        self.last_prompt_chars = 0
+
+    async def invoke_async(self, messages: Iterable[ChatMessage], weak_model: bool = False, json_output: bool = False) -> ChatMessage:
+        messages = list(messages)
+        self.last_prompt_chars = sum(len(m.text) for m in messages)
+        return await self.inner.invoke_async(messages, weak_model=weak_model, json_output=json_output)
+
+
+@dataclass
+class ModeReport:
+    mode: str
+    correct: int = 0
+    total: int = 0
+    failures: int = 0
+    """
+    Ответы LLM, которые не удалось разобрать. Считаются неверными.
+    """
+    prompt_chars: list[int] = field(default_factory=list)
+    latencies_s: list[float] = field(default_factory=list)
+    selections: list[str | None] = field(default_factory=list)
+
+    def format(self, baseline_chars: float | None = None) -> str:
+        mean_chars = sum(self.prompt_chars) / len(self.prompt_chars) if self.prompt_chars else 0
+        ratio = f"  (x{baseline_chars / mean_chars:.1f} меньше)" if baseline_chars and mean_chars else ""
+        latency = LatencyStats.from_samples(self.latencies_s, sum(self.latencies_s))
+        return "\n".join([
+            f"== {self.mode}",
+            f"accuracy:    {self.correct}/{self.total} = {self.correct / self.total if self.total else 0:.3f}  "
+            f"failures={self.failures}",
+            f"prompt:      mean={mean_chars:.0f} chars{ratio}",
+            f"latency:     mean={latency.mean_ms:.0f}ms  p50={latency.p50_ms:.0f}ms  p95={latency.p95_ms:.0f}ms",
+        ])
+
+
+def load_templates(raw_templates: list[dict]) -> list[Template]:
+    return [Template(t["id"], t["title"], t["storage_filename"],
+                     {f["key"]: TemplateField(f["key"], f["agent_instructions"]) for f in t["fields"]},
+                     text=t["text"])
+            for t in raw_templates]
+
+
+async def load_or_generate_digests_async(llm: LLMABC, templates: Sequence[Template], path: Path | None) -> dict[str, str]:
+    """
+    Описания сохраняются в файл, чтобы повторные прогоны сравнивали одни и те же описания.
+    """
+    digests = json.loads(path.read_text(encoding="utf-8")) if path and path.exists() else {}
+    for template in templates:
+        if template.id not in digests:
+            digests[template.id] = await llm_use_cases.generate_template_digest_async(llm, template, template.text)
+    if path:
+        path.write_text(json.dumps(digests, ensure_ascii=False, indent=2), encoding="utf-8")
+    return digests
+
+
+def build_candidates(query: LabelledQuery, templates: Sequence[Template], count: int, rnd: random.Random) -> list[Template]:
+    """
+    Первый релевантный шаблон и count - 1 случайных, в случайном порядке.
+    Так же выглядит выдача поиска, которую получает analyze_templates_async в графе.
+    """
+    by_id = {t.id: t for t in templates}
+    relevant = by_id[query.relevant[0]]
+    others = [t for t in templates if t.id != relevant.id]
+    candidates = [relevant, *rnd.sample(others, min(count - 1, len(others)))]
+    rnd.shuffle(candidates)
+    return candidates
+
+
+async def select_async(llm: _RecordingLLM, report: ModeReport, query: LabelledQuery,
+                       candidates: Sequence[Template], texts: list[str], digests: bool):
+    history = [ChatMessage.from_user(query.query)]
+    started = time.perf_counter()
+    try:
+        result = await llm_use_cases.analyze_templates_async(llm, history, texts, digests=digests)
+    except Exception:
+        report.failures += 1
+        selected = None
+    else:
+        index = result.relevant_template_index
+        selected = candidates[index].id if index is not None and 0 <= index < len(candidates) else None
+    report.latencies_s.append(time.perf_counter() - started)
+    report.prompt_chars.append(llm.last_prompt_chars)
+
+    report.total += 1
+    report.selections.append(selected)
+    if selected in query.relevant:
+        report.correct += 1
+
+
+async def main_async(args: argparse.Namespace):
+    raw_templates, queries = load_templates_fixture()
+    templates = [t for t in load_templates(raw_templates) if t.id != FREE_TEMPLATE_ID]
+
+    module_name, _, factory_name = args.llm.partition(":")
+    llm = _RecordingLLM(getattr(importlib.import_module(module_name), factory_name)())
+
+    digests = await load_or_generate_digests_async(llm.inner, templates, args.digests_file)
+    text_report, digest_report = ModeReport("text"), ModeReport("digest")
+    rnd = random.Random(args.seed)
+
+    for _ in range(args.repeats):
+        for query in queries:
+            candidates = build_candidates(query, templates, args.candidates, rnd)
+            # оба режима получают одинаковый набор кандидатов в одинаковом порядке
+            await select_async(llm, text_report, query, candidates, [t.text for t in candidates], digests=False)
+            await select_async(llm, digest_report, query, candidates, [digests[t.id] for t in candidates], digests=True)
+
+    agreement = sum(1 for a, b in zip(text_report.selections, digest_report.selections) if a == b)
+    baseline_chars = sum(text_report.prompt_chars) / len(text_report.prompt_chars)
+    print(text_report.format())
+    print()
+    print(digest_report.format(baseline_chars))
+    print()
+    print(f"modes agree: {agreement}/{text_report.total}")
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Template selection accuracy: full texts vs digests")
+    parser.add_argument("--llm", default="src.external.yc_llm:YandexCloudLLM",
+                        help="module:factory, фабрика LLMABC без аргументов")
+    parser.add_argument("--candidates", type=int, default=3, help="шаблонов в одном вызове (как n_results поиска)")
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--digests-file", type=Path, default=None,
+                        help="JSON {template_id: digest}; недостающие описания генерируются и дописываются")
+    return parser.parse_args(argv)
+
+
+def main():
+    asyncio.run(main_async(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import asyncio
+
+from alembic import context
+from sqlalchemy import pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.storage.sql.base import Base
+from src.storage.sql import models  # noqa: F401 - регистрирует таблицы в Base.metadata
+
+
+config = context.config
+target_metadata = Base.metadata
+
+
+def get_url() -> str:
+    url = config.get_main_option("sqlalchemy.url")
+    if url:
+        return url
+    from src.storage.sql.connection import database_url
+    return database_url
+
+
+def run_migrations_offline():
+    """
+    SQL скрипт вместо применения: alembic upgrade head --sql
+    """
+    context.configure(url=get_url(), target_metadata=target_metadata, literal_binds=True,
+                      dialect_opts={"paramstyle": "named"})
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection):
+    context.configure(connection=connection, target_metadata=target_metadata)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_migrations_online():
+    # миграции выполняются одним соединением, пул не нужен
+    engine = create_async_engine(get_url(), poolclass=pool.NullPool)
+    try:
+        async with engine.connect() as connection:
+            await connection.run_sync(do_run_migrations)
+    finally:
+        await engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_migrations_online())
@@ -0,0 +1,38 @@
+"""Индексы под запросы: список обращений пользователя и вход через SSO
+
+Индексы создаются CONCURRENTLY, чтобы не блокировать запись в таблицы на работающей БД.
+Дубли индексов первичных ключей удаляются: первичный ключ уже индексирован.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0002"
+down_revision: str | Sequence[str] | None = "0001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY нельзя выполнять в транзакции
+    with op.get_context().autocommit_block():
+        op.create_index("ix_issues_user_id_created_at", "issues", ["user_id", sa.text("created_at DESC")],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index("ix_users_sso_provider_sso_id", "users", ["sso_provider", "sso_id"],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index("ix_issues_id", "issues", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_users_id", "users", postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index("ix_users_id", "users", ["id"], postgresql_concurrently=True, if_not_exists=True)
+        op.create_index("ix_issues_id", "issues", ["id"], postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index("ix_users_sso_provider_sso_id", "users", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_issues_user_id_created_at", "issues", postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,31 @@
+"""Владелец-аноним у обращения без записи в users
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0003"
+down_revision: str | Sequence[str] | None = "0002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade():
+    # nullable колонка без default - изменение только каталога, таблица не переписывается
+    op.add_column("issues", sa.Column("anonymous_id", postgresql.UUID(as_uuid=True), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index("ix_issues_anonymous_id_created_at", "issues", ["anonymous_id", sa.text("created_at DESC")],
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_issues_anonymous_id_created_at", "issues", postgresql_concurrently=True, if_exists=True)
+    op.drop_column("issues", "anonymous_id")
@@ -0,0 +1,54 @@
+"""Уникальный аккаунт SSO: (sso_provider, sso_id)
+
+Дубли, которые мог создать прежний get_or_create при одновременных входах, сливаются в самую раннюю запись:
+обращения дублей переносятся на нее, дубли удаляются.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0004"
+down_revision: str | Sequence[str] | None = "0003"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+# есть более ранняя запись с тем же аккаунтом SSO
+_HAS_EARLIER_TWIN = """
+    EXISTS (SELECT 1 FROM users AS keep
+            WHERE keep.sso_provider = {alias}.sso_provider AND keep.sso_id = {alias}.sso_id
+              AND (keep.created_at < {alias}.created_at OR (keep.created_at = {alias}.created_at AND keep.id < {alias}.id)))
+"""
+
+
+def upgrade():
+    op.execute(f"""
+        UPDATE issues SET user_id = (
+            SELECT keep.id FROM users AS dup
+            JOIN users AS keep ON keep.sso_provider = dup.sso_provider AND keep.sso_id = dup.sso_id
+            WHERE dup.id = issues.user_id
+            ORDER BY keep.created_at, keep.id
+            LIMIT 1
+        )
+        WHERE user_id IN (SELECT dup.id FROM users AS dup WHERE {_HAS_EARLIER_TWIN.format(alias="dup")})
+    """)
+    op.execute(f"DELETE FROM users WHERE {_HAS_EARLIER_TWIN.format(alias='users')}")
+
+    with op.get_context().autocommit_block():
+        op.create_index("uq_users_sso_provider_sso_id", "users", ["sso_provider", "sso_id"], unique=True,
+                        postgresql_concurrently=True, if_not_exists=True)
+        # уникальный индекс покрывает те же запросы
+        op.drop_index("ix_users_sso_provider_sso_id", "users", postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index("ix_users_sso_provider_sso_id", "users", ["sso_provider", "sso_id"],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index("uq_users_sso_provider_sso_id", "users", postgresql_concurrently=True, if_exists=True)
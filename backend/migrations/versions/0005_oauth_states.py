@@ -0,0 +1,31 @@
+"""Общее для всех воркеров хранилище state OAuth
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0005"
+down_revision: str | Sequence[str] | None = "0004"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade():
+    op.create_table(
+        "oauth_states",
+        sa.Column("state", sa.String(length=64), primary_key=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    # новая пустая таблица: CONCURRENTLY не нужен
+    op.create_index("ix_oauth_states_expires_at", "oauth_states", ["expires_at"])
+
+
+def downgrade():
+    op.drop_index("ix_oauth_states_expires_at", "oauth_states")
+    op.drop_table("oauth_states")
@@ -18,7 +18,7 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
 async def google_auth(provider: Provider = Depends(Provider)) -> RedirectResponse:
     google_oauth = provider[GoogleOAuth]
 
-    state = google_oauth.generate_state()
+    state = await google_oauth.generate_state()
     auth_url = google_oauth.get_authorization_url(state)
 
     response = RedirectResponse(auth_url)
@@ -28,7 +28,7 @@ async def google_auth(provider: Provider = Depends(Provider)) -> RedirectRespons
         httponly=True,
         secure=not settings.DEBUG,
         samesite="lax",
-        max_age=600
+        max_age=int(google_oauth.AUTH_STATE_TTL)
     )
     return response
 
@@ -63,7 +63,7 @@ async def google_callback(
     cookie_state = request.cookies.get("oauth_state")
 
     google_oauth = scope[GoogleOAuth]
-    if not cookie_state or not google_oauth.validate_state(cookie_state) or state != cookie_state:
+    if not cookie_state or not await google_oauth.validate_state(cookie_state) or state != cookie_state:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid state parameter"
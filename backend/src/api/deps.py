@@ -1,13 +1,17 @@
 from fastapi import Depends, HTTPException, status, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
 import logging
+import uuid
 
 from src.application.provider import Scope
+from src.config import settings
 from src.core.users.iface import AuthServiceABC, UserRepositoryABC
 from src.core.users.types import UserInfo
-from src.storage.sql.connection import get_session
+from src.storage.sql import connection
+from src.storage.sql.connection import get_session, get_read_session
 
 logger = logging.getLogger(__name__)
 security = HTTPBearer(auto_error=False)
@@ -22,6 +26,25 @@ async def get_db_session(session: AsyncSession = Depends(get_session)) -> AsyncS
         raise
 
 
+async def get_read_db_session(session: AsyncSession = Depends(get_read_session)) -> AsyncSession:
+    """
+    Сессия только для чтения: без commit после обработчика, при DATABASE_REPLICA_URL - к реплике.
+    """
+    yield session
+
+
+@asynccontextmanager
+async def primary_scope(scope: Scope) -> AsyncIterator[Scope]:
+    """
+    Дочерняя область с сессией основной БД. Для повторного чтения того, что реплика могла еще не получить:
+    пользователя сразу после входа, обращения сразу после создания.
+    """
+    async with connection.async_session() as session:
+        child = Scope(scope)
+        child.set_scoped_value(session, AsyncSession)
+        yield child
+
+
 def get_scope() -> Scope:
     from src.application import provider
     return Scope(provider.global_provider)
@@ -30,7 +53,7 @@ def get_scope() -> Scope:
 async def get_current_user(
         credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
         authorization: Optional[str] = Header(None),
-        db: AsyncSession = Depends(get_db_session),
+        db: AsyncSession = Depends(get_read_db_session),
         scope: Scope = Depends(get_scope)
 ) -> UserInfo | None:
     scope.set_scoped_value(db, AsyncSession)
@@ -44,10 +67,23 @@ async def get_current_user(
     if not token:
         return None
 
-    user_id = scope[AuthServiceABC].read_token(token)
-    if not user_id:
+    claims = scope[AuthServiceABC].read_claims(token)
+    if not claims:
         return None
 
-    user = await scope[UserRepositoryABC].get_by_id(user_id)
+    if claims.anonymous:
+        # анонимный пользователь целиком описывается токеном, в БД не ходим
+        return UserInfo.anonymous(uuid.UUID(claims.user_id))
+
+    try:
+        user = await scope[UserRepositoryABC].get_by_id(claims.user_id)
+    finally:
+        # сессия живет до конца запроса: без close соединение оставалось бы занятым, например, на все время ответа LLM.
+        # Если обработчик тоже читает через get_read_db_session, сессия возьмет соединение заново
+        await db.close()
+
+    if user is None and settings.DATABASE_REPLICA_URL:
+        async with primary_scope(scope) as primary:
+            user = await primary[UserRepositoryABC].get_by_id(claims.user_id)
 
     return user
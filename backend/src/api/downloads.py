@@ -0,0 +1,116 @@
+"""
+Отдача выходных файлов без прокачки содержимого через event loop.
+
+accel - бэкенд только проверяет доступ и отвечает заголовком X-Accel-Redirect, файл с диска отдает nginx
+из internal location (см. nginx.conf). Range, If-None-Match и If-Modified-Since nginx обрабатывает сам.
+
+direct - FileResponse: Range поддерживает Starlette, файл читается в пуле потоков,
+а сервер с расширением http.response.pathsend отправляет его через sendfile.
+
+Архив нескольких файлов собирается на лету (iter_zip) и отдается по мере чтения файлов.
+"""
+
+import io
+import zipfile
+from contextlib import closing
+from email.utils import formatdate, parsedate_to_datetime
+from typing import BinaryIO, Callable, Iterable, Iterator
+from urllib.parse import quote
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+
+from src.config import settings
+from src.core.results.types import IssueResultFileInfo
+
+
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+ZIP_CHUNK_SIZE = 64 * 1024
+
+
+def __is_not_modified(request: Request, etag: str, modified_at: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-Modified-Since игнорируется, если есть If-None-Match (RFC 9110, 13.1.3)
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            return int(modified_at) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+
+    return False
+
+
+def file_download_response(request: Request, info: IssueResultFileInfo, filename: str,
+                           media_type: str = DOCX_MEDIA_TYPE) -> Response:
+    etag = f'"{info.etag}"'
+    if settings.RESULTS_DOWNLOAD_MODE == "accel":
+        # ETag и Last-Modified nginx выставит сам по файлу
+        return Response(media_type=media_type, headers={
+            "X-Accel-Redirect": settings.RESULTS_ACCEL_PREFIX.rstrip("/") + "/" + quote(info.relative_path),
+            "Content-Disposition": f"attachment; filename*=utf-8''{quote(filename)}",
+        })
+
+    if __is_not_modified(request, etag, info.modified_at):
+        return Response(status_code=304, headers={"ETag": etag,
+                                                  "Last-Modified": formatdate(info.modified_at, usegmt=True)})
+
+    return FileResponse(info.path, media_type=media_type, filename=filename, headers={"ETag": etag})
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Поток без seek, в который пишет zipfile. Записанное забирается через drain и сразу уходит в ответ.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.__chunks = []
+        self.__position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.__position
+
+    def write(self, data) -> int:
+        self.__chunks.append(bytes(data))
+        self.__position += len(data)
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self.__chunks)
+        self.__chunks.clear()
+        return data
+
+
+def iter_zip(entries: Iterable[tuple[str, Callable[[], BinaryIO]]], chunk_size: int = ZIP_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    ZIP архив по частям. В памяти держится не больше одного блока chunk_size, размер архива не важен.
+    Синхронный генератор: StreamingResponse выполняет его в пуле потоков, поэтому чтение файлов не блокирует event loop.
+    :param entries: (имя в архиве, функция открытия файла). Файлы, которых нет (FileNotFoundError), пропускаются.
+    """
+    sink = _ChunkSink()
+    # DOCX уже сжат, повторное сжатие только тратит CPU
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+        for name, open_file in entries:
+            try:
+                source = open_file()
+            except FileNotFoundError:
+                continue
+
+            with closing(source), archive.open(name, "w") as entry:
+                while chunk := source.read(chunk_size):
+                    entry.write(chunk)
+                    if data := sink.drain():
+                        yield data
+            # дескриптор данных с CRC и размером дописывается после закрытия записи
+            yield sink.drain()
+
+    # центральный каталог
+    yield sink.drain()
@@ -1,22 +1,26 @@
 from fastapi import APIRouter, HTTPException, Depends, Request, Response
-from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse, RedirectResponse
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated, Self
 import logging
+import uuid
 from enum import Enum
 from sqlalchemy import select
 
 from src.core.chats.service import IssueChatService, GraphError
 from src.application.provider import Provider, Scope
 from src.core.chats.types import ChatMessage, MessageRole as DtoMessageRole
-from src.api.deps import get_current_user, get_scope, get_db_session
+from src.api.deps import get_current_user, get_scope, get_db_session, get_read_db_session, primary_scope
+from src.api.downloads import file_download_response, DOCX_MEDIA_TYPE
 from src.core.results.iface import IssueResultFileStorageABC
+from src.config import settings
 from src.core.issue_service import IssueService
-from src.exceptions import ExternalRateLimitException
+from src.exceptions import ExternalRateLimitException, ExternalServiceUnavailableException
 from src.core.users.types import UserInfo
 from src.storage.sql.models import Issue
-from src.core.users.iface import AuthServiceABC, UserRepositoryABC
+from src.core.users.iface import AuthServiceABC
 
 
 logger = logging.getLogger(__name__)
@@ -60,11 +64,23 @@ class ChatStateSchema(BaseModel):
     """
 
 
+async def _get_issue_read_your_writes(scope: Scope, issue_id: int) -> Issue | None:
+    """
+    Чтение из сессии scope (реплики), а если обращения там нет - из основной БД:
+    фронтенд запрашивает чат сразу после создания обращения, реплика может отставать.
+    """
+    issue = await scope[IssueService].get_issue_by_id(issue_id)
+    if issue is None and settings.DATABASE_REPLICA_URL:
+        async with primary_scope(scope) as primary:
+            issue = await primary[IssueService].get_issue_by_id(issue_id)
+    return issue
+
+
 @router.get('/{issue_id}/chat/')
 async def get_issue_messages(
         issue_id: int,
         scope: Scope = Depends(get_scope),
-        db: AsyncSession = Depends(get_db_session),
+        db: AsyncSession = Depends(get_read_db_session),
 ) -> ChatStateSchema:
     """
     Возвращает историю сообщений в чате обращения. Также возвращает is_ended и success.
@@ -73,7 +89,7 @@ async def get_issue_messages(
     scope.set_scoped_value(db, AsyncSession)
 
     try:
-        issue = await scope[IssueService].get_issue_by_id(issue_id)
+        issue = await _get_issue_read_your_writes(scope, issue_id)
 
         if not issue:
             raise HTTPException(status_code=404, detail="Issue not found")
@@ -118,13 +134,13 @@ async def create_issue(
     scope.set_scoped_value(db, AsyncSession)
 
     auth_service = scope[AuthServiceABC]
-    user_repo = scope[UserRepositoryABC]
     issue_service = scope[IssueService]
 
     user = current_user
 
     if not user:
-        user = await user_repo.create_anonymous()
+        # запись в users не создается: id анонима живет только в токене
+        user = UserInfo.anonymous(uuid.uuid4())
         auth_token = auth_service.authenticate(user)
 
         response.headers["X-Auth-Token"] = auth_token.access_token
@@ -132,14 +148,29 @@ async def create_issue(
 
         logger.info(f"Anonymous user created: {user.id}")
     try:
-        new_issue = await issue_service.create_issue(issue_data.text, user.id)
-        chat_service = scope[IssueChatService]
-        await chat_service.process_new_user_message(new_issue.id, issue_data.text)
+        new_issue = await issue_service.create_issue(issue_data.text, user)
+        # фиксируем обращение до графа: иначе соединение из пула
+        # и открытая транзакция удерживаются все время ответа LLM
+        await issue_service.commit_issue()
+
+        try:
+            chat_service = scope[IssueChatService]
+            await chat_service.process_new_user_message(new_issue.id, issue_data.text)
+        except BaseException:
+            # как и при прежнем откате транзакции, обращение без первого ответа агента не сохраняется
+            try:
+                await issue_service.rollback_issue(new_issue)
+            except Exception as e:
+                logger.exception("Failed to delete issue %s", new_issue.id, exc_info=e)
+            raise
         logger.info(f"New issue created: {new_issue.text}")
 
     except ExternalRateLimitException as e:
         logger.exception("Rate limit", exc_info=e)
         raise HTTPException(status_code=429, detail="Ограничение на внешнем сервисе")
+    except ExternalServiceUnavailableException as e:
+        logger.exception("External service unavailable", exc_info=e)
+        raise HTTPException(status_code=503, detail="Внешний сервис временно недоступен")
     except Exception as e:
         logger.exception(f"Failed to create issue: {e}")
         raise HTTPException(status_code=500, detail="Failed to create issue")
@@ -177,6 +208,9 @@ async def chat(
     except ExternalRateLimitException as e:
         logger.exception("Rate limit", exc_info=e)
         raise HTTPException(status_code=429, detail="Ограничение на внешнем сервисе")
+    except ExternalServiceUnavailableException as e:
+        logger.exception("External service unavailable", exc_info=e)
+        raise HTTPException(status_code=503, detail="Внешний сервис временно недоступен")
     except Exception as e:
         logger.exception("Internal error", exc_info=e)
         raise HTTPException(status_code=500, detail="Произошла непредвиденная ошибка")
@@ -187,33 +221,51 @@ async def chat(
 @router.get('/{issue_id}/download/')
 async def download_issue_file(
         issue_id: int,
+        request: Request,
         scope: Annotated[Scope, Depends(get_scope)],
-        db: AsyncSession = Depends(get_db_session),
+        db: AsyncSession = Depends(get_read_db_session),
         current_user: UserInfo = Depends(get_current_user)
 ):
     """
     Отдает выходной файл обращения в формате docx.
+    Поддерживает Range и условные запросы (ETag, Last-Modified). В режиме RESULTS_DOWNLOAD_MODE=accel файл отдает nginx,
+    в режиме presigned - редирект на временную ссылку S3.
     """
     scope.set_scoped_value(db, AsyncSession)
 
     issue_service = scope[IssueService]
     try:
-        issue = await issue_service.get_issue_by_id(issue_id)
+        issue = await _get_issue_read_your_writes(scope, issue_id)
         if not issue:
             raise HTTPException(status_code=404, detail="Issue not found")
 
         if not issue_service.can_download_result(issue, current_user):
             raise HTTPException(status_code=403, detail="Access denied")
 
-        file = scope[IssueResultFileStorageABC].read_issue_result_file(issue_id)
-        return StreamingResponse(
-            file,
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            headers={
-                "Content-Disposition": f"attachment; filename=issue_{issue_id}_result.docx"
-            }
-        )
-
+        storage = scope[IssueResultFileStorageABC]
+        filename = f"issue_{issue_id}_result.docx"
+        if settings.RESULTS_DOWNLOAD_MODE == "presigned":
+            try:
+                url = await run_in_threadpool(storage.get_issue_result_download_url, issue_id, filename)
+                return RedirectResponse(url, status_code=307)
+            except NotImplementedError:
+                pass
+
+        try:
+            info = storage.get_issue_result_file_info(issue_id)
+        except NotImplementedError:
+            # хранилище не на локальном диске
+            return StreamingResponse(
+                await run_in_threadpool(storage.read_issue_result_file, issue_id),
+                media_type=DOCX_MEDIA_TYPE,
+                headers={
+                    "Content-Disposition": f"attachment; filename={filename}"
+                }
+            )
+        return file_download_response(request, info, filename)
+
+    except HTTPException:
+        raise
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="File not found for this issue")
     except Exception as e:
@@ -5,6 +5,7 @@ import logging
 from src.core.laws.iface import LawDocsRepositoryABC
 from src.application.provider import Provider
 from src.core.laws.types import LawFragment as DtoLawFragment
+from src.storage.cache.search_cache import VersionedSearchCache
 
 logger = logging.getLogger(__name__)
 
@@ -57,6 +58,36 @@ async def search_fragments(
         raise HTTPException(status_code=500, detail="Ошибка при поиске фрагментов")
 
 
+class SearchCacheStatsSchema(BaseModel):
+    collection: str
+    version: int
+    hits: int
+    misses: int
+    invalidations: int
+    hit_rate: float
+
+
+@router.get("/search/cache", response_model=list[SearchCacheStatsSchema])
+async def get_search_cache_stats(
+    provider: Provider = Depends(Provider)
+):
+    """
+    Статистика кэша поиска по коллекциям (правовые акты и шаблоны).
+    """
+    cache = provider[VersionedSearchCache]
+    return [
+        SearchCacheStatsSchema(
+            collection=collection,
+            version=cache.version(collection),
+            hits=stats.hits,
+            misses=stats.misses,
+            invalidations=stats.invalidations,
+            hit_rate=stats.hit_rate,
+        )
+        for collection, stats in cache.stats().items()
+    ]
+
+
 @router.post("/", response_model=LawFragmentSchema)
 async def add_or_update_fragment(
     fragment: AddOrUpdateLawFragmentSchema,
@@ -1,14 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from functools import partial
 import logging
 from pydantic import BaseModel, ConfigDict
 from pydantic.types import UUID4
 from typing import Optional
 
 from src.api.deps import get_current_user, get_scope
+from src.api.downloads import iter_zip
 from src.core.users.types import UserInfo
 from src.core.users.types import UserInfo
 from src.core.issue_service import IssueService
 from src.core.chats.service import IssueChatService
+from src.core.results.iface import IssueResultFileStorageABC
 from src.application.provider import Scope
 from src.core.users.iface import AuthServiceABC
 
@@ -73,7 +77,7 @@ async def get_user_documents(
         issue_service = scope[IssueService]
         chat_service = scope[IssueChatService]
 
-        issues = await issue_service.get_user_issues(current_user.id)
+        issues = await issue_service.get_user_issues(current_user)
 
         logger.info("Found %s issues for user", len(issues))
 
@@ -130,3 +134,28 @@ async def get_user_documents(
             status_code=500,
             detail=f"Failed to get documents: {str(e)}",
         )
+
+
+@router.get("/documents/export")
+async def export_user_documents(
+    current_user: UserInfo = Depends(get_current_user),
+    scope: Scope = Depends(get_scope),
+):
+    """
+    ZIP архив всех готовых документов пользователя.
+    Архив собирается по мере чтения файлов и не буферизуется ни в памяти, ни на диске.
+    """
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    issues = await scope[IssueService].get_user_issues(current_user)
+    storage = scope[IssueResultFileStorageABC]
+    # документ есть только у успешно завершенных обращений, остальные iter_zip пропустит
+    entries = [(f"issue_{issue.id}_result.docx", partial(storage.read_issue_result_file, issue.id)) for issue in issues]
+    logger.info("Exporting %s issues for user %s", len(entries), current_user.id)
+
+    return StreamingResponse(
+        iter_zip(entries),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="documents.zip"'},
+    )
@@ -1,4 +1,8 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from src.application.provider import Provider
+from src.storage.chroma.resilient_client import ResilientChromaClient
+from src.storage.sql.connection import engine, read_engine
 
 
 router = APIRouter()
@@ -6,4 +10,29 @@ router = APIRouter()
 
 @router.get("/health/")
 async def health():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+
+@router.get("/metrics/chroma/")
+async def chroma_metrics(provider: Provider = Depends(Provider)):
+    """
+    Состояние circuit breaker, пула соединений и задержки по операциям коллекций Chroma.
+    """
+    client = provider[ResilientChromaClient]
+    return {
+        "breaker": client.breaker.state,
+        "pool": client.describe_pool(),
+        "operations": client.metrics.snapshot(),
+    }
+
+
+@router.get("/metrics/db/")
+async def db_metrics():
+    """
+    Состояние пула соединений Postgres: размер, занятые соединения, ожидания и задержка получения соединения.
+    При DATABASE_REPLICA_URL пул реплики - в поле replica.
+    """
+    metrics = engine.pool.describe()
+    if read_engine.pool is not engine.pool:
+        metrics["replica"] = read_engine.pool.describe()
+    return metrics
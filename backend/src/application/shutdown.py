@@ -0,0 +1,42 @@
+import inspect
+import logging
+
+from src.application.provider import Provider
+from src.core.templates.iface import TemplatesWatcherABC
+from src.core.templates.rendering_service import TemplateRenderingService
+from src.external.google_oauth import GoogleOAuth
+from src.storage.chroma.chroma_templates_catalog import ChromaTemplatesCatalog
+from src.storage.chroma.resilient_client import ResilientChromaClient
+from src.storage.oauth_state_sweeper import OAuthStateSweeper
+from src.storage.sql.anonymous_users_cleanup import AnonymousUsersCleanup
+
+
+_logger = logging.getLogger(__name__)
+
+
+# сначала фоновые задачи, которые обращаются к остальным сервисам, клиент Chroma - последним
+_STOP_ORDER: list[tuple[type, str]] = [
+    (TemplatesWatcherABC, "stop_async"),
+    (AnonymousUsersCleanup, "stop_async"),
+    (OAuthStateSweeper, "stop_async"),
+    (ChromaTemplatesCatalog, "close_async"),
+    (TemplateRenderingService, "shutdown"),
+    (GoogleOAuth, "close_async"),
+    (ResilientChromaClient, "close"),
+]
+
+
+async def shutdown_async(provider: Provider):
+    """
+    Останавливает фоновые задачи и пулы зарегистрированных сервисов при завершении приложения.
+    Незарегистрированные сервисы (отключенные настройками) пропускаются, ошибка одного не мешает остальным.
+    """
+    for iface, method in _STOP_ORDER:
+        if iface not in provider:
+            continue
+        try:
+            result = getattr(provider[iface], method)()
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            _logger.warning("Failed to stop %s", iface.__name__, exc_info=e)
@@ -0,0 +1,7 @@
+"""
+Служебные команды, запускаются вручную из директории backend (или в контейнере бэкенда):
+
+    python -m src.commands.migrate --help
+    python -m src.commands.ingest_templates --help
+    python -m src.commands.results_storage --help
+"""
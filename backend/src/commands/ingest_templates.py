@@ -0,0 +1,78 @@
+"""
+Загрузка шаблонов из TEMPLATES_DIR.
+
+Для каждого шаблона из коллекции Chroma открывает его DOCX, извлекает текст и переменные Jinja,
+сверяет переменные с объявленными полями и сохраняет текст и sha256 файла в метаданные шаблона.
+После этого подграфы берут текст для промптов из Template.text и не открывают DOCX.
+
+С --digests дополнительно генерирует слабой моделью краткие описания шаблонов
+для выбора шаблона в режиме TEMPLATES_SELECTION_MODE=digest.
+
+Команду нужно запускать для первичной загрузки и проверки шаблонов. Изменения файлов в TEMPLATES_DIR
+работающий бэкенд подхватывает сам (TEMPLATES_WATCH_MODE), но без генерации кратких описаний в режиме text.
+
+    python -m src.commands.ingest_templates            # проверить и сохранить
+    python -m src.commands.ingest_templates --dry-run  # только проверить
+    python -m src.commands.ingest_templates --digests  # и сгенерировать краткие описания
+
+Код возврата 1, если хотя бы у одного шаблона есть ошибки. Шаблоны с ошибками не сохраняются.
+"""
+
+import argparse
+import asyncio
+import importlib
+import os
+from pathlib import Path
+from typing import Sequence
+
+from src.core.templates.content_service import TemplateContentService
+from src.storage.chroma.chroma_templates_ingestion import ingest_templates_async
+from src.storage.chroma.chroma_templates_repo import ChromaTemplatesRepository
+from src.storage.chroma.connection import create_chroma_client_async
+from src.storage.filesystem.fs_templates_storage import FilesystemTemplatesStorage
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    templates_dir = Path(args.templates_dir or "")
+    if not args.templates_dir or not templates_dir.exists():
+        raise SystemExit("TEMPLATES_DIR env var or --templates-dir must point to an existing directory")
+
+    client = await create_chroma_client_async()
+    repository = ChromaTemplatesRepository(client)
+    await repository.init_async()
+    content_service = TemplateContentService(FilesystemTemplatesStorage(templates_dir))
+
+    llm = None
+    if args.digests:
+        module_name, _, factory_name = args.llm.partition(":")
+        llm = getattr(importlib.import_module(module_name), factory_name)()
+
+    results, orphans = await ingest_templates_async(repository, content_service, args.dry_run, args.force, llm)
+    for result in results:
+        print(result.format())
+    for filename in orphans:
+        print(f"[unused] {filename} is not referenced by any template")
+
+    failed = sum(1 for r in results if r.errors)
+    saved = sum(1 for r in results if r.saved)
+    print(f"\ntemplates={len(results)}  saved={saved}  errors={failed}  unused files={len(orphans)}")
+    return 1 if failed else 0
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Extract, validate and store template texts")
+    parser.add_argument("--templates-dir", default=os.getenv("TEMPLATES_DIR"))
+    parser.add_argument("--dry-run", action="store_true", help="только проверить, ничего не сохранять")
+    parser.add_argument("--force", action="store_true", help="сохранить текст, даже если файл не изменился")
+    parser.add_argument("--digests", action="store_true", help="сгенерировать краткие описания слабой моделью")
+    parser.add_argument("--llm", default="src.external.yc_llm:YandexCloudLLM",
+                        help="module:factory, фабрика LLMABC без аргументов")
+    return parser.parse_args(argv)
+
+
+def main():
+    raise SystemExit(asyncio.run(main_async(parse_args())))
+
+
+if __name__ == "__main__":
+    main()
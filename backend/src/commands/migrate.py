@@ -0,0 +1,78 @@
+"""
+Применение миграций схемы SQL-БД. Запускается отдельным шагом перед стартом бэкенда (сервис migrate в docker-compose).
+
+    python -m src.commands.migrate                  # до последней версии
+    python -m src.commands.migrate --revision 0001 --downgrade  # откатить до указанной версии
+
+БД, созданная до появления миграций (через create_all при старте), сначала помечается версией BASELINE_REVISION.
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+from typing import Sequence
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect, pool
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.application import logging
+
+
+BASELINE_REVISION = "0001"
+# вне пакета src: env.py выполняется только внутри alembic и не должен импортироваться при поиске Registerable
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+
+
+def get_config(url: str | None = None) -> Config:
+    """
+    :param url: Адрес БД. None - DATABASE_URL.
+    """
+    if url is None:
+        from src.storage.sql.connection import database_url
+        url = database_url
+
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    # % в пароле экранируется для configparser
+    config.set_main_option("sqlalchemy.url", url.replace("%", "%%"))
+    return config
+
+
+async def _get_table_names(url: str) -> list[str]:
+    engine = create_async_engine(url, poolclass=pool.NullPool)
+    try:
+        async with engine.connect() as connection:
+            return await connection.run_sync(lambda sync_connection: inspect(sync_connection).get_table_names())
+    finally:
+        await engine.dispose()
+
+
+def migrate(url: str | None = None, revision: str = "head", downgrade: bool = False):
+    config = get_config(url)
+    tables = asyncio.run(_get_table_names(config.get_main_option("sqlalchemy.url")))
+    if "users" in tables and "alembic_version" not in tables:
+        command.stamp(config, BASELINE_REVISION)
+
+    if downgrade:
+        command.downgrade(config, revision)
+    else:
+        command.upgrade(config, revision)
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Apply SQL schema migrations")
+    parser.add_argument("--revision", default="head")
+    parser.add_argument("--downgrade", action="store_true", help="откатить до --revision")
+    return parser.parse_args(argv)
+
+
+def main():
+    logging.setup()
+    args = parse_args()
+    migrate(revision=args.revision, downgrade=args.downgrade)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Обслуживание хранилища выходных файлов (RESULTS_STORAGE=sharded).
+
+    python -m src.commands.results_storage migrate    # перенести {issue_id}.docx из плоского хранилища в блобы
+    python -m src.commands.results_storage gc         # удалить блобы, на которые не ссылается ни одно обращение
+
+Обе команды можно запускать на работающем бэкенде.
+"""
+
+import argparse
+import os
+from pathlib import Path
+from typing import Sequence
+
+from src.storage.filesystem.fs_sharded_issue_result_storage import ShardedIssueResultStorage
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Sharded result storage maintenance")
+    parser.add_argument("command", choices=["migrate", "gc"])
+    parser.add_argument("--results-dir", default=os.getenv("RESULTS_DIR"))
+    parser.add_argument("--grace-seconds", type=float, default=3600,
+                        help="gc не удаляет файлы моложе этого возраста")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    results_dir = Path(args.results_dir or "")
+    if not args.results_dir or not results_dir.exists():
+        raise SystemExit("RESULTS_DIR env var or --results-dir must point to an existing directory")
+
+    storage = ShardedIssueResultStorage(results_dir)
+    if args.command == "migrate":
+        print(f"migrated: {storage.migrate()}")
+    else:
+        print(f"removed: {storage.collect_garbage(args.grace_seconds)}")
+
+
+if __name__ == "__main__":
+    main()
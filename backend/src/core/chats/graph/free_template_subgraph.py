@@ -4,7 +4,7 @@ import logging
 
 from src.core.chats.graph.common import BaseState, FreeTemplateState
 from src.core.templates.manager import TemplateManager
-from src.core.templates.content_service import TemplateContentService
+from src.core.templates.rendering_service import TemplateRenderingService
 from src.core.results.iface import IssueResultFileStorageABC
 from src.core.llm.iface import LLMABC
 from src.core.llm import use_cases as llm_use_cases
@@ -48,7 +48,7 @@ class FreeTemplateSubgraph(StateGraph[FreeTemplateState, None, BaseState, FreeTe
     async def __setup_loop(self,
                            state: BaseState,
                            service: TemplateManager,
-                           file_service: TemplateContentService) -> FreeTemplateState:
+                           file_service: TemplateRenderingService) -> FreeTemplateState:
         """
         Добавляет в чат инструкции по дальнейшему циклу вопросов-ответов.
         Инструкции включают текст шаблона.
@@ -56,7 +56,7 @@ class FreeTemplateSubgraph(StateGraph[FreeTemplateState, None, BaseState, FreeTe
         self.__logger.debug("Setting up QA loop...")
 
         free_template = await service.get_free_template_async()
-        text = file_service.extract_text(free_template)
+        text = await file_service.extract_text_async(free_template)
 
         return {"messages": state["messages"] + llm_use_cases.setup_free_template_loop(free_template, text), "relevant_template": free_template}
 
@@ -101,7 +101,7 @@ class FreeTemplateSubgraph(StateGraph[FreeTemplateState, None, BaseState, FreeTe
     @inject_global
     async def __generate_document(self,
                                   state: FreeTemplateState,
-                                  file_service: TemplateContentService,
+                                  file_service: TemplateRenderingService,
                                   result_storage: IssueResultFileStorageABC) -> FreeTemplateState:
         """
         Рендерит шаблон на основе значений из field_values.
@@ -110,8 +110,8 @@ class FreeTemplateSubgraph(StateGraph[FreeTemplateState, None, BaseState, FreeTe
         """
         self.__logger.debug("Generating document...")
 
-        with result_storage.write_issue_result_file(state["issue_id"]) as result_file:
-            file_service.fill_with_values(state["relevant_template"], state["field_values"], result_file)
+        async with result_storage.write_issue_result_file_async(state["issue_id"]) as result_file:
+            await file_service.fill_with_values_async(state["relevant_template"], state["field_values"], result_file)
 
         self.__logger.debug("Document generated")
         return {"messages": [*state["messages"],
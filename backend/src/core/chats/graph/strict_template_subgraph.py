@@ -6,7 +6,7 @@ from src.core.chats.graph.common import BaseState, StrictTemplateState, FreeTemp
 from src.core.llm.iface import LLMABC
 from src.core.llm import use_cases as llm_use_cases
 from src.core.results.iface import IssueResultFileStorageABC
-from src.core.templates.content_service import TemplateContentService
+from src.core.templates.rendering_service import TemplateRenderingService
 from src.core.chats.types import ChatMessage
 from src.application.provider import inject_global
 
@@ -45,14 +45,14 @@ class StrictTemplateSubgraph(StateGraph[StrictTemplateState, None, BaseState, St
     @inject_global
     async def __setup_loop(self,
                            state: BaseState,
-                           file_service: TemplateContentService) -> StrictTemplateState:
+                           file_service: TemplateRenderingService) -> StrictTemplateState:
         """
         Добавляет в чат инструкции по дальнейшему циклу вопросов-ответов.
         Инструкции включают текст шаблона и поля с инструкциями.
         """
         self.__logger.debug("Setting up QA loop...")
 
-        text = file_service.extract_text(state["relevant_template"])
+        text = await file_service.extract_text_async(state["relevant_template"])
 
         return {"messages": state["messages"] + llm_use_cases.setup_strict_template_loop(state["relevant_template"], text)}
 
@@ -98,7 +98,7 @@ class StrictTemplateSubgraph(StateGraph[StrictTemplateState, None, BaseState, St
     @inject_global
     async def __generate_document(self,
                                   state: StrictTemplateState,
-                                  file_service: TemplateContentService,
+                                  file_service: TemplateRenderingService,
                                   result_storage: IssueResultFileStorageABC) -> StrictTemplateState:
         """
         Рендерит шаблон на основе значений из field_values.
@@ -107,8 +107,8 @@ class StrictTemplateSubgraph(StateGraph[StrictTemplateState, None, BaseState, St
         """
         self.__logger.debug("Generating document...")
 
-        with result_storage.write_issue_result_file(state["issue_id"]) as result_file:
-            file_service.fill_with_values(state["relevant_template"], state["field_values"], result_file)
+        async with result_storage.write_issue_result_file_async(state["issue_id"]) as result_file:
+            await file_service.fill_with_values_async(state["relevant_template"], state["field_values"], result_file)
 
         self.__logger.debug("Document generated")
         return {"messages": [*state["messages"],
@@ -5,8 +5,9 @@ from src.core.chats.graph.common import BaseState, create_process_confirmation_n
 from src.core.llm.iface import LLMABC
 from src.core.llm import use_cases as llm_use_cases
 from src.core.templates.manager import TemplateManager
-from src.core.templates.content_service import TemplateContentService
+from src.core.templates.rendering_service import TemplateRenderingService
 from src.application.provider import inject_global
+from src.config import settings
 
 
 class TemplateAnalysisSubgraph(StateGraph[BaseState, None, BaseState, BaseState]):
@@ -42,15 +43,21 @@ class TemplateAnalysisSubgraph(StateGraph[BaseState, None, BaseState, BaseState]
         return {"templates": templates}
 
     @inject_global
-    async def __analyze_templates(self, state: BaseState, service: TemplateContentService, llm: LLMABC) -> BaseState:
+    async def __analyze_templates(self, state: BaseState, service: TemplateRenderingService, llm: LLMABC) -> BaseState:
         """
         Передает в LLM тексты всех шаблонов для анализа.
         Обрабатывает ответ LLM и сохраняет выбранный релевантный шаблон в relevant_template.
         """
         self.__logger.info("Analyzing templates...")
-        texts = [service.extract_text(tpl) for tpl in state["templates"]]
+        templates = state["templates"]
+        # краткие описания есть только у шаблонов, прошедших загрузку с --digests
+        use_digests = settings.TEMPLATES_SELECTION_MODE == "digest" and all(tpl.digest for tpl in templates)
+        if use_digests:
+            texts = [tpl.digest for tpl in templates]
+        else:
+            texts = await service.extract_texts_async(templates)
 
-        result = await llm_use_cases.analyze_templates_async(llm, state["messages"], texts)
+        result = await llm_use_cases.analyze_templates_async(llm, state["messages"], texts, digests=use_digests)
         relevant = state["templates"][result.relevant_template_index] if result.relevant_template_index is not None else None
 
         self.__logger.info("Selected relevant template: %s", relevant)
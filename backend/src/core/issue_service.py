@@ -1,5 +1,5 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, or_
 from typing import Optional
 
 from src.core.users.types import UserInfo
@@ -20,15 +20,30 @@ class IssueService(Registerable):
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def create_issue(self, text: str, user_id: str | None) -> Issue:
-        new_issue = Issue(
-            text=text,
-            user_id=user_id
-        )
+    async def create_issue(self, text: str, user: UserInfo | None) -> Issue:
+        new_issue = Issue(text=text)
+        if user is not None and user.is_anonymous:
+            new_issue.anonymous_id = user.id
+        elif user is not None:
+            new_issue.user_id = user.id
         self.db.add(new_issue)
         await self.db.flush()
         return new_issue
 
+    async def commit_issue(self):
+        """
+        Фиксирует обращение (и все остальное в сессии) и возвращает соединение в пул.
+        Вызывается до работы графа, чтобы соединение не простаивало все время ответа LLM.
+        """
+        await self.db.commit()
+
+    async def rollback_issue(self, issue: Issue):
+        """
+        Удаляет уже зафиксированное обращение, если первый ответ агента получить не удалось.
+        """
+        await self.db.delete(issue)
+        await self.db.commit()
+
     async def get_issue_by_id(self, issue_id: int) -> Optional[Issue]:
         result = await self.db.execute(
             select(Issue).where(
@@ -37,20 +52,27 @@ class IssueService(Registerable):
         )
         return result.scalar_one_or_none()
 
-    async def get_user_issues(self, user_id):
+    async def get_user_issues(self, user: UserInfo):
+        if user.is_anonymous:
+            # обращения анонимов, созданных до JWT-only сессий, еще ссылаются на запись в users
+            owner_filter = or_(Issue.anonymous_id == user.id, Issue.user_id == user.id)
+        else:
+            owner_filter = Issue.user_id == user.id
+
         result = await self.db.execute(
             select(Issue)
-            .where(Issue.user_id == user_id)
+            .where(owner_filter)
             .order_by(Issue.created_at.desc())
         )
         return result.scalars().all()
 
     @staticmethod
     def can_download_result(issue: Issue, user: UserInfo | None) -> bool:
-        if issue.user_id is not None and user is None:
+        owner_id = issue.user_id or issue.anonymous_id
+        if owner_id is not None and user is None:
             return True
 
         if not user:
             return False
 
-        return issue.user_id == user.id
+        return owner_id == user.id
@@ -6,7 +6,10 @@ from src.core.laws.types import LawFragment
 class LawDocsRepositoryABC(ABC):
 
     @abstractmethod
-    async def find_fragments_async(self, query: str) -> list[LawFragment]:
+    async def find_fragments_async(self, query: str, n_results: int | None = None) -> list[LawFragment]:
+        """
+        :param n_results: Количество фрагментов в выдаче. None - значение по умолчанию реализации.
+        """
         pass
 
     @abstractmethod
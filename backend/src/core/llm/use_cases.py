@@ -150,6 +150,12 @@ __TEMPLATES_ANALYSIS_MESSAGE = ChatMessage.from_system("""
 """)
 
 
+__TEMPLATES_DIGESTS_ANALYSIS_MESSAGE = ChatMessage.from_system(__TEMPLATES_ANALYSIS_MESSAGE.text.replace(
+    "Выше даны тексты шаблонов документов для анализа.",
+    "Выше даны краткие описания шаблонов документов для анализа (номер шаблона указан перед описанием).",
+))
+
+
 class __TemplatesAnalysisLLMResponseSchema(BaseModel):
     relevant_template_index: int
     user_message: str
@@ -162,11 +168,20 @@ class TemplatesAnalysisResult(NamedTuple):
 
 async def analyze_templates_async(llm: LLMABC,
                                   chat_history: list[ChatMessage],
-                                  template_texts: list[str]) -> TemplatesAnalysisResult:
+                                  template_texts: list[str],
+                                  digests: bool = False) -> TemplatesAnalysisResult:
+    """
+    :param template_texts: Полные тексты шаблонов или, если digests=True, их краткие описания (Template.digest).
+    """
     prompt = [*chat_history]
-    for text in template_texts:
-        prompt.append(ChatMessage.from_system(text))
-    prompt.append(__TEMPLATES_ANALYSIS_MESSAGE)
+    if digests:
+        prompt.append(ChatMessage.from_system("\n\n".join(f"Шаблон {i}:\n{digest}"
+                                                           for i, digest in enumerate(template_texts))))
+        prompt.append(__TEMPLATES_DIGESTS_ANALYSIS_MESSAGE)
+    else:
+        for text in template_texts:
+            prompt.append(ChatMessage.from_system(text))
+        prompt.append(__TEMPLATES_ANALYSIS_MESSAGE)
 
     ai_reponse = await llm.invoke_async(messages=prompt, json_output=True)
     # даст исключение, если формат не соблюден
@@ -177,6 +192,42 @@ async def analyze_templates_async(llm: LLMABC,
     return TemplatesAnalysisResult(index, ChatMessage.from_ai(validated.user_message))
 
 
+__TEMPLATE_DIGEST_MESSAGE = ChatMessage.from_system("""
+Выше дан текст шаблона обращения. Составь его краткое описание для выбора подходящего шаблона.
+Определи, в какой орган подается обращение, и в одном-двух предложениях опиши, с какой проблемой и с каким требованием оно подается.
+Не пересказывай текст шаблона и не перечисляй его поля.
+Ответ дай в формате JSON строго по заданной схеме без лишнего текста:
+{
+    "addressee": "Государственная инспекция труда",
+    "purpose": "Жалоба работника на ... с требованием ..."
+}
+""")
+
+
+class __TemplateDigestLLMResponseSchema(BaseModel):
+    addressee: str
+    purpose: str
+
+
+def format_template_digest(template: Template, addressee: str, purpose: str) -> str:
+    fields = ", ".join(f.agent_instructions for f in template.fields.values())
+    return f"Название: {template.title}\nАдресат: {addressee}\nНазначение: {purpose}\nКлючевые поля: {fields}"
+
+
+async def generate_template_digest_async(llm: LLMABC, template: Template, template_text: str) -> str:
+    """
+    Краткое описание шаблона для analyze_templates_async(digests=True). Генерируется слабой моделью при загрузке шаблонов.
+    Название и поля берутся из метаданных, от модели нужны только адресат и назначение.
+    """
+    prompt = [ChatMessage.from_system(template_text), __TEMPLATE_DIGEST_MESSAGE]
+    ai_response = await llm.invoke_async(messages=prompt, weak_model=True, json_output=True)
+
+    # даст исключение, если формат не соблюден
+    parsed = json.loads(ai_response.text)
+    validated = __TemplateDigestLLMResponseSchema(**parsed)
+    return format_template_digest(template, validated.addressee, validated.purpose)
+
+
 __FREE_TEMPLATE_SETUP_TEXT = """
 Теперь ты должен оставить обращение в свободной форме. Выше дан текст шаблона. У обращения есть несколько обязательных полей, которые тебе нужно заполнить. Ты должен самостоятельно решить, что писать в поля, если это возможно:
 {fields}
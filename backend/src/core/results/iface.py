@@ -1,6 +1,9 @@
+import asyncio
 from abc import ABC, abstractmethod
-from contextlib import contextmanager
-from typing import BinaryIO, Generator
+from contextlib import contextmanager, asynccontextmanager
+from typing import AsyncGenerator, BinaryIO, Generator
+
+from src.core.results.types import IssueResultFileInfo
 
 
 class IssueResultFileStorageABC(ABC):
@@ -8,8 +11,47 @@ class IssueResultFileStorageABC(ABC):
     @abstractmethod
     @contextmanager
     def write_issue_result_file(self, issue_id: int) -> Generator[BinaryIO, None, None]:
+        """
+        Файл заменяется атомарно при выходе из контекста. Если в контексте возникло исключение, старый файл остается.
+        """
         pass
 
+    @asynccontextmanager
+    async def write_issue_result_file_async(self, issue_id: int) -> AsyncGenerator[BinaryIO, None]:
+        """
+        write_issue_result_file для корутин: открытие и публикация файла (для S3 - PutObject
+        или complete_multipart_upload) выполняются в пуле потоков, а не в event loop.
+        Запись в файл внутри контекста вызывающий сам выносит из event loop.
+        """
+        context = self.write_issue_result_file(issue_id)
+        file = await asyncio.to_thread(context.__enter__)
+        try:
+            yield file
+        except BaseException as e:
+            if not await asyncio.to_thread(context.__exit__, type(e), e, e.__traceback__):
+                raise
+        else:
+            await asyncio.to_thread(context.__exit__, None, None, None)
+
     @abstractmethod
     def read_issue_result_file(self, issue_id: int) -> BinaryIO:
         pass
+
+    @abstractmethod
+    def get_issue_result_file_info(self, issue_id: int) -> IssueResultFileInfo:
+        """
+        Расположение и версия файла на локальном диске, чтобы отдавать его без чтения в Python.
+        :raises FileNotFoundError: Если файла нет.
+        :raises NotImplementedError: Если хранилище не держит файлы на локальном диске.
+        """
+        pass
+
+    @abstractmethod
+    def get_issue_result_download_url(self, issue_id: int, filename: str) -> str:
+        """
+        Временная ссылка для скачивания файла напрямую из хранилища, минуя бэкенд.
+        :param filename: Имя файла, под которым его сохранит браузер.
+        :raises FileNotFoundError: Если файла нет.
+        :raises NotImplementedError: Если хранилище не умеет выдавать такие ссылки.
+        """
+        pass
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Iterable
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+
+from src.config import settings
+from src.core.results.iface import IssueResultFileStorageABC
+from src.core.results.types import RerenderJob, RerenderProgress
+from src.core.templates.iface import TemplatesFileStorageABC
+from src.core.templates.rendering_service import _init_worker, _render_in_worker
+from src.application.provider import Registerable, Provider, Singleton
+
+
+type RerenderProgressCallback = Callable[[RerenderProgress], None]
+
+
+class ResultsRerenderService(Registerable):
+    """
+    Повторная генерация готовых документов после исправления шаблона.
+    Значения полей и шаблон берутся из последнего checkpoint'а завершенных чатов, LLM не вызывается.
+
+    Рендер выполняется в отдельном пуле процессов, который создается на время пакета,
+    чтобы пакет не занимал пул рендеринга, обслуживающий чаты.
+    """
+    __REG_ORDER__ = 2
+
+    @classmethod
+    async def on_build_provider(cls, provider: Provider):
+        service = cls(provider[BaseCheckpointSaver],
+                      provider[IssueResultFileStorageABC],
+                      provider[TemplatesFileStorageABC],
+                      settings.RESULTS_RERENDER_WORKERS or None)
+        provider.register(ResultsRerenderService, Singleton(service))
+
+    __checkpointer: BaseCheckpointSaver
+    __result_storage: IssueResultFileStorageABC
+    __templates_storage: TemplatesFileStorageABC
+    __workers: int
+    __lock: asyncio.Lock
+    __logger: logging.Logger
+
+    def __init__(self,
+                 checkpointer: BaseCheckpointSaver,
+                 result_storage: IssueResultFileStorageABC,
+                 templates_storage: TemplatesFileStorageABC,
+                 workers: int | None = None):
+        """
+        :param workers: Размер пула процессов. None - по числу ядер.
+        """
+        self.__checkpointer = checkpointer
+        self.__result_storage = result_storage
+        self.__templates_storage = templates_storage
+        self.__workers = workers or os.cpu_count() or 1
+        self.__lock = asyncio.Lock()
+        self.__logger = logging.getLogger(self.__class__.__name__)
+
+    async def collect_jobs_async(self, filenames: Iterable[str] | None = None) -> list[RerenderJob]:
+        """
+        Документы успешно завершенных чатов.
+        :param filenames: Только документы по этим файлам шаблонов. None - все документы.
+        """
+        filenames = set(filenames) if filenames is not None else None
+        jobs = []
+        seen_threads = set()
+        # checkpoint'ы одного потока идут от новых к старым, поэтому первый корневой - актуальное состояние
+        async for checkpoint in self.__checkpointer.alist(None):
+            configurable = checkpoint.config["configurable"]
+            if configurable.get("checkpoint_ns") or configurable["thread_id"] in seen_threads:
+                continue
+            seen_threads.add(configurable["thread_id"])
+
+            values = checkpoint.checkpoint["channel_values"]
+            template = values.get("relevant_template")
+            if not values.get("success") or template is None or values.get("field_values") is None:
+                continue
+            if filenames is not None and template.storage_filename not in filenames:
+                continue
+            jobs.append(RerenderJob(values["issue_id"], template, values["field_values"]))
+
+        return jobs
+
+    async def rerender_async(self,
+                             filenames: Iterable[str] | None = None,
+                             on_progress: RerenderProgressCallback | None = None,
+                             progress_every: int = 50) -> RerenderProgress:
+        """
+        Генерирует документы заново и атомарно заменяет их в IssueResultFileStorageABC.
+        Ошибка одного документа не прерывает пакет, такие обращения попадают в failed_issue_ids.
+        :param filenames: Только документы по этим файлам шаблонов. None - все документы.
+        :param on_progress: Вызывается после каждых progress_every документов и в конце пакета.
+        """
+        async with self.__lock:
+            jobs = await self.collect_jobs_async(filenames)
+            progress = RerenderProgress(len(jobs))
+            if not jobs:
+                return progress
+
+            self.__logger.info("Re-rendering %s documents with %s processes", len(jobs), self.__workers)
+            started = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            # в пуле не больше двух задач на процесс, чтобы не держать в памяти все отрендеренные файлы
+            semaphore = asyncio.Semaphore(self.__workers * 2)
+
+            # fork из процесса с потоками (event loop, пулы Chroma) небезопасен
+            executor = ProcessPoolExecutor(max_workers=self.__workers,
+                                           mp_context=multiprocessing.get_context("spawn"),
+                                           initializer=_init_worker,
+                                           initargs=(self.__templates_storage, settings.TEMPLATES_PARSE_CACHE_SIZE))
+            cancelled = False
+            try:
+                async def _process(job: RerenderJob):
+                    async with semaphore:
+                        try:
+                            data = await loop.run_in_executor(executor, _render_in_worker, job.template, job.field_values)
+                            await asyncio.to_thread(self.__write, job.issue_id, data)
+                        except Exception as e:
+                            self.__logger.warning("Failed to re-render document of issue %s", job.issue_id, exc_info=e)
+                            progress.failed_issue_ids.append(job.issue_id)
+                        else:
+                            progress.done += 1
+
+                    progress.elapsed_s = time.perf_counter() - started
+                    if progress.processed % progress_every == 0 and progress.processed < progress.total:
+                        self.__report(progress, on_progress)
+
+                await asyncio.gather(*(_process(job) for job in jobs))
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+            finally:
+                # shutdown ждет завершения процессов, поэтому не в event loop. При отмене пакета рендеры из очереди не нужны
+                await asyncio.shield(loop.run_in_executor(None, partial(executor.shutdown, cancel_futures=cancelled)))
+
+            progress.elapsed_s = time.perf_counter() - started
+            self.__report(progress, on_progress)
+            return progress
+
+    def __write(self, issue_id: int, data: bytes):
+        with self.__result_storage.write_issue_result_file(issue_id) as file:
+            file.write(data)
+
+    def __report(self, progress: RerenderProgress, on_progress: RerenderProgressCallback | None):
+        self.__logger.info("Re-render progress: %s", progress.format())
+        if on_progress:
+            on_progress(progress)
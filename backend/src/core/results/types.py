@@ -0,0 +1,49 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src.core.templates.types import Template
+
+
+@dataclass(frozen=True)
+class IssueResultFileInfo:
+    path: Path
+    relative_path: str
+    """
+    Путь относительно корня хранилища (RESULTS_DIR). Для X-Accel-Redirect.
+    """
+    size: int
+    modified_at: float
+    etag: str
+    """
+    Меняется при любом изменении содержимого. Без кавычек.
+    """
+
+
+@dataclass(frozen=True)
+class RerenderJob:
+    """
+    Документ обращения, который можно сгенерировать заново из сохраненного состояния чата.
+    """
+    issue_id: int
+    template: Template
+    field_values: dict[str, str]
+
+
+@dataclass
+class RerenderProgress:
+    total: int
+    done: int = 0
+    failed_issue_ids: list[int] = field(default_factory=list)
+    elapsed_s: float = 0.0
+
+    @property
+    def processed(self) -> int:
+        return self.done + len(self.failed_issue_ids)
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.processed / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    def format(self) -> str:
+        return (f"{self.processed}/{self.total} documents  failed={len(self.failed_issue_ids)}  "
+                f"elapsed={self.elapsed_s:.1f}s  {self.docs_per_second:.1f} docs/s")
@@ -1,32 +1,54 @@
+import copy
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from docxtpl import DocxTemplate
 from typing import BinaryIO
 
+from src.config import settings
 from src.core.templates.iface import TemplatesFileStorageABC
-from src.core.templates.types import Template
+from src.core.templates.types import Template, TemplateFileInfo, TemplateContentInfo
 from src.application.provider import Registerable, Provider, Singleton
 
 
+@dataclass(frozen=True)
+class _ParsedTemplate:
+    info: TemplateFileInfo
+    data: bytes
+    document: object
+    """
+    Исходный разобранный docx.Document. Никогда не рендерится, только копируется.
+    """
+    text: str
+
+
 class TemplateContentService(Registerable):
     __REG_ORDER__ = 1
 
     @classmethod
     async def on_build_provider(cls, provider: Provider):
         storage = provider[TemplatesFileStorageABC]
-        provider.register(TemplateContentService, Singleton(cls(storage)))
+        provider.register(TemplateContentService, Singleton(cls(storage, settings.TEMPLATES_PARSE_CACHE_SIZE)))
 
     templates_storage: TemplatesFileStorageABC
+    __cache_size: int
+    __cache: OrderedDict[str, _ParsedTemplate]
+    __lock: threading.Lock
 
-    def __init__(self, templates_storage: TemplatesFileStorageABC):
+    def __init__(self, templates_storage: TemplatesFileStorageABC, cache_size: int = 0):
+        """
+        :param cache_size: Сколько разобранных шаблонов держать в памяти. 0 - разбирать файл при каждом обращении.
+        """
         self.templates_storage = templates_storage
+        self.__cache_size = cache_size
+        self.__cache = OrderedDict()
+        # сервис вызывается и из потоков пула рендеринга
+        self.__lock = threading.Lock()
 
-    def __get_docx(self, filename: str) -> DocxTemplate:
-        with self.templates_storage.open_template_file(filename) as file:
-            tpl = DocxTemplate(file)
-            tpl.init_docx()
-            return tpl
-
-    def extract_text(self, template: Template) -> str:
-        doc = self.__get_docx(template.storage_filename)
+    @staticmethod
+    def __extract_text(doc: DocxTemplate) -> str:
         chunks = []
 
         for p in doc.docx.paragraphs:
@@ -41,6 +63,63 @@ class TemplateContentService(Registerable):
 
         return "\n".join(chunks)
 
+    def __parse(self, filename: str, info: TemplateFileInfo) -> _ParsedTemplate:
+        with self.templates_storage.open_template_file(filename) as file:
+            data = file.read()
+
+        tpl = DocxTemplate(io.BytesIO(data))
+        tpl.init_docx()
+        return _ParsedTemplate(info, data, tpl.docx, self.__extract_text(tpl))
+
+    def __get_parsed(self, filename: str) -> _ParsedTemplate:
+        if self.__cache_size <= 0:
+            return self.__parse(filename, self.templates_storage.get_template_file_info(filename))
+
+        # файл мог быть заменен, поэтому версия проверяется при каждом обращении
+        info = self.templates_storage.get_template_file_info(filename)
+        with self.__lock:
+            parsed = self.__cache.get(filename)
+            if parsed is not None and parsed.info == info:
+                self.__cache.move_to_end(filename)
+                return parsed
+
+        parsed = self.__parse(filename, info)
+        with self.__lock:
+            self.__cache[filename] = parsed
+            self.__cache.move_to_end(filename)
+            while len(self.__cache) > self.__cache_size:
+                self.__cache.popitem(last=False)
+        return parsed
+
+    def __get_docx(self, filename: str) -> DocxTemplate:
+        parsed = self.__get_parsed(filename)
+        # render изменяет документ на месте, поэтому работаем с копией дерева, а не разбираем zip заново
+        tpl = DocxTemplate(io.BytesIO(parsed.data))
+        tpl.docx = copy.deepcopy(parsed.document)
+        return tpl
+
+    def invalidate(self, filename: str | None = None):
+        """
+        Удаляет шаблон (или все шаблоны) из кэша. Обычно не нужно: измененный файл определяется по размеру и mtime.
+        """
+        with self.__lock:
+            if filename is None:
+                self.__cache.clear()
+            else:
+                self.__cache.pop(filename, None)
+
+    def analyze(self, filename: str) -> TemplateContentInfo:
+        """
+        Текст, переменные Jinja и хеш файла. Используется при загрузке шаблонов, а не в обработке запросов.
+        :raises jinja2.TemplateSyntaxError: Если в шаблоне ошибка синтаксиса Jinja.
+        """
+        parsed = self.__get_parsed(filename)
+        placeholders = DocxTemplate(io.BytesIO(parsed.data)).get_undeclared_template_variables()
+        return TemplateContentInfo(parsed.text, frozenset(placeholders), hashlib.sha256(parsed.data).hexdigest())
+
+    def extract_text(self, template: Template) -> str:
+        return self.__get_parsed(template.storage_filename).text
+
     def fill_with_values(self, template: Template, values: dict[str, str], output: BinaryIO):
         doc = self.__get_docx(template.storage_filename)
         doc.render(values)
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import BinaryIO
+from typing import Awaitable, BinaryIO, Callable
 
-from src.core.templates.types import Template
+from src.core.templates.types import Template, TemplateFileInfo, TemplateFileChange
 
 
 class TemplatesRepositoryABC(ABC):
@@ -11,7 +11,13 @@ class TemplatesRepositoryABC(ABC):
         pass
 
     @abstractmethod
-    async def find_templates_async(self, query: str, exclude_ids: list[str] | None = None) -> list[Template]:
+    async def find_templates_async(self,
+                                   query: str,
+                                   exclude_ids: list[str] | None = None,
+                                   n_results: int | None = None) -> list[Template]:
+        """
+        :param n_results: Количество шаблонов в выдаче. None - значение по умолчанию реализации.
+        """
         pass
 
 
@@ -20,3 +26,38 @@ class TemplatesFileStorageABC(ABC):
     @abstractmethod
     def open_template_file(self, filename: str) -> BinaryIO:
         pass
+
+    @abstractmethod
+    def list_template_files(self) -> list[str]:
+        """
+        Имена всех DOCX файлов в хранилище (в формате storage_filename).
+        """
+        pass
+
+    @abstractmethod
+    def get_template_file_info(self, filename: str) -> TemplateFileInfo:
+        """
+        Дешевая проверка версии файла без чтения содержимого. Используется как часть ключа кэша разобранных шаблонов.
+        """
+        pass
+
+
+type TemplateChangesCallback = Callable[[list[TemplateFileChange]], Awaitable[None]]
+
+
+class TemplatesWatcherABC(ABC):
+    """
+    Источник уведомлений об изменении файлов в TemplatesFileStorageABC.
+    """
+
+    @abstractmethod
+    def subscribe(self, callback: TemplateChangesCallback):
+        """
+        :param callback: Вызывается с пачкой изменений (добавленные, измененные и удаленные файлы).
+            Исключения из callback логируются и не останавливают наблюдение.
+        """
+        pass
+
+    @abstractmethod
+    async def stop_async(self):
+        pass
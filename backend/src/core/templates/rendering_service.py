@@ -0,0 +1,97 @@
+import asyncio
+import io
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import BinaryIO
+
+from src.config import settings
+from src.core.templates.content_service import TemplateContentService
+from src.core.templates.iface import TemplatesFileStorageABC
+from src.core.templates.types import Template
+from src.application.provider import Registerable, Provider, Singleton
+
+
+_worker_service: TemplateContentService | None = None
+"""
+Свой TemplateContentService (и свой кэш разобранных шаблонов) в каждом процессе пула.
+"""
+
+
+def _init_worker(storage: TemplatesFileStorageABC, cache_size: int):
+    global _worker_service
+    _worker_service = TemplateContentService(storage, cache_size)
+
+
+def _extract_text_in_worker(template: Template) -> str:
+    return _worker_service.extract_text(template)
+
+
+def _render_in_worker(template: Template, values: dict[str, str]) -> bytes:
+    output = io.BytesIO()
+    _worker_service.fill_with_values(template, values, output)
+    return output.getvalue()
+
+
+class TemplateRenderingService(Registerable):
+    """
+    Async фасад над TemplateContentService. Рендер docxtpl и разбор DOCX - синхронная CPU и IO работа,
+    поэтому выполняется в пуле и не блокирует event loop, на котором крутятся остальные запросы воркера.
+
+    В режиме thread используется общий TemplateContentService с его кэшем.
+    В режиме process каждый процесс держит свой кэш, а хранилище шаблонов передается в процессы через pickle.
+    """
+    __REG_ORDER__ = 2
+
+    @classmethod
+    async def on_build_provider(cls, provider: Provider):
+        content_service = provider[TemplateContentService]
+        service = cls(content_service, settings.TEMPLATES_RENDER_EXECUTOR, settings.TEMPLATES_RENDER_WORKERS)
+        provider.register(TemplateRenderingService, Singleton(service))
+
+    __content_service: TemplateContentService
+    __executor: Executor
+    __use_processes: bool
+
+    def __init__(self, content_service: TemplateContentService, executor_type: str = "thread", workers: int = 4):
+        """
+        :param executor_type: thread или process.
+        :param workers: Размер пула.
+        """
+        self.__content_service = content_service
+        if executor_type == "process":
+            self.__use_processes = True
+            # fork из процесса с потоками (event loop, пулы Chroma) небезопасен
+            self.__executor = ProcessPoolExecutor(max_workers=workers,
+                                                  mp_context=multiprocessing.get_context("spawn"),
+                                                  initializer=_init_worker,
+                                                  initargs=(content_service.templates_storage,
+                                                            settings.TEMPLATES_PARSE_CACHE_SIZE))
+        elif executor_type == "thread":
+            self.__use_processes = False
+            self.__executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="render")
+        else:
+            raise ValueError(f"Unknown executor type: {executor_type}")
+
+    async def extract_text_async(self, template: Template) -> str:
+        if template.text is not None:
+            # текст сохранен при загрузке шаблона, DOCX открывать не нужно
+            return template.text
+
+        loop = asyncio.get_running_loop()
+        if self.__use_processes:
+            return await loop.run_in_executor(self.__executor, _extract_text_in_worker, template)
+        return await loop.run_in_executor(self.__executor, self.__content_service.extract_text, template)
+
+    async def extract_texts_async(self, templates: list[Template]) -> list[str]:
+        return list(await asyncio.gather(*(self.extract_text_async(tpl) for tpl in templates)))
+
+    async def fill_with_values_async(self, template: Template, values: dict[str, str], output: BinaryIO):
+        loop = asyncio.get_running_loop()
+        if self.__use_processes:
+            data = await loop.run_in_executor(self.__executor, _render_in_worker, template, values)
+            await loop.run_in_executor(None, output.write, data)
+            return
+        await loop.run_in_executor(self.__executor, self.__content_service.fill_with_values, template, values, output)
+
+    def shutdown(self):
+        self.__executor.shutdown(wait=False, cancel_futures=True)
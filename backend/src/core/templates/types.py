@@ -7,9 +7,46 @@ class TemplateField:
     agent_instructions: str
 
 
+@dataclass(frozen=True)
+class TemplateFileInfo:
+    """
+    Версия файла шаблона в хранилище. Меняется при любом изменении файла.
+    """
+    size: int
+    modified_ns: int
+
+
+@dataclass(frozen=True)
+class TemplateFileChange:
+    filename: str
+    deleted: bool = False
+
+
 @dataclass
 class Template:
     id: str
     title: str
     storage_filename: str
     fields: dict[str, TemplateField]
+    text: str | None = None
+    """
+    Текст шаблона, извлеченный при загрузке (src.commands.ingest_templates). None - шаблон не проходил загрузку.
+    """
+    content_hash: str | None = None
+    """
+    sha256 файла шаблона, из которого получен text.
+    """
+    digest: str | None = None
+    """
+    Краткое описание (название, адресат, назначение, ключевые поля) для промпта выбора шаблона.
+    """
+
+
+@dataclass(frozen=True)
+class TemplateContentInfo:
+    text: str
+    placeholders: frozenset[str]
+    """
+    Переменные Jinja, которые использует шаблон.
+    """
+    content_hash: str
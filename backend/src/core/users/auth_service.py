@@ -1,8 +1,11 @@
 import datetime
+import hashlib
+import time
 from jose import jwt, JWTError
 
 from src.config import settings
-from src.core.users.types import UserInfo, AuthToken
+from src.storage.cache.ttl_cache import TTLCache
+from src.core.users.types import UserInfo, AuthToken, TokenClaims
 from src.core.users.iface import AuthServiceABC
 from src.application.provider import Registerable, Provider, Singleton
 
@@ -13,10 +16,18 @@ class AuthService(AuthServiceABC, Registerable):
     async def on_build_provider(cls, provider: Provider):
         provider.register(AuthServiceABC, Singleton(cls()))
 
-    def __init__(self):
+    __verified: TTLCache[TokenClaims]
+
+    def __init__(self, cache_size: int | None = None):
+        """
+        :param cache_size: Сколько проверенных токенов помнить. None - AUTH_TOKEN_CACHE_SIZE, 0 - проверять каждый раз.
+        """
         self.secret_key = settings.SECRET_KEY
         self.jwt_algorithm = settings.ALGORITHM
         self.jwt_token_expiration = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+        # запись живет до exp токена, ttl только ограничивает сверху
+        self.__verified = TTLCache(settings.AUTH_TOKEN_CACHE_SIZE if cache_size is None else cache_size,
+                                   ttl=self.jwt_token_expiration * 60)
 
     def authenticate(self, user: UserInfo) -> AuthToken:
         expire = datetime.datetime.now(datetime.UTC) + datetime.timedelta(minutes=self.jwt_token_expiration)
@@ -26,6 +37,8 @@ class AuthService(AuthServiceABC, Registerable):
             "exp": int(expire.timestamp()),
             "type": "access",
         }
+        if user.is_anonymous:
+            to_encode["anon"] = True
         encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.jwt_algorithm)
 
         return AuthToken(
@@ -35,6 +48,28 @@ class AuthService(AuthServiceABC, Registerable):
         )
 
     def read_token(self, token: str) -> str | None:
+        claims = self.read_claims(token)
+        return claims.user_id if claims else None
+
+    def read_claims(self, token: str) -> TokenClaims | None:
+        """
+        Токен проверяется (подпись HMAC, type, exp) при первом предъявлении, дальше до exp берется из кэша.
+        В кэш попадают только прошедшие проверку токены, ключ - sha256 токена.
+        """
+        key = hashlib.sha256(token.encode()).digest()
+        claims = self.__verified.get(key)
+        if claims is not None:
+            return claims
+
+        generation = self.__verified.generation
+        result = self.__verify_token(token)
+        if result is not None:
+            claims, expire = result
+            self.__verified.put(key, claims, generation, expires_in=expire - time.time())
+            return claims
+        return None
+
+    def __verify_token(self, token: str) -> tuple[TokenClaims, int] | None:
         try:
             payload = jwt.decode(token, self.secret_key, algorithms=[self.jwt_algorithm])
         except JWTError:
@@ -48,4 +83,6 @@ class AuthService(AuthServiceABC, Registerable):
             return None
 
         user_id: str = payload.get("sub")
-        return user_id
+        if not user_id:
+            return None
+        return TokenClaims(user_id=user_id, anonymous=bool(payload.get("anon"))), expire
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 
-from src.core.users.types import UserSSOInfo, UserInfo, AuthToken
+from src.core.users.types import UserSSOInfo, UserInfo, AuthToken, TokenClaims
 
 
 class OAuthProviderABC(ABC):
@@ -13,6 +13,32 @@ class OAuthProviderABC(ABC):
         pass
 
 
+class OAuthStateStoreABC(ABC):
+    """
+    Одноразовые значения state OAuth между редиректом к провайдеру и callback.
+    """
+
+    @abstractmethod
+    async def add(self, state: str, ttl: float):
+        pass
+
+    @abstractmethod
+    async def consume(self, state: str) -> bool:
+        """
+        Удаляет state. Повторное использование того же state невозможно.
+        :return: True, если state был выдан и не устарел.
+        """
+        pass
+
+    @abstractmethod
+    async def sweep(self) -> int:
+        """
+        Удаляет устаревшие значения брошенных входов.
+        :return: Количество удаленных значений.
+        """
+        pass
+
+
 class UserRepositoryABC(ABC):
 
     @abstractmethod
@@ -45,3 +71,7 @@ class AuthServiceABC(ABC):
     @abstractmethod
     def read_token(self, token: str) -> str | None:
         pass
+
+    @abstractmethod
+    def read_claims(self, token: str) -> TokenClaims | None:
+        pass
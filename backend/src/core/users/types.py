@@ -1,7 +1,13 @@
+import uuid
+from typing import Self
+
 from pydantic import BaseModel, ConfigDict
 from pydantic.types import UUID4
 
 
+ANONYMOUS_SSO_PROVIDER = "anonymous"
+
+
 class UserSSOInfo(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -18,6 +24,25 @@ class UserInfo(UserSSOInfo):
 
     id: UUID4
 
+    @property
+    def is_anonymous(self) -> bool:
+        return self.sso_provider == ANONYMOUS_SSO_PROVIDER
+
+    @classmethod
+    def anonymous(cls, user_id: uuid.UUID) -> Self:
+        """
+        Анонимный пользователь. Записи в БД нет, id хранится только в JWT.
+        """
+        return cls(
+            id=user_id,
+            email=f"anon_{user_id}@anon.local",
+            sso_provider=ANONYMOUS_SSO_PROVIDER,
+            sso_id=str(user_id),
+            first_name="Гость",
+            last_name="",
+            avatar_url="",
+        )
+
 
 class AuthToken(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -26,3 +51,12 @@ class AuthToken(BaseModel):
     token_type: str
     expires_in: int
 
+
+class TokenClaims(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    user_id: str
+    anonymous: bool = False
+    """
+    Токен анонимного пользователя, для которого нет записи в users.
+    """
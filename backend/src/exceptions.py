@@ -1,3 +1,10 @@
 
 class ExternalRateLimitException(Exception):
     pass
+
+
+class ExternalServiceUnavailableException(Exception):
+    """
+    Внешний сервис (Chroma, LLM и т. д.) не ответил за отведенное время или временно отключен circuit breaker.
+    """
+    pass
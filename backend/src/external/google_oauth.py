@@ -1,47 +1,127 @@
+import asyncio
+import re
+import time
+from typing import Any, Callable
+
 import httpx
 import secrets
-import time
+from jose import jwt, JWTError
 
-from src.core.users.iface import OAuthProviderABC
+from src.core.users.iface import OAuthProviderABC, OAuthStateStoreABC
 from src.core.users.types import UserSSOInfo
 from src.config import settings
 from src.application.provider import Registerable, Provider, Singleton
 
+try:
+    import h2
+except ImportError:    # httpx[http2]; без него клиент работает по HTTP/1.1
+    h2 = None
+
+
+class CachedJSONDocument:
+    """
+    JSON документ по URL (discovery OpenID, JWKS), который хранится до истечения max-age из Cache-Control.
+    Одновременные запросы при пустом кэше ждут одной загрузки.
+    """
+
+    MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+    __value: dict[str, Any] | None
+    __url: str | None
+    __expires_at: float
+    __fetched_at: float
+    __lock: asyncio.Lock
+    __clock: Callable[[], float]
+    default_ttl: float
+    min_refresh_interval: float
+
+    def __init__(self, default_ttl: float = 3600, min_refresh_interval: float = 60,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        :param default_ttl: Время жизни, если в ответе нет max-age.
+        :param min_refresh_interval: Как часто можно принудительно обновлять документ.
+        """
+        self.default_ttl = default_ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.__value = None
+        self.__url = None
+        self.__expires_at = 0
+        self.__fetched_at = float("-inf")
+        self.__lock = asyncio.Lock()
+        self.__clock = clock
+
+    def __is_fresh(self, url: str) -> bool:
+        return self.__value is not None and self.__url == url and self.__clock() < self.__expires_at
+
+    async def get_async(self, client: httpx.AsyncClient, url: str, refresh: bool = False) -> dict[str, Any]:
+        """
+        :param refresh: Загрузить заново, даже если срок не истек (например, в JWKS нет ключа из токена).
+            Не чаще min_refresh_interval, чтобы токены с неизвестным kid не превращались в запросы к провайдеру.
+        """
+        if not refresh and self.__is_fresh(url):
+            return self.__value
+
+        async with self.__lock:
+            # пока ждали блокировку, документ мог загрузить другой запрос
+            if self.__url == url and self.__value is not None:
+                if not refresh and self.__is_fresh(url):
+                    return self.__value
+                if refresh and self.__clock() - self.__fetched_at < self.min_refresh_interval:
+                    return self.__value
+
+            response = await client.get(url)
+            response.raise_for_status()
+
+            max_age = self.MAX_AGE_PATTERN.search(response.headers.get("cache-control", ""))
+            ttl = int(max_age.group(1)) if max_age else self.default_ttl
+            self.__value = response.json()
+            self.__url = url
+            self.__fetched_at = self.__clock()
+            self.__expires_at = self.__fetched_at + ttl
+            return self.__value
+
 
 class GoogleOAuth(OAuthProviderABC, Registerable):
 
     @classmethod
     async def on_build_provider(cls, provider: Provider):
-        google_oauth = cls()
+        google_oauth = cls(provider[OAuthStateStoreABC])
         provider.register(OAuthProviderABC, Singleton(google_oauth))
         provider.register(GoogleOAuth, Singleton(google_oauth))
 
-    AUTH_STATE_TTL = 600
+    AUTH_STATE_TTL = settings.OAUTH_STATE_TTL_SECONDS
+    DISCOVERY_URL = "https://accounts.google.com/.well-known/openid-configuration"
+    ISSUERS = ["https://accounts.google.com", "accounts.google.com"]
+    ID_TOKEN_LEEWAY_SECONDS = 30    # расхождение часов с серверами Google
 
-    def __init__(self):
+    def __init__(self, state_store: OAuthStateStoreABC, client: httpx.AsyncClient | None = None):
+        """
+        :param client: HTTP клиент. По умолчанию создается свой, закрывается в close_async.
+        """
         self.client_id = settings.GOOGLE_CLIENT_ID
         self.client_secret = settings.GOOGLE_CLIENT_SECRET
         self.redirect_uri = f"{settings.BACKEND_URL}/auth/google/callback"
-        self.token_url = "https://oauth2.googleapis.com/token"
-        self.user_info_url = "https://www.googleapis.com/oauth2/v3/userinfo"
-        self.states = {}
-
-    def generate_state(self) -> str:
+        self.state_store = state_store
+        # один клиент на процесс: соединения с Google переиспользуются между входами без нового TLS handshake
+        self.client = client or httpx.AsyncClient(
+            http2=h2 is not None,
+            timeout=httpx.Timeout(settings.GOOGLE_OAUTH_TIMEOUT_SECONDS),
+            limits=httpx.Limits(max_keepalive_connections=settings.GOOGLE_OAUTH_MAX_KEEPALIVE_CONNECTIONS,
+                                keepalive_expiry=settings.GOOGLE_OAUTH_KEEPALIVE_SECONDS),
+        )
+        self.discovery = CachedJSONDocument()
+        self.jwks = CachedJSONDocument()
+
+    async def close_async(self):
+        await self.client.aclose()
+
+    async def generate_state(self) -> str:
         state = secrets.token_urlsafe(32)
-        self.states[state] = time.time()
+        await self.state_store.add(state, self.AUTH_STATE_TTL)
         return state
 
-    def validate_state(self, state: str) -> bool:
-        if state not in self.states:
-            return False
-
-        created_time = self.states[state]
-        if time.time() - created_time >= self.AUTH_STATE_TTL:
-            del self.states[state]
-            return False
-
-        del self.states[state]
-        return True
+    async def validate_state(self, state: str) -> bool:
+        return await self.state_store.consume(state)
 
     def get_authorization_url(self, state: str) -> str:
         base_url = "https://accounts.google.com/o/oauth2/v2/auth"
@@ -56,47 +136,77 @@ class GoogleOAuth(OAuthProviderABC, Registerable):
         query_string = "&".join([f"{k}={v}" for k, v in params.items()])
         return f"{base_url}?{query_string}"
 
-    async def get_user_info(self, code: str) -> UserSSOInfo:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            token_response = await client.post(
-                self.token_url,
-                data={
-                    "client_id": self.client_id,
-                    "client_secret": self.client_secret,
-                    "code": code,
-                    "grant_type": "authorization_code",
-                    "redirect_uri": self.redirect_uri,
-                },
-                headers={
-                    "Content-Type": "application/x-www-form-urlencoded"
-                }
-            )
-
-            tokens = token_response.json()
-            access_token = tokens.get("access_token")
+    async def __get_signing_key(self, jwks_uri: str, id_token: str) -> dict[str, Any]:
+        try:
+            kid = jwt.get_unverified_header(id_token).get("kid")
+        except JWTError as e:
+            raise ValueError(f"Invalid id_token: {e}") from e
+
+        for refresh in (False, True):
+            # Google меняет ключи: неизвестный kid - повод перечитать JWKS до истечения срока
+            jwks = await self.jwks.get_async(self.client, jwks_uri, refresh=refresh)
+            for key in jwks.get("keys", []):
+                if key.get("kid") == kid:
+                    return key
+        raise ValueError(f"Unknown id_token signing key: {kid}")
+
+    async def __verify_id_token(self, jwks_uri: str, id_token: str, access_token: str) -> dict[str, Any]:
+        key = await self.__get_signing_key(jwks_uri, id_token)
+        try:
+            return jwt.decode(id_token, key,
+                              algorithms=[key.get("alg", "RS256")],
+                              audience=self.client_id,
+                              issuer=self.ISSUERS,
+                              access_token=access_token,
+                              options={"leeway": self.ID_TOKEN_LEEWAY_SECONDS})
+        except JWTError as e:
+            raise ValueError(f"Invalid id_token: {e}") from e
 
-            if not access_token:
-                raise ValueError(f"Google token error: {tokens}")
-
-            user_info_response = await client.get(
-                self.user_info_url,
+    async def get_user_info(self, code: str) -> UserSSOInfo:
+        discovery = await self.discovery.get_async(self.client, self.DISCOVERY_URL)
+
+        token_response = await self.client.post(
+            discovery["token_endpoint"],
+            data={
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+                "code": code,
+                "grant_type": "authorization_code",
+                "redirect_uri": self.redirect_uri,
+            },
+            headers={
+                "Content-Type": "application/x-www-form-urlencoded"
+            }
+        )
+
+        tokens = token_response.json()
+        access_token = tokens.get("access_token")
+
+        if not access_token:
+            raise ValueError(f"Google token error: {tokens}")
+
+        id_token = tokens.get("id_token")
+        if id_token:
+            # id_token получен напрямую от Google по TLS, подпись проверяется ключами из кэша JWKS без запроса userinfo
+            user_info = await self.__verify_id_token(discovery["jwks_uri"], id_token, access_token)
+        else:
+            user_info_response = await self.client.get(
+                discovery["userinfo_endpoint"],
                 headers={"Authorization": f"Bearer {access_token}"}
             )
-
             user_info = user_info_response.json()
 
-            if not isinstance(user_info, dict):
-                raise ValueError(f"Invalid userinfo response: {user_info}")
-
-            if "email" not in user_info or "sub" not in user_info:
-                raise ValueError(f"Incomplete userinfo: {user_info}")
+        if not isinstance(user_info, dict):
+            raise ValueError(f"Invalid userinfo response: {user_info}")
 
-            return UserSSOInfo(
-                email=user_info["email"],
-                sso_provider="google",
-                sso_id=user_info["sub"],
-                first_name=user_info.get("given_name", ""),
-                last_name=user_info.get("family_name", ""),
-                avatar_url=user_info.get("picture"),
-            )
+        if "email" not in user_info or "sub" not in user_info:
+            raise ValueError(f"Incomplete userinfo: {user_info}")
 
+        return UserSSOInfo(
+            email=user_info["email"],
+            sso_provider="google",
+            sso_id=user_info["sub"],
+            first_name=user_info.get("given_name", ""),
+            last_name=user_info.get("family_name", ""),
+            avatar_url=user_info.get("picture"),
+        )
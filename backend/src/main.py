@@ -13,15 +13,13 @@ from src.api.auth import router as auth_router
 from src.api.profile import router as profile_router
 from src.api.utils import router as utils_router
 from src.application import provider
+from src.application.shutdown import shutdown_async
 
 load_dotenv()
 
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
-    from src.storage.sql.connection import create_tables
-    await create_tables()
-
     provider_instance = await provider.build_async()
     provider.global_provider = provider_instance
 
@@ -35,6 +33,8 @@ async def lifespan(_app: FastAPI):
 
     yield
 
+    await shutdown_async(provider_instance)
+
 
 app = FastAPI(lifespan=lifespan)
 
@@ -0,0 +1,141 @@
+"""
+Кэширующие обертки над репозиториями. Реализуют те же интерфейсы и делегируют всё исходному репозиторию.
+"""
+
+import copy
+
+from src.core.laws.iface import LawDocsRepositoryABC
+from src.core.laws.types import LawFragment
+from src.core.templates.iface import TemplatesRepositoryABC
+from src.core.templates.types import Template
+from src.core.users.iface import UserRepositoryABC
+from src.core.users.types import UserInfo, UserSSOInfo
+from src.storage.cache.search_cache import VersionedSearchCache, normalize_query
+from src.storage.cache.ttl_cache import UserInfoCache
+
+
+class CachedLawDocsRepository(LawDocsRepositoryABC):
+
+    __inner: LawDocsRepositoryABC
+    __cache: VersionedSearchCache
+    __collection: str
+
+    def __init__(self, inner: LawDocsRepositoryABC, cache: VersionedSearchCache, collection: str):
+        self.__inner = inner
+        self.__cache = cache
+        self.__collection = collection
+
+    async def find_fragments_async(self, query: str, n_results: int | None = None) -> list[LawFragment]:
+        key = ("find", normalize_query(query), n_results)
+        cached = self.__cache.get(self.__collection, key)
+        if cached is not None:
+            return list(cached)
+
+        version = self.__cache.version(self.__collection)
+        result = await self.__inner.find_fragments_async(query, n_results)
+        # LawFragment frozen, достаточно скопировать список
+        self.__cache.put(self.__collection, version, key, tuple(result))
+        return result
+
+    async def list_fragments_async(self) -> list[LawFragment]:
+        return await self.__inner.list_fragments_async()
+
+    async def add_of_update_fragment_async(self, fragment: LawFragment):
+        try:
+            await self.__inner.add_of_update_fragment_async(fragment)
+        finally:
+            # запись могла частично пройти даже при ошибке
+            self.__cache.bump_version(self.__collection)
+
+    async def delete_fragment_async(self, fragment_id: str):
+        try:
+            await self.__inner.delete_fragment_async(fragment_id)
+        finally:
+            self.__cache.bump_version(self.__collection)
+
+
+class CachedTemplatesRepository(TemplatesRepositoryABC):
+    """
+    В TemplatesRepositoryABC нет методов записи,
+    поэтому код, изменяющий коллекцию шаблонов, должен сам вызывать invalidate.
+    """
+
+    __inner: TemplatesRepositoryABC
+    __cache: VersionedSearchCache
+    __collection: str
+
+    def __init__(self, inner: TemplatesRepositoryABC, cache: VersionedSearchCache, collection: str):
+        self.__inner = inner
+        self.__cache = cache
+        self.__collection = collection
+
+    def invalidate(self):
+        self.__cache.bump_version(self.__collection)
+
+    async def get_template_async(self, tpl_id: str) -> Template:
+        key = ("get", tpl_id)
+        cached = self.__cache.get(self.__collection, key)
+        if cached is not None:
+            # Template изменяемый, наружу отдаются только копии
+            return copy.deepcopy(cached)
+
+        version = self.__cache.version(self.__collection)
+        result = await self.__inner.get_template_async(tpl_id)
+        self.__cache.put(self.__collection, version, key, copy.deepcopy(result))
+        return result
+
+    async def find_templates_async(self,
+                                   query: str,
+                                   exclude_ids: list[str] | None = None,
+                                   n_results: int | None = None) -> list[Template]:
+        key = ("find", normalize_query(query), tuple(sorted(exclude_ids or ())), n_results)
+        cached = self.__cache.get(self.__collection, key)
+        if cached is not None:
+            return copy.deepcopy(list(cached))
+
+        version = self.__cache.version(self.__collection)
+        result = await self.__inner.find_templates_async(query, exclude_ids, n_results)
+        self.__cache.put(self.__collection, version, key, tuple(copy.deepcopy(result)))
+        return result
+
+
+class CachedUserRepository(UserRepositoryABC):
+    """
+    Кэширует get_by_id, который get_current_user вызывает на каждый запрос.
+    Отсутствующие пользователи не кэшируются. Любая запись сбрасывает запись пользователя в кэше.
+    """
+
+    __inner: UserRepositoryABC
+    __cache: UserInfoCache
+
+    def __init__(self, inner: UserRepositoryABC, cache: UserInfoCache):
+        self.__inner = inner
+        self.__cache = cache
+
+    async def get_by_id(self, user_id: str) -> UserInfo | None:
+        cached = self.__cache.get(user_id)
+        if cached is not None:
+            # UserInfo изменяемый, наружу отдаются только копии
+            return cached.model_copy()
+
+        generation = self.__cache.generation
+        result = await self.__inner.get_by_id(user_id)
+        if result is not None:
+            self.__cache.put(user_id, result.model_copy(), generation)
+        return result
+
+    async def get_by_email(self, email: str) -> UserInfo | None:
+        return await self.__inner.get_by_email(email)
+
+    async def get_by_sso(self, sso_provider: str, sso_id: str) -> UserInfo | None:
+        return await self.__inner.get_by_sso(sso_provider, sso_id)
+
+    async def create(self, user_data: UserSSOInfo) -> UserInfo:
+        user = await self.__inner.create(user_data)
+        self.__cache.invalidate(str(user.id))
+        return user
+
+    async def get_or_create(self, user_data: UserSSOInfo) -> UserInfo:
+        user = await self.__inner.get_or_create(user_data)
+        self.__cache.invalidate(str(user.id))
+        return user
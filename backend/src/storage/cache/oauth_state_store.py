@@ -0,0 +1,37 @@
+from src.config import settings
+from src.core.users.iface import OAuthStateStoreABC
+from src.application.provider import Registerable, Provider, Singleton
+from src.storage.cache.ttl_cache import TTLCache
+
+
+class InMemoryOAuthStateStore(OAuthStateStoreABC, Registerable):
+    """
+    State OAuth в памяти процесса. Подходит только для одного воркера: callback, пришедший в другой воркер, не пройдет.
+    Размер ограничен max_entries: при переполнении вытесняются самые старые значения - брошенные входы.
+    """
+
+    __REG_ORDER__ = -1
+
+    @classmethod
+    async def on_build_provider(cls, provider: Provider):
+        if settings.OAUTH_STATE_STORE != "memory":
+            return
+        provider.register(OAuthStateStoreABC, Singleton(cls(settings.OAUTH_STATE_MAX_ENTRIES,
+                                                            settings.OAUTH_STATE_TTL_SECONDS)))
+
+    __states: TTLCache[bool]
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.__states = TTLCache(max_entries, ttl)
+
+    async def add(self, state: str, ttl: float):
+        self.__states.put(state, True, self.__states.generation, ttl)
+
+    async def consume(self, state: str) -> bool:
+        return self.__states.pop(state) is not None
+
+    async def sweep(self) -> int:
+        return self.__states.sweep()
+
+    def __len__(self) -> int:
+        return len(self.__states)
@@ -0,0 +1,111 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+import re
+from typing import Any, Hashable
+
+from src.config import settings
+from src.application.provider import Registerable, Provider, Singleton
+
+
+@dataclass
+class SearchCacheStats:
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+    """
+    Сколько раз менялась версия коллекции.
+    """
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Приводит запрос к виду, в котором "почти одинаковые" запросы совпадают:
+    регистр, ё/е, пунктуация и лишние пробелы не влияют на ключ.
+    """
+    query = query.casefold().replace("ё", "е")
+    query = _PUNCTUATION_RE.sub(" ", query)
+    return _WHITESPACE_RE.sub(" ", query).strip()
+
+
+class VersionedSearchCache:
+    """
+    LRU кэш результатов поиска с версией на каждую коллекцию.
+    Версия входит в ключ, поэтому после bump_version старые записи сразу перестают находиться.
+    Версии живут в памяти процесса: запись через другой воркер этот кэш не инвалидирует.
+    """
+
+    __entries: OrderedDict[tuple[str, int, Hashable], Any]
+    __versions: dict[str, int]
+    __stats: dict[str, SearchCacheStats]
+    max_entries: int
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.__entries = OrderedDict()
+        self.__versions = {}
+        self.__stats = {}
+
+    def __get_stats(self, collection: str) -> SearchCacheStats:
+        return self.__stats.setdefault(collection, SearchCacheStats())
+
+    def version(self, collection: str) -> int:
+        return self.__versions.get(collection, 0)
+
+    def bump_version(self, collection: str):
+        """
+        Вызывается после любой записи в коллекцию. Удаляет все записи старых версий.
+        """
+        self.__versions[collection] = self.version(collection) + 1
+        self.__get_stats(collection).invalidations += 1
+
+        for entry_key in [k for k in self.__entries.keys() if k[0] == collection]:
+            del self.__entries[entry_key]
+
+    def get(self, collection: str, key: Hashable) -> Any | None:
+        entry_key = (collection, self.version(collection), key)
+        value = self.__entries.get(entry_key, None)
+        stats = self.__get_stats(collection)
+        if value is None:
+            stats.misses += 1
+            return None
+
+        self.__entries.move_to_end(entry_key)
+        stats.hits += 1
+        return value
+
+    def put(self, collection: str, version: int, key: Hashable, value: Any):
+        """
+        :param version: Версия коллекции на момент начала запроса.
+            Если за время запроса была запись, результат не сохраняется.
+        """
+        if version != self.version(collection) or self.max_entries <= 0:
+            return
+
+        entry_key = (collection, version, key)
+        self.__entries[entry_key] = value
+        self.__entries.move_to_end(entry_key)
+        while len(self.__entries) > self.max_entries:
+            self.__entries.popitem(last=False)
+
+    def stats(self) -> dict[str, SearchCacheStats]:
+        return dict(self.__stats)
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+
+class SearchCacheRegistrator(Registerable):
+    __REG_ORDER__ = -1
+
+    @classmethod
+    async def on_build_provider(cls, provider: Provider):
+        provider.register(VersionedSearchCache, Singleton(VersionedSearchCache(settings.SEARCH_CACHE_MAX_ENTRIES)))
@@ -0,0 +1,118 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from src.config import settings
+from src.core.users.types import UserInfo
+from src.application.provider import Registerable, Provider, Singleton
+from src.storage.cache.search_cache import SearchCacheStats
+
+
+class TTLCache[V]:
+    """
+    LRU кэш ограниченного размера, записи которого устаревают через ttl секунд.
+    Как и VersionedSearchCache, живет в памяти процесса: запись через другой воркер видна здесь только после ttl.
+    """
+
+    __entries: OrderedDict[Hashable, tuple[float, V]]
+    __generation: int
+    __clock: Callable[[], float]
+    max_entries: int
+    ttl: float
+    stats: SearchCacheStats
+
+    def __init__(self, max_entries: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.__entries = OrderedDict()
+        self.__generation = 0
+        self.__clock = clock
+        self.stats = SearchCacheStats()
+
+    @property
+    def generation(self) -> int:
+        """
+        Номер инвалидации. Запоминается перед чтением из источника и передается в put.
+        """
+        return self.__generation
+
+    def get(self, key: Hashable) -> V | None:
+        entry = self.__entries.get(key)
+        if entry is None or entry[0] <= self.__clock():
+            if entry is not None:
+                del self.__entries[key]
+            self.stats.misses += 1
+            return None
+
+        self.__entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, value: V, generation: int, expires_in: float | None = None):
+        """
+        :param generation: generation на момент начала чтения. Если за время чтения была инвалидация,
+            значение могло устареть и не сохраняется.
+        :param expires_in: Время жизни записи, если оно меньше ttl.
+        """
+        if generation != self.__generation or self.max_entries <= 0:
+            return
+
+        ttl = self.ttl if expires_in is None else min(self.ttl, expires_in)
+        if ttl <= 0:
+            return
+
+        self.__entries[key] = (self.__clock() + ttl, value)
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.max_entries:
+            self.__entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        self.__generation += 1
+        self.stats.invalidations += 1
+        self.__entries.pop(key, None)
+
+    def pop(self, key: Hashable) -> V | None:
+        """
+        Извлекает запись для однократного использования. Это не инвалидация: generation не меняется.
+        """
+        entry = self.__entries.pop(key, None)
+        if entry is None or entry[0] <= self.__clock():
+            self.stats.misses += 1
+            return None
+
+        self.stats.hits += 1
+        return entry[1]
+
+    def sweep(self) -> int:
+        """
+        Удаляет устаревшие записи, которые больше не запрашивались и иначе занимали бы место до вытеснения.
+        :return: Количество удаленных записей.
+        """
+        now = self.__clock()
+        expired = [key for key, (expires_at, _) in self.__entries.items() if expires_at <= now]
+        for key in expired:
+            del self.__entries[key]
+        return len(expired)
+
+    def clear(self):
+        self.__generation += 1
+        self.stats.invalidations += 1
+        self.__entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+
+class UserInfoCache(TTLCache[UserInfo]):
+    """
+    Пользователи по id для get_current_user. Заполняется и инвалидируется через CachedUserRepository.
+    """
+
+
+class UserInfoCacheRegistrator(Registerable):
+    __REG_ORDER__ = -1
+
+    @classmethod
+    async def on_build_provider(cls, provider: Provider):
+        provider.register(UserInfoCache, Singleton(UserInfoCache(settings.USER_CACHE_MAX_ENTRIES,
+                                                                 settings.USER_CACHE_TTL_SECONDS)))
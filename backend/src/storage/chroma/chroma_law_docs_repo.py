@@ -3,6 +3,8 @@ import chromadb
 from src.core.laws.iface import LawDocsRepositoryABC
 from src.core.laws.types import LawFragment
 from src.storage.chroma.base_chroma_repository import BaseChromaRepository
+from src.storage.cache.search_cache import VersionedSearchCache
+from src.storage.cache.cached_repositories import CachedLawDocsRepository
 from src.application.provider import Registerable, Singleton, Provider
 
 
@@ -13,12 +15,17 @@ class ChromaLawDocsRepository(BaseChromaRepository, LawDocsRepositoryABC, Regist
         client = provider[chromadb.AsyncClientAPI]
         laws_repo = cls(client)
         await laws_repo.init_async()
+
+        cache = provider[VersionedSearchCache]
+        if cache.max_entries > 0:
+            laws_repo = CachedLawDocsRepository(laws_repo, cache, cls._COLLECTION_NAME)
         provider.register(LawDocsRepositoryABC, Singleton(laws_repo))
 
     _COLLECTION_NAME = "laws"
+    _N_RESULTS = 5
 
-    async def find_fragments_async(self, query: str) -> list[LawFragment]:
-        query_result = await self._collection.query(query_texts=[query], n_results=5)
+    async def find_fragments_async(self, query: str, n_results: int | None = None) -> list[LawFragment]:
+        query_result = await self._collection.query(query_texts=[query], n_results=n_results or self._N_RESULTS)
         result = []
 
         for frag_id, doc, meta in zip(query_result["ids"][0],
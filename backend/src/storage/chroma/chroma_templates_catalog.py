@@ -0,0 +1,172 @@
+import asyncio
+import copy
+import logging
+from dataclasses import dataclass
+
+import chromadb
+import numpy as np
+from chromadb.api.types import EmbeddingFunction
+from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+
+from src.core.templates.iface import TemplatesRepositoryABC
+from src.core.templates.types import Template
+from src.storage.chroma.chroma_templates_repo import ChromaTemplatesRepository
+
+
+@dataclass(frozen=True)
+class _CatalogSnapshot:
+    templates: dict[str, Template]
+    ids: tuple[str, ...]
+    """
+    Порядок строк в embeddings
+    """
+    embeddings: np.ndarray
+
+
+def _get_distance_space(collection) -> str:
+    """
+    Метрика коллекции, чтобы ранжирование в памяти совпадало с ранжированием Chroma.
+    """
+    config = getattr(collection, "configuration_json", None) or {}
+    for index in ("hnsw", "spann"):
+        space = (config.get(index) or {}).get("space")
+        if space:
+            return space
+    return (getattr(collection, "metadata", None) or {}).get("hnsw:space", "l2")
+
+
+class ChromaTemplatesCatalog(TemplatesRepositoryABC):
+    """
+    Каталог шаблонов в памяти процесса. Один раз загружает из Chroma все шаблоны вместе с эмбеддингами
+    и дальше отвечает на get и поиск ближайших без обращений к Chroma.
+    Шаблонов мало и меняются они редко, поэтому поиск - полный перебор по матрице эмбеддингов.
+
+    Обновляется по invalidate (следующее обращение перечитает коллекцию) и раз в refresh_interval секунд.
+    """
+
+    __client: chromadb.AsyncClientAPI
+    __collection_name: str
+    __embedding_function: EmbeddingFunction
+    __refresh_interval: float
+    __snapshot: _CatalogSnapshot | None
+    __space: str
+    __is_stale: bool
+    __lock: asyncio.Lock
+    __refresh_task: asyncio.Task | None
+    __logger: logging.Logger
+
+    _N_RESULTS = ChromaTemplatesRepository._N_RESULTS
+
+    def __init__(self,
+                 client: chromadb.AsyncClientAPI,
+                 collection_name: str = ChromaTemplatesRepository._COLLECTION_NAME,
+                 embedding_function: EmbeddingFunction | None = None,
+                 refresh_interval: float = 0):
+        """
+        :param embedding_function: Должен совпадать с векторайзером коллекции.
+            По умолчанию тот же, что использует клиент Chroma.
+        :param refresh_interval: Период фонового перечитывания коллекции в секундах. 0 - только по invalidate.
+        """
+        self.__client = client
+        self.__collection_name = collection_name
+        self.__embedding_function = embedding_function or DefaultEmbeddingFunction()
+        self.__refresh_interval = refresh_interval
+        self.__snapshot = None
+        self.__space = "l2"
+        self.__is_stale = True
+        self.__lock = asyncio.Lock()
+        self.__refresh_task = None
+        self.__logger = logging.getLogger(self.__class__.__name__)
+
+    async def init_async(self):
+        await self.refresh_async()
+        if self.__refresh_interval > 0:
+            self.__refresh_task = asyncio.create_task(self.__refresh_loop())
+
+    async def close_async(self):
+        if self.__refresh_task:
+            self.__refresh_task.cancel()
+            try:
+                await self.__refresh_task
+            except asyncio.CancelledError:
+                pass
+            self.__refresh_task = None
+
+    def invalidate(self):
+        """
+        Уведомление об изменении коллекции шаблонов. Следующее обращение перечитает каталог.
+        """
+        self.__is_stale = True
+
+    async def refresh_async(self):
+        async with self.__lock:
+            collection = await self.__client.get_or_create_collection(self.__collection_name)
+            # флаг сбрасывается до чтения: invalidate во время загрузки вызовет еще одно обновление
+            self.__is_stale = False
+            result = await collection.get(include=["metadatas", "embeddings"])
+
+            templates = {}
+            for tpl_id, meta in zip(result["ids"], result["metadatas"]):
+                templates[tpl_id] = ChromaTemplatesRepository._from_db_type(tpl_id, meta)
+
+            embeddings = result["embeddings"]
+            matrix = np.asarray(embeddings, dtype=np.float32) if embeddings is not None and len(embeddings) else np.zeros((0, 0), dtype=np.float32)
+
+            self.__space = _get_distance_space(collection)
+            self.__snapshot = _CatalogSnapshot(templates, tuple(result["ids"]), matrix)
+            self.__logger.info("Loaded %s templates (space: %s)", len(templates), self.__space)
+
+    async def __refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.__refresh_interval)
+            try:
+                await self.refresh_async()
+            except Exception as e:
+                # оставляем предыдущий снимок, попробуем в следующий раз
+                self.__logger.warning("Failed to refresh templates catalog", exc_info=e)
+
+    async def __get_snapshot(self) -> _CatalogSnapshot:
+        if self.__is_stale or self.__snapshot is None:
+            await self.refresh_async()
+        return self.__snapshot
+
+    async def get_template_async(self, tpl_id: str) -> Template:
+        snapshot = await self.__get_snapshot()
+        if tpl_id not in snapshot.templates:
+            raise KeyError(tpl_id)
+        return copy.deepcopy(snapshot.templates[tpl_id])
+
+    def __distances(self, matrix: np.ndarray, query: np.ndarray) -> np.ndarray:
+        if self.__space == "cosine":
+            norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+            return 1 - (matrix @ query) / np.where(norms == 0, 1, norms)
+        if self.__space == "ip":
+            return 1 - matrix @ query
+        return ((matrix - query) ** 2).sum(axis=1)
+
+    async def find_templates_async(self,
+                                   query: str,
+                                   exclude_ids: list[str] | None = None,
+                                   n_results: int | None = None) -> list[Template]:
+        snapshot = await self.__get_snapshot()
+        if not snapshot.ids:
+            return []
+
+        # векторизация - CPU работа на ONNX, не держим event loop
+        embedded = await asyncio.to_thread(self.__embedding_function, [query])
+        query_vector = np.asarray(embedded[0], dtype=np.float32)
+
+        distances = self.__distances(snapshot.embeddings, query_vector)
+        excluded = set(exclude_ids or ())
+        limit = n_results or self._N_RESULTS
+
+        result = []
+        for index in np.argsort(distances, kind="stable"):
+            tpl_id = snapshot.ids[index]
+            if tpl_id in excluded:
+                continue
+            result.append(copy.deepcopy(snapshot.templates[tpl_id]))
+            if len(result) >= limit:
+                break
+
+        return result
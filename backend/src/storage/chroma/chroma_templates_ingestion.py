@@ -0,0 +1,185 @@
+"""
+Загрузка шаблонов: для каждого шаблона из коллекции Chroma открывает его DOCX, извлекает текст и переменные Jinja,
+сверяет переменные с объявленными полями и сохраняет текст и sha256 файла в метаданные шаблона.
+После этого подграфы берут текст для промптов из Template.text и не открывают DOCX.
+Опционально генерирует слабой моделью краткие описания шаблонов (Template.digest).
+
+Запускается командой src.commands.ingest_templates и автоматически при изменении файлов шаблонов (TemplatesReloader).
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+
+import chromadb
+
+from src.config import settings
+from src.core.llm.iface import LLMABC
+from src.core.llm import use_cases as llm_use_cases
+from src.core.results.rerender_service import ResultsRerenderService
+from src.core.templates.content_service import TemplateContentService
+from src.core.templates.iface import TemplatesRepositoryABC, TemplatesWatcherABC
+from src.core.templates.types import Template, TemplateContentInfo, TemplateFileChange
+from src.storage.cache.cached_repositories import CachedTemplatesRepository
+from src.storage.chroma.chroma_templates_catalog import ChromaTemplatesCatalog
+from src.storage.chroma.chroma_templates_repo import ChromaTemplatesRepository
+from src.application.provider import Registerable, Provider, Singleton
+
+
+@dataclass
+class TemplateIngestionResult:
+    template: Template
+    content: TemplateContentInfo | None = None
+    errors: list[str] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+    saved: bool = False
+    digest: str | None = None
+    """
+    Сгенерированное в этом запуске краткое описание.
+    """
+
+    def format(self) -> str:
+        status = "ERROR" if self.errors else ("saved" if self.saved else "ok")
+        lines = [f"[{status}] {self.template.id} ({self.template.storage_filename})"]
+        if self.digest:
+            lines += [f"    digest: {line}" for line in self.digest.splitlines()]
+        lines += [f"    error: {e}" for e in self.errors]
+        lines += [f"    warning: {w}" for w in self.warnings]
+        return "\n".join(lines)
+
+
+def check_placeholders(template: Template, placeholders: frozenset[str]) -> tuple[list[str], list[str]]:
+    """
+    Сверяет переменные Jinja в DOCX с объявленными полями шаблона.
+    :return: (ошибки, предупреждения). Необъявленная переменная - ошибка: LLM не получит для нее инструкций
+        и в документе останется пустое место. Объявленное, но неиспользуемое поле - только предупреждение.
+    """
+    declared = set(template.fields.keys())
+    errors = [f"placeholder '{name}' is not declared in fields" for name in sorted(placeholders - declared)]
+    warnings = [f"field '{key}' is not used in the document" for key in sorted(declared - placeholders)]
+    return errors, warnings
+
+
+async def ingest_templates_async(repository: ChromaTemplatesRepository,
+                                 content_service: TemplateContentService,
+                                 dry_run: bool = False,
+                                 force: bool = False,
+                                 llm: LLMABC | None = None,
+                                 filenames: set[str] | None = None) -> tuple[list[TemplateIngestionResult], list[str]]:
+    """
+    :param force: Перезаписать текст, даже если хеш файла не изменился.
+    :param llm: Если передан, генерирует краткие описания для шаблонов, у которых его нет или изменился файл.
+    :param filenames: Обработать только шаблоны с этими storage_filename. None - все.
+    :return: Результаты по шаблонам и файлы из хранилища, которые не привязаны ни к одному шаблону.
+    """
+    templates = await repository.list_templates_async()
+    results = []
+
+    for template in templates:
+        if filenames is not None and template.storage_filename not in filenames:
+            continue
+
+        result = TemplateIngestionResult(template)
+        results.append(result)
+        try:
+            result.content = await asyncio.to_thread(content_service.analyze, template.storage_filename)
+        except FileNotFoundError:
+            result.errors.append("template file not found")
+            continue
+        except Exception as e:
+            result.errors.append(f"failed to parse template: {e!r}")
+            continue
+
+        result.errors, result.warnings = check_placeholders(template, result.content.placeholders)
+        if result.errors or dry_run:
+            continue
+        content_changed = template.content_hash != result.content.content_hash or template.text is None
+        if force or content_changed:
+            await repository.save_content_async(template.id, result.content.text, result.content.content_hash)
+            result.saved = True
+
+        if llm is not None and (force or content_changed or not template.digest):
+            result.digest = await llm_use_cases.generate_template_digest_async(llm, template, result.content.text)
+            await repository.save_digest_async(template.id, result.digest)
+
+    referenced = {t.storage_filename for t in templates}
+    orphans = [f for f in content_service.templates_storage.list_template_files() if f not in referenced]
+    return results, orphans
+
+
+class TemplatesReloader(Registerable):
+    """
+    Подписывается на TemplatesWatcherABC и без перезапуска применяет изменения файлов шаблонов:
+    выбрасывает разобранный DOCX из кэша, заново загружает текст (и краткое описание в режиме digest)
+    и сбрасывает каталог или кэш поиска шаблонов.
+    С RESULTS_RERENDER_ON_TEMPLATE_CHANGE заново генерирует готовые документы по измененным шаблонам.
+
+    Кэши процессов пула рендеринга сбросить отсюда нельзя, но они сами проверяют размер и mtime файла.
+    При нескольких воркерах uvicorn загрузку выполнит каждый из них, запись при этом идемпотентна.
+    """
+    __REG_ORDER__ = 3
+
+    @classmethod
+    async def on_build_provider(cls, provider: Provider):
+        if TemplatesWatcherABC not in provider:
+            return
+
+        repository = ChromaTemplatesRepository(provider[chromadb.AsyncClientAPI])
+        await repository.init_async()
+        llm = provider[LLMABC] if settings.TEMPLATES_SELECTION_MODE == "digest" else None
+
+        rerender_service = provider[ResultsRerenderService] if settings.RESULTS_RERENDER_ON_TEMPLATE_CHANGE else None
+
+        reloader = cls(repository, provider[TemplateContentService], provider[TemplatesRepositoryABC], llm, rerender_service)
+        provider[TemplatesWatcherABC].subscribe(reloader.on_changes_async)
+        provider.register(TemplatesReloader, Singleton(reloader))
+
+    __repository: ChromaTemplatesRepository
+    __content_service: TemplateContentService
+    __templates: TemplatesRepositoryABC
+    __llm: LLMABC | None
+    __rerender_service: ResultsRerenderService | None
+    __logger: logging.Logger
+
+    def __init__(self,
+                 repository: ChromaTemplatesRepository,
+                 content_service: TemplateContentService,
+                 templates: TemplatesRepositoryABC,
+                 llm: LLMABC | None = None,
+                 rerender_service: ResultsRerenderService | None = None):
+        """
+        :param templates: Репозиторий, через который шаблоны читает приложение (каталог или кэш поверх Chroma).
+        :param rerender_service: Если передан, документы по измененным шаблонам генерируются заново.
+        """
+        self.__repository = repository
+        self.__content_service = content_service
+        self.__templates = templates
+        self.__llm = llm
+        self.__rerender_service = rerender_service
+        self.__logger = logging.getLogger(self.__class__.__name__)
+
+    async def on_changes_async(self, changes: list[TemplateFileChange]):
+        filenames = {change.filename for change in changes}
+        for filename in filenames:
+            self.__content_service.invalidate(filename)
+
+        try:
+            results, _ = await ingest_templates_async(self.__repository, self.__content_service,
+                                                      llm=self.__llm, filenames=filenames)
+        finally:
+            # даже если загрузка упала, старый текст в каталоге мог устареть
+            if isinstance(self.__templates, (ChromaTemplatesCatalog, CachedTemplatesRepository)):
+                self.__templates.invalidate()
+
+        for result in results:
+            if result.errors:
+                self.__logger.warning("Template %s was not reloaded:\n%s", result.template.id, result.format())
+            elif result.saved:
+                self.__logger.info("Template %s reloaded", result.template.id)
+
+        # файлы, которые загрузились без ошибок и действительно изменились
+        changed_files = {r.template.storage_filename for r in results if r.saved}
+        if self.__rerender_service and changed_files:
+            progress = await self.__rerender_service.rerender_async(changed_files)
+            if progress.failed_issue_ids:
+                self.__logger.warning("Documents of issues %s were not re-rendered", progress.failed_issue_ids)
@@ -6,7 +6,10 @@ import chromadb
 from src.core.templates.iface import TemplatesRepositoryABC
 from src.core.templates.types import Template, TemplateField
 from src.storage.chroma.base_chroma_repository import BaseChromaRepository
+from src.storage.cache.search_cache import VersionedSearchCache
+from src.storage.cache.cached_repositories import CachedTemplatesRepository
 from src.application.provider import Registerable, Singleton, Provider
+from src.config import settings
 
 
 class _TemplateField(pydantic.BaseModel):
@@ -19,6 +22,9 @@ class _TemplateMetadata(pydantic.BaseModel):
     title: str
     storage_filename: str
     fields: str | None = None
+    text: str | None = None
+    content_hash: str | None = None
+    digest: str | None = None
 
 
 class ChromaTemplatesRepository(BaseChromaRepository, TemplatesRepositoryABC, Registerable):
@@ -26,16 +32,33 @@ class ChromaTemplatesRepository(BaseChromaRepository, TemplatesRepositoryABC, Re
     @classmethod
     async def on_build_provider(cls, provider: Provider):
         client = provider[chromadb.AsyncClientAPI]
+
+        if settings.TEMPLATES_CATALOG_ENABLED:
+            # импорт здесь, т. к. каталог сам использует этот модуль
+            from src.storage.chroma.chroma_templates_catalog import ChromaTemplatesCatalog
+
+            catalog = ChromaTemplatesCatalog(client, refresh_interval=settings.TEMPLATES_CATALOG_REFRESH_SECONDS)
+            await catalog.init_async()
+            # каталог уже в памяти, кэш поиска поверх него не нужен
+            provider.register(ChromaTemplatesCatalog, Singleton(catalog))
+            provider.register(TemplatesRepositoryABC, Singleton(catalog))
+            return
+
         templates_repo = cls(client)
         await templates_repo.init_async()
+
+        cache = provider[VersionedSearchCache]
+        if cache.max_entries > 0:
+            templates_repo = CachedTemplatesRepository(templates_repo, cache, cls._COLLECTION_NAME)
         provider.register(TemplatesRepositoryABC, Singleton(templates_repo))
 
     _COLLECTION_NAME = "templates"
+    _N_RESULTS = 3
 
     @staticmethod
-    def __from_db_type(tpl_id: str, metadata: dict) -> Template:
+    def _from_db_type(tpl_id: str, metadata: dict) -> Template:
         data = _TemplateMetadata(**metadata)
-        obj = Template(tpl_id, data.title, data.storage_filename, {})
+        obj = Template(tpl_id, data.title, data.storage_filename, {}, data.text, data.content_hash, data.digest)
         if data.fields:
             fields = json.loads(data.fields)
             for raw_field in fields:
@@ -48,9 +71,12 @@ class ChromaTemplatesRepository(BaseChromaRepository, TemplatesRepositoryABC, Re
         if not any(query_result["ids"]):
             raise KeyError(tpl_id)
 
-        return self.__from_db_type(query_result["ids"][0], query_result["metadatas"][0])
+        return self._from_db_type(query_result["ids"][0], query_result["metadatas"][0])
 
-    async def find_templates_async(self, query: str, exclude_ids: list[str] | None = None) -> list[Template]:
+    async def find_templates_async(self,
+                                   query: str,
+                                   exclude_ids: list[str] | None = None,
+                                   n_results: int | None = None) -> list[Template]:
         where = None
         if exclude_ids:
             where = {
@@ -58,11 +84,24 @@ class ChromaTemplatesRepository(BaseChromaRepository, TemplatesRepositoryABC, Re
                     "$nin": exclude_ids
                 }
             }
-        query_result = await self._collection.query(query_texts=[query], n_results=3, where=where)
+        query_result = await self._collection.query(query_texts=[query], n_results=n_results or self._N_RESULTS, where=where)
         result = []
 
         for tpl_id, meta in zip(query_result["ids"][0],
                                 query_result["metadatas"][0]):
-            result.append(self.__from_db_type(tpl_id, meta))
+            result.append(self._from_db_type(tpl_id, meta))
 
         return result
+
+    async def list_templates_async(self) -> list[Template]:
+        result = await self._collection.get(include=["metadatas"])
+        return [self._from_db_type(tpl_id, meta) for tpl_id, meta in zip(result["ids"], result["metadatas"])]
+
+    async def save_content_async(self, tpl_id: str, text: str, content_hash: str):
+        """
+        Сохраняет извлеченный при загрузке текст шаблона. Остальные поля метаданных не изменяются.
+        """
+        await self._collection.update(ids=[tpl_id], metadatas=[{"text": text, "content_hash": content_hash}])
+
+    async def save_digest_async(self, tpl_id: str, digest: str):
+        await self._collection.update(ids=[tpl_id], metadatas=[{"digest": digest}])
@@ -1,6 +1,39 @@
 import chromadb
+from chromadb.config import Settings as ChromaSettings
 
+from src.config import settings
 from src.application.provider import Registerable, Singleton, Provider
+from src.storage.chroma.resilient_client import ResilientChromaClient, ChromaCallPolicy, CircuitBreaker
+from src.storage.chroma.embedded_client import EmbeddedAsyncChromaClient
+
+
+async def create_chroma_client_async() -> ResilientChromaClient:
+    """
+    Клиент Chroma по настройкам из окружения. Используется и вне провайдера (команды в src.commands).
+    """
+    if settings.CHROMA_MODE == "embedded":
+        chroma_client = EmbeddedAsyncChromaClient.persistent(settings.CHROMA_PERSIST_DIR,
+                                                             settings.CHROMA_EMBEDDED_WORKERS)
+        # в процессе нет временных сетевых ошибок, а повтор после таймаута только займет еще один поток
+        policy = ChromaCallPolicy(timeout=settings.CHROMA_TIMEOUT_SECONDS, read_retries=0)
+    elif settings.CHROMA_MODE == "http":
+        chroma_settings = ChromaSettings(
+            chroma_http_keepalive_secs=settings.CHROMA_KEEPALIVE_SECONDS,
+            chroma_http_max_connections=settings.CHROMA_MAX_CONNECTIONS,
+            chroma_http_max_keepalive_connections=settings.CHROMA_MAX_CONNECTIONS,
+        )
+        chroma_client = await chromadb.AsyncHttpClient(host=settings.CHROMA_HOST,
+                                                       port=settings.CHROMA_PORT,
+                                                       settings=chroma_settings)
+        policy = ChromaCallPolicy(timeout=settings.CHROMA_TIMEOUT_SECONDS, read_retries=settings.CHROMA_READ_RETRIES)
+    else:
+        raise Exception(f"Unknown CHROMA_MODE: {settings.CHROMA_MODE}")
+
+    return ResilientChromaClient(
+        chroma_client,
+        policy,
+        CircuitBreaker(settings.CHROMA_BREAKER_FAILURES, settings.CHROMA_BREAKER_RESET_SECONDS),
+    )
 
 
 class ConnectionRegistrator(Registerable):
@@ -8,5 +41,7 @@ class ConnectionRegistrator(Registerable):
 
     @classmethod
     async def on_build_provider(cls, provider: Provider):
-        chroma_client = await chromadb.AsyncHttpClient(host="chroma", port=8000)
-        provider.register(chromadb.AsyncClientAPI, Singleton(chroma_client))
+        resilient_client = await create_chroma_client_async()
+        # репозитории запрашивают AsyncClientAPI, обертка повторяет нужную им часть интерфейса
+        provider.register(chromadb.AsyncClientAPI, Singleton(resilient_client))
+        provider.register(ResilientChromaClient, Singleton(resilient_client))
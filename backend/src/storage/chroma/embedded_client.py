@@ -0,0 +1,94 @@
+"""
+Встроенный режим Chroma для установок на одном узле: база живет в процессе бэкенда (PersistentClient),
+без отдельного контейнера и сетевого хопа. Клиент синхронный, поэтому все вызовы уходят в отдельный пул потоков.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+import chromadb
+
+
+class EmbeddedAsyncCollection:
+    """
+    Повторяет интерфейс AsyncCollection в объеме, который используют репозитории.
+    """
+
+    def __init__(self, collection, executor: ThreadPoolExecutor):
+        self.__collection = collection
+        self.__executor = executor
+
+    @property
+    def name(self) -> str:
+        return self.__collection.name
+
+    @property
+    def metadata(self):
+        return self.__collection.metadata
+
+    @property
+    def configuration_json(self):
+        return getattr(self.__collection, "configuration_json", None)
+
+    async def __run(self, func: Callable, *args, **kwargs) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.__executor, partial(func, *args, **kwargs))
+
+    async def query(self, *args, **kwargs):
+        return await self.__run(self.__collection.query, *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return await self.__run(self.__collection.get, *args, **kwargs)
+
+    async def count(self) -> int:
+        return await self.__run(self.__collection.count)
+
+    async def peek(self, *args, **kwargs):
+        return await self.__run(self.__collection.peek, *args, **kwargs)
+
+    async def add(self, *args, **kwargs):
+        return await self.__run(self.__collection.add, *args, **kwargs)
+
+    async def upsert(self, *args, **kwargs):
+        return await self.__run(self.__collection.upsert, *args, **kwargs)
+
+    async def update(self, *args, **kwargs):
+        return await self.__run(self.__collection.update, *args, **kwargs)
+
+    async def delete(self, *args, **kwargs):
+        return await self.__run(self.__collection.delete, *args, **kwargs)
+
+
+class EmbeddedAsyncChromaClient:
+    """
+    Async обертка над синхронным ClientAPI (PersistentClient или EphemeralClient).
+    Векторизация запросов тоже выполняется в пуле, поэтому event loop не блокируется даже на ONNX.
+    """
+
+    __client: chromadb.ClientAPI
+    __executor: ThreadPoolExecutor
+
+    def __init__(self, client: chromadb.ClientAPI, max_workers: int = 4):
+        self.__client = client
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chroma")
+
+    @classmethod
+    def persistent(cls, path: str, max_workers: int = 4) -> "EmbeddedAsyncChromaClient":
+        return cls(chromadb.PersistentClient(path=path), max_workers)
+
+    async def __run(self, func: Callable, *args, **kwargs) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.__executor, partial(func, *args, **kwargs))
+
+    async def get_or_create_collection(self, name: str, **kwargs) -> EmbeddedAsyncCollection:
+        collection = await self.__run(self.__client.get_or_create_collection, name, **kwargs)
+        return EmbeddedAsyncCollection(collection, self.__executor)
+
+    async def delete_collection(self, name: str):
+        await self.__run(self.__client.delete_collection, name)
+
+    async def heartbeat(self) -> int:
+        return await self.__run(self.__client.heartbeat)
+
+    def close(self):
+        self.__executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,314 @@
+"""
+Обертка над async клиентом Chroma: дедлайны на каждый вызов, повторы чтений с backoff,
+circuit breaker и метрики задержек по операциям коллекций.
+"""
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable
+
+import chromadb
+import httpx
+from chromadb.errors import InternalError
+
+from src.exceptions import ExternalServiceUnavailableException
+from src.storage.chroma.embedded_client import EmbeddedAsyncChromaClient
+
+
+_logger = logging.getLogger(__name__)
+
+_TRANSIENT_ERRORS = (TimeoutError, httpx.TransportError, InternalError)
+"""
+Ошибки, после которых есть смысл повторить запрос. Ошибки валидации и т. п. не повторяются и не открывают breaker.
+"""
+
+
+@dataclass(frozen=True)
+class ChromaCallPolicy:
+    timeout: float = 5.0
+    """
+    Дедлайн одного вызова в секундах (включая сериализацию и векторизацию запроса на клиенте).
+    """
+    read_retries: int = 2
+    """
+    Сколько раз повторять идемпотентное чтение после временной ошибки.
+    """
+    backoff_base: float = 0.1
+    backoff_max: float = 2.0
+
+
+class CircuitBreaker:
+    """
+    После failure_threshold подряд временных ошибок перестает пропускать вызовы на reset_timeout секунд.
+    Затем пропускает один пробный вызов: успех закрывает breaker, ошибка снова открывает.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    failure_threshold: int
+    reset_timeout: float
+    __failures: int
+    __opened_at: float | None
+    __trial_in_progress: bool
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.__failures = 0
+        self.__opened_at = None
+        self.__trial_in_progress = False
+
+    @property
+    def state(self) -> str:
+        if self.__opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.__opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before_call(self):
+        state = self.state
+        if state == self.OPEN:
+            raise ExternalServiceUnavailableException("Chroma circuit breaker is open")
+        if state == self.HALF_OPEN:
+            if self.__trial_in_progress:
+                raise ExternalServiceUnavailableException("Chroma circuit breaker is half-open")
+            self.__trial_in_progress = True
+
+    def on_success(self):
+        self.__failures = 0
+        self.__opened_at = None
+        self.__trial_in_progress = False
+
+    def on_cancel(self):
+        """
+        Вызов отменен до ответа (клиент отключился, истек таймаут запроса).
+        О доступности Chroma это ничего не говорит: состояние не меняется, но пробный вызов освобождается.
+        """
+        self.__trial_in_progress = False
+
+    def on_failure(self):
+        self.__failures += 1
+        self.__trial_in_progress = False
+        if self.__opened_at is not None or self.__failures >= self.failure_threshold:
+            if self.__opened_at is None:
+                _logger.warning("Chroma circuit breaker opened after %s failures", self.__failures)
+            self.__opened_at = time.monotonic()
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class OperationStats:
+    """
+    Счетчики и скользящее окно задержек одной операции ("laws.query", "templates.get" и т. д.)
+    """
+
+    WINDOW = 1024
+
+    calls: int
+    errors: int
+    retries: int
+    timeouts: int
+    __latencies: deque[float]
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.__latencies = deque(maxlen=self.WINDOW)
+
+    def observe(self, latency: float):
+        self.__latencies.append(latency)
+
+    def to_dict(self) -> dict[str, float | int]:
+        ordered = sorted(self.__latencies)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "p50_ms": _percentile(ordered, 50) * 1000,
+            "p95_ms": _percentile(ordered, 95) * 1000,
+            "p99_ms": _percentile(ordered, 99) * 1000,
+        }
+
+
+class ChromaMetrics:
+
+    __operations: dict[str, OperationStats]
+
+    def __init__(self):
+        self.__operations = {}
+
+    def get(self, operation: str) -> OperationStats:
+        return self.__operations.setdefault(operation, OperationStats())
+
+    def snapshot(self) -> dict[str, dict[str, float | int]]:
+        return {name: stats.to_dict() for name, stats in self.__operations.items()}
+
+
+class _CallExecutor:
+
+    def __init__(self, policy: ChromaCallPolicy, breaker: CircuitBreaker, metrics: ChromaMetrics):
+        self.policy = policy
+        self.breaker = breaker
+        self.metrics = metrics
+
+    async def __call__(self, operation: str, call: Callable[[], Awaitable[Any]], idempotent: bool) -> Any:
+        stats = self.metrics.get(operation)
+        attempts = 1 + (self.policy.read_retries if idempotent else 0)
+
+        for attempt in range(attempts):
+            self.breaker.before_call()
+            stats.calls += 1
+            started = time.perf_counter()
+            try:
+                async with asyncio.timeout(self.policy.timeout):
+                    result = await call()
+            except _TRANSIENT_ERRORS as e:
+                stats.errors += 1
+                if isinstance(e, TimeoutError):
+                    stats.timeouts += 1
+                self.breaker.on_failure()
+
+                if attempt + 1 >= attempts:
+                    raise ExternalServiceUnavailableException(f"Chroma {operation} failed: {e!r}") from e
+
+                stats.retries += 1
+                # full jitter, чтобы повторы разных запросов не шли одной волной
+                delay = min(self.policy.backoff_max, self.policy.backoff_base * 2 ** attempt)
+                await asyncio.sleep(random.uniform(0, delay))
+                continue
+            except Exception:
+                stats.errors += 1
+                # сервер ответил, значит он доступен
+                self.breaker.on_success()
+                raise
+            except BaseException:
+                # CancelledError: иначе пробный вызов в HALF_OPEN остался бы занятым навсегда
+                self.breaker.on_cancel()
+                raise
+            finally:
+                stats.observe(time.perf_counter() - started)
+
+            self.breaker.on_success()
+            return result
+
+
+class ResilientCollection:
+    """
+    Повторяет интерфейс AsyncCollection в объеме, который используют репозитории.
+    Чтения (query, get, count, peek) повторяются, записи только ограничены дедлайном.
+    """
+
+    def __init__(self, collection, executor: _CallExecutor):
+        self.__collection = collection
+        self.__executor = executor
+
+    @property
+    def name(self) -> str:
+        return self.__collection.name
+
+    @property
+    def metadata(self):
+        return self.__collection.metadata
+
+    @property
+    def configuration_json(self):
+        return getattr(self.__collection, "configuration_json", None)
+
+    async def __run(self, operation: str, idempotent: bool, *args, **kwargs):
+        method = getattr(self.__collection, operation)
+        return await self.__executor(f"{self.name}.{operation}", lambda: method(*args, **kwargs), idempotent)
+
+    async def query(self, *args, **kwargs):
+        return await self.__run("query", True, *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return await self.__run("get", True, *args, **kwargs)
+
+    async def count(self):
+        return await self.__run("count", True)
+
+    async def peek(self, *args, **kwargs):
+        return await self.__run("peek", True, *args, **kwargs)
+
+    async def add(self, *args, **kwargs):
+        return await self.__run("add", False, *args, **kwargs)
+
+    async def upsert(self, *args, **kwargs):
+        return await self.__run("upsert", False, *args, **kwargs)
+
+    async def update(self, *args, **kwargs):
+        return await self.__run("update", False, *args, **kwargs)
+
+    async def delete(self, *args, **kwargs):
+        return await self.__run("delete", False, *args, **kwargs)
+
+
+class ResilientChromaClient:
+    """
+    Регистрируется в провайдере вместо chromadb.AsyncClientAPI.
+    Коллекции, которые он возвращает, проходят через общий breaker и метрики.
+    """
+
+    policy: ChromaCallPolicy
+    breaker: CircuitBreaker
+    metrics: ChromaMetrics
+
+    def __init__(self,
+                 client: chromadb.AsyncClientAPI,
+                 policy: ChromaCallPolicy | None = None,
+                 breaker: CircuitBreaker | None = None):
+        self.__client = client
+        self.policy = policy or ChromaCallPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = ChromaMetrics()
+        self.__executor = _CallExecutor(self.policy, self.breaker, self.metrics)
+
+    async def get_or_create_collection(self, name: str, **kwargs) -> ResilientCollection:
+        collection = await self.__executor(f"{name}.get_or_create_collection",
+                                           lambda: self.__client.get_or_create_collection(name, **kwargs),
+                                           idempotent=True)
+        return ResilientCollection(collection, self.__executor)
+
+    async def delete_collection(self, name: str):
+        await self.__executor(f"{name}.delete_collection", lambda: self.__client.delete_collection(name), idempotent=False)
+
+    async def heartbeat(self) -> int:
+        return await self.__executor("client.heartbeat", self.__client.heartbeat, idempotent=True)
+
+    def close(self):
+        """
+        Останавливает пул потоков встроенного клиента. Соединения HTTP клиента общие на процесс, ими управляет chromadb.
+        """
+        if isinstance(self.__client, EmbeddedAsyncChromaClient):
+            self.__client.close()
+
+    def describe_pool(self) -> dict[str, int] | None:
+        """
+        Состояние keep-alive пула HTTP соединений. Использует внутренние объекты chromadb/httpx,
+        поэтому возвращает None, если их структура изменилась или клиент не HTTP.
+        """
+        try:
+            http_clients = type(self.__client._server)._clients
+            connections = [c for http_client in http_clients.values()
+                           for c in http_client._transport._pool.connections]
+        except AttributeError:
+            return None
+
+        return {
+            "connections": len(connections),
+            "idle": sum(1 for c in connections if c.is_idle()),
+        }
@@ -1,9 +1,12 @@
 from pathlib import Path
 import os
+import tempfile
 from typing import Generator, BinaryIO
 from contextlib import contextmanager
 
+from src.config import settings
 from src.core.results.iface import IssueResultFileStorageABC
+from src.core.results.types import IssueResultFileInfo
 from src.application.provider import Registerable, Provider, Singleton
 
 
@@ -11,6 +14,8 @@ class FilesystemIssueResultStorageABC(IssueResultFileStorageABC, Registerable):
 
     @classmethod
     async def on_build_provider(cls, provider: Provider):
+        if settings.RESULTS_STORAGE != "flat":
+            return
         results_dir = Path(os.getenv("RESULTS_DIR") or "")
         if not results_dir.exists():
             raise Exception("RESULTS_DIR env var must be set")
@@ -26,8 +31,18 @@ class FilesystemIssueResultStorageABC(IssueResultFileStorageABC, Registerable):
 
     @contextmanager
     def write_issue_result_file(self, issue_id: int) -> Generator[BinaryIO, None, None]:
-        with open(self.__get_filepath(issue_id), "wb") as f:
-            yield f
+        # пишем во временный файл рядом и подменяем им результат, чтобы скачивание не увидело недописанный файл
+        filepath = self.__get_filepath(issue_id)
+        fd, tmp_path = tempfile.mkstemp(dir=self.__path, prefix=f".{issue_id}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                yield f
+            # mkstemp создает файл с правами 0600
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
 
     def read_issue_result_file(self, issue_id: int) -> BinaryIO:
         filepath = self.__get_filepath(issue_id)
@@ -35,3 +50,11 @@ class FilesystemIssueResultStorageABC(IssueResultFileStorageABC, Registerable):
             raise FileNotFoundError(f"File for issue {issue_id} not found")
         return open(filepath, "rb")
 
+    def get_issue_result_file_info(self, issue_id: int) -> IssueResultFileInfo:
+        filepath = Path(self.__get_filepath(issue_id))
+        stat = filepath.stat()
+        return IssueResultFileInfo(filepath, filepath.name, stat.st_size, stat.st_mtime,
+                                   f"{stat.st_size:x}-{stat.st_mtime_ns:x}")
+
+    def get_issue_result_download_url(self, issue_id: int, filename: str) -> str:
+        raise NotImplementedError("Filesystem storage has no presigned URLs")
@@ -0,0 +1,196 @@
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Generator, BinaryIO
+
+from src.config import settings
+from src.core.results.iface import IssueResultFileStorageABC
+from src.core.results.types import IssueResultFileInfo
+from src.application.provider import Registerable, Provider, Singleton
+
+
+class ShardedIssueResultStorage(IssueResultFileStorageABC, Registerable):
+    """
+    Хранилище выходных файлов с адресацией по содержимому:
+
+        blobs/ab/cd/<sha256>.docx    - содержимое, одинаковые документы хранятся один раз
+        index/<shard>/<issue_id>     - sha256 документа обращения (64 байта)
+        tmp/                         - недописанные файлы
+
+    Вложенные директории держат в каждой не больше нескольких тысяч записей при любом числе обращений.
+    Блоб и индекс записываются через временный файл и os.replace, поэтому после падения в середине записи
+    остается либо старый, либо новый документ целиком.
+
+    Файлы старого плоского хранилища ({issue_id}.docx в корне) читаются, пока не перенесены через migrate.
+    """
+
+    @classmethod
+    async def on_build_provider(cls, provider: Provider):
+        if settings.RESULTS_STORAGE != "sharded":
+            return
+        # Path("") - текущая директория, она всегда существует: без проверки хранилище создалось бы в ней
+        results_dir = os.getenv("RESULTS_DIR")
+        if not results_dir or not Path(results_dir).exists():
+            raise Exception("RESULTS_DIR env var must be set")
+        provider.register(IssueResultFileStorageABC, Singleton(cls(Path(results_dir))))
+
+    __path: Path
+    __logger: logging.Logger
+
+    def __init__(self, path: os.PathLike):
+        self.__path = Path(path)
+        for directory in ("blobs", "index", "tmp"):
+            (self.__path / directory).mkdir(exist_ok=True)
+        self.__logger = logging.getLogger(self.__class__.__name__)
+
+    def __get_blob_path(self, digest: str) -> Path:
+        return self.__path / "blobs" / digest[:2] / digest[2:4] / f"{digest}.docx"
+
+    def __get_index_path(self, issue_id: int) -> Path:
+        # id обращений последовательные, поэтому шард берется от хеша, а не от самого id
+        shard = hashlib.md5(str(issue_id).encode()).hexdigest()[:2]
+        return self.__path / "index" / shard / str(issue_id)
+
+    def __get_legacy_path(self, issue_id: int) -> Path:
+        return self.__path / f"{issue_id}.docx"
+
+    def __replace(self, tmp_path: str, target: Path):
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # mkstemp создает файл с правами 0600
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, target)
+
+    @staticmethod
+    def __hash_file(path: str) -> str:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    def __store_blob(self, tmp_path: str) -> str:
+        """
+        Переносит временный файл в блоб. Если такой блоб уже есть, временный файл удаляется.
+        """
+        digest = self.__hash_file(tmp_path)
+        blob_path = self.__get_blob_path(digest)
+        if blob_path.exists():
+            os.unlink(tmp_path)
+        else:
+            self.__replace(tmp_path, blob_path)
+        # свежий mtime защищает блоб от collect_garbage, пока на него не указывает индекс
+        os.utime(blob_path)
+        return digest
+
+    def __write_index(self, issue_id: int, digest: str):
+        fd, tmp_path = tempfile.mkstemp(dir=self.__path / "tmp", prefix=f"{issue_id}.", suffix=".idx")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(digest)
+            self.__replace(tmp_path, self.__get_index_path(issue_id))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def __read_index(self, issue_id: int) -> str | None:
+        try:
+            return self.__get_index_path(issue_id).read_text().strip()
+        except FileNotFoundError:
+            return None
+
+    @contextmanager
+    def write_issue_result_file(self, issue_id: int) -> Generator[BinaryIO, None, None]:
+        fd, tmp_path = tempfile.mkstemp(dir=self.__path / "tmp", prefix=f"{issue_id}.", suffix=".docx")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                yield f
+            digest = self.__store_blob(tmp_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        self.__write_index(issue_id, digest)
+        self.__get_legacy_path(issue_id).unlink(missing_ok=True)
+
+    def read_issue_result_file(self, issue_id: int) -> BinaryIO:
+        # второй заход - на случай, если документ перезаписали и collect_garbage удалил старый блоб между чтениями
+        for _ in range(2):
+            digest = self.__read_index(issue_id)
+            if digest is None:
+                break
+            try:
+                return open(self.__get_blob_path(digest), "rb")
+            except FileNotFoundError:
+                continue
+
+        legacy_path = self.__get_legacy_path(issue_id)
+        if legacy_path.exists():
+            return open(legacy_path, "rb")
+        raise FileNotFoundError(f"File for issue {issue_id} not found")
+
+    def get_issue_result_file_info(self, issue_id: int) -> IssueResultFileInfo:
+        digest = self.__read_index(issue_id)
+        if digest is not None:
+            path, etag = self.__get_blob_path(digest), digest
+        else:
+            path, etag = self.__get_legacy_path(issue_id), None
+
+        stat = path.stat()
+        return IssueResultFileInfo(path, path.relative_to(self.__path).as_posix(), stat.st_size, stat.st_mtime,
+                                   etag or f"{stat.st_size:x}-{stat.st_mtime_ns:x}")
+
+    def get_issue_result_download_url(self, issue_id: int, filename: str) -> str:
+        raise NotImplementedError("Filesystem storage has no presigned URLs")
+
+    def migrate(self) -> int:
+        """
+        Переносит файлы плоского хранилища в блобы.
+        :return: Количество перенесенных файлов.
+        """
+        migrated = 0
+        for entry in os.scandir(self.__path):
+            name, ext = os.path.splitext(entry.name)
+            if not entry.is_file() or ext != ".docx" or not name.isdigit():
+                continue
+
+            # жесткая ссылка вместо копирования: tmp и корень на одной ФС
+            tmp_path = str(self.__path / "tmp" / f"{name}.{os.getpid()}.migrate")
+            os.link(entry.path, tmp_path)
+            self.__write_index(int(name), self.__store_blob(tmp_path))
+            os.unlink(entry.path)
+            migrated += 1
+
+        return migrated
+
+    def collect_garbage(self, grace_seconds: float = 3600) -> int:
+        """
+        Удаляет блобы, на которые не ссылается ни одно обращение, и брошенные временные файлы.
+        Файлы моложе grace_seconds не трогаются: их могут дописывать прямо сейчас.
+        :return: Количество удаленных файлов.
+        """
+        threshold = time.time() - grace_seconds
+        referenced = set()
+        for shard in os.scandir(self.__path / "index"):
+            for entry in os.scandir(shard.path):
+                with open(entry.path) as f:
+                    referenced.add(f.read().strip())
+
+        removed = 0
+        for dirpath, _, filenames in os.walk(self.__path / "blobs"):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                if Path(filename).stem not in referenced and os.stat(path).st_mtime < threshold:
+                    os.unlink(path)
+                    removed += 1
+
+        for entry in os.scandir(self.__path / "tmp"):
+            if entry.stat().st_mtime < threshold:
+                os.unlink(entry.path)
+                removed += 1
+
+        self.__logger.info("Removed %s unreferenced files", removed)
+        return removed
@@ -3,7 +3,10 @@ from typing import BinaryIO, Generator
 from contextlib import contextmanager
 from pathlib import Path
 
-from src.core.templates.iface import TemplatesFileStorageABC
+from src.config import settings
+from src.core.templates.iface import TemplatesFileStorageABC, TemplatesWatcherABC
+from src.core.templates.types import TemplateFileInfo
+from src.storage.filesystem.fs_templates_watcher import FilesystemTemplatesWatcher
 from src.application.provider import Registerable, Provider, Singleton
 
 
@@ -11,12 +14,21 @@ class FilesystemTemplatesStorage(TemplatesFileStorageABC, Registerable):
 
     @classmethod
     async def on_build_provider(cls, provider: Provider):
+        if settings.TEMPLATES_STORAGE != "filesystem":
+            return
         templates_dir = Path(os.getenv("TEMPLATES_DIR") or "")
         if not templates_dir.exists():
             raise Exception("TEMPLATES_DIR env var must be set")
         templates_storage = cls(templates_dir)
         provider.register(TemplatesFileStorageABC, Singleton(templates_storage))
 
+        if settings.TEMPLATES_WATCH_MODE != "off":
+            watcher = FilesystemTemplatesWatcher(templates_dir,
+                                                 settings.TEMPLATES_WATCH_MODE,
+                                                 settings.TEMPLATES_WATCH_POLL_SECONDS)
+            watcher.start()
+            provider.register(TemplatesWatcherABC, Singleton(watcher))
+
     __path: os.PathLike
 
     def __init__(self, path: os.PathLike):
@@ -27,3 +39,10 @@ class FilesystemTemplatesStorage(TemplatesFileStorageABC, Registerable):
         with open(os.path.join(self.__path, filename), 'rb') as f:
             yield f
 
+    def list_template_files(self) -> list[str]:
+        return sorted(p.name for p in Path(self.__path).glob("*.docx") if not p.name.startswith("~$"))
+
+    def get_template_file_info(self, filename: str) -> TemplateFileInfo:
+        stat = os.stat(os.path.join(self.__path, filename))
+        return TemplateFileInfo(stat.st_size, stat.st_mtime_ns)
+
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import os
+from pathlib import Path
+
+from src.core.templates.iface import TemplatesWatcherABC, TemplateChangesCallback
+from src.core.templates.types import TemplateFileChange
+
+try:
+    import watchfiles
+except ImportError:    # приходит вместе с uvicorn[standard], но не обязателен
+    watchfiles = None
+
+
+def _is_template_file(filename: str) -> bool:
+    # ~$name.docx - lock файлы Word
+    return filename.endswith(".docx") and not filename.startswith("~$")
+
+
+class FilesystemTemplatesWatcher(TemplatesWatcherABC):
+    """
+    Следит за директорией шаблонов через inotify (watchfiles), а если он недоступен - опросом mtime и размера файлов.
+    Опрос нужен и для volume из Docker Desktop на macOS/Windows: события inotify через них не доходят.
+    """
+
+    MODES = ("auto", "inotify", "poll")
+
+    __path: Path
+    __mode: str
+    __poll_interval: float
+    __callbacks: list[TemplateChangesCallback]
+    __stop_event: asyncio.Event
+    __task: asyncio.Task | None
+    __logger: logging.Logger
+
+    def __init__(self, path: os.PathLike, mode: str = "auto", poll_interval: float = 2.0):
+        """
+        :param mode: auto - inotify, при ошибке опрос; inotify - только inotify; poll - только опрос.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown watch mode: {mode}")
+        self.__path = Path(path)
+        self.__mode = mode
+        self.__poll_interval = poll_interval
+        self.__callbacks = []
+        self.__stop_event = asyncio.Event()
+        self.__task = None
+        self.__logger = logging.getLogger(self.__class__.__name__)
+
+    def subscribe(self, callback: TemplateChangesCallback):
+        self.__callbacks.append(callback)
+
+    def start(self):
+        self.__stop_event.clear()
+        self.__task = asyncio.create_task(self.__run())
+
+    async def stop_async(self):
+        self.__stop_event.set()
+        if self.__task:
+            self.__task.cancel()
+            try:
+                await self.__task
+            except asyncio.CancelledError:
+                pass
+            self.__task = None
+
+    async def __run(self):
+        if self.__mode != "poll" and watchfiles is not None:
+            try:
+                await self.__watch_inotify()
+                return
+            except Exception as e:
+                if self.__mode == "inotify":
+                    raise
+                # например, исчерпан fs.inotify.max_user_watches
+                self.__logger.warning("inotify is unavailable, falling back to polling", exc_info=e)
+        elif self.__mode == "inotify":
+            raise RuntimeError("watchfiles is not installed, inotify mode is unavailable")
+
+        await self.__watch_polling()
+
+    async def __watch_inotify(self):
+        self.__logger.info("Watching %s with inotify", self.__path)
+        async for raw_changes in watchfiles.awatch(self.__path,
+                                                   stop_event=self.__stop_event,
+                                                   recursive=False,
+                                                   watch_filter=lambda _, path: _is_template_file(Path(path).name)):
+            changes = {}
+            for change, path in raw_changes:
+                filename = Path(path).name
+                # добавление и удаление одного файла в пачке (сохранение через временный файл) - это изменение
+                changes[filename] = TemplateFileChange(filename, deleted=change == watchfiles.Change.deleted
+                                                       and not (self.__path / filename).exists())
+            await self.__emit(list(changes.values()))
+
+    def snapshot(self) -> dict[str, tuple[int, int]]:
+        """
+        {filename: (размер, mtime_ns)} всех файлов шаблонов.
+        """
+        result = {}
+        for entry in os.scandir(self.__path):
+            if entry.is_file() and _is_template_file(entry.name):
+                stat = entry.stat()
+                result[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return result
+
+    async def __watch_polling(self):
+        self.__logger.info("Watching %s by polling every %ss", self.__path, self.__poll_interval)
+        previous = await asyncio.to_thread(self.snapshot)
+        while not self.__stop_event.is_set():
+            await asyncio.sleep(self.__poll_interval)
+            try:
+                current = await asyncio.to_thread(self.snapshot)
+            except OSError as e:
+                self.__logger.warning("Failed to scan templates directory", exc_info=e)
+                continue
+
+            changes = [TemplateFileChange(name) for name, version in current.items() if previous.get(name) != version]
+            changes += [TemplateFileChange(name, deleted=True) for name in previous.keys() - current.keys()]
+            previous = current
+            if changes:
+                await self.__emit(changes)
+
+    async def __emit(self, changes: list[TemplateFileChange]):
+        self.__logger.info("Template files changed: %s", changes)
+        for callback in self.__callbacks:
+            try:
+                await callback(changes)
+            except Exception as e:
+                self.__logger.exception("Template changes handler failed", exc_info=e)
@@ -0,0 +1,57 @@
+import asyncio
+import logging
+
+from src.config import settings
+from src.core.users.iface import OAuthStateStoreABC
+from src.application.provider import Registerable, Provider, Singleton
+
+
+class OAuthStateSweeper(Registerable):
+    """
+    Периодически удаляет устаревшие state OAuth из хранилища: входы, брошенные до callback,
+    иначе остаются в нем навсегда.
+    """
+
+    __REG_ORDER__ = 1
+
+    @classmethod
+    async def on_build_provider(cls, provider: Provider):
+        if settings.OAUTH_STATE_SWEEP_INTERVAL_SECONDS <= 0:
+            return
+        sweeper = cls(provider[OAuthStateStoreABC], settings.OAUTH_STATE_SWEEP_INTERVAL_SECONDS)
+        sweeper.start()
+        provider.register(OAuthStateSweeper, Singleton(sweeper))
+
+    __store: OAuthStateStoreABC
+    __interval: float
+    __task: asyncio.Task | None
+    __logger: logging.Logger
+
+    def __init__(self, store: OAuthStateStoreABC, interval: float = 300):
+        self.__store = store
+        self.__interval = interval
+        self.__task = None
+        self.__logger = logging.getLogger(self.__class__.__name__)
+
+    def start(self):
+        self.__task = asyncio.create_task(self.__run())
+
+    async def stop_async(self):
+        if self.__task:
+            self.__task.cancel()
+            try:
+                await self.__task
+            except asyncio.CancelledError:
+                pass
+            self.__task = None
+
+    async def __run(self):
+        while True:
+            await asyncio.sleep(self.__interval)
+            try:
+                removed = await self.__store.sweep()
+                if removed:
+                    self.__logger.info("Removed %s expired OAuth states", removed)
+            except Exception as e:
+                # повторим на следующем проходе
+                self.__logger.warning("Failed to sweep OAuth states", exc_info=e)
@@ -0,0 +1,20 @@
+import boto3
+from botocore.config import Config
+
+from src.config import settings
+
+
+def create_s3_client(endpoint_url: str | None = None):
+    """
+    Синхронный клиент boto3 по настройкам из окружения. Клиент потокобезопасен, вызовы делаются из пулов потоков.
+    :param endpoint_url: Адрес S3. None - S3_ENDPOINT_URL (пусто - AWS).
+    """
+    return boto3.client(
+        "s3",
+        endpoint_url=endpoint_url or settings.S3_ENDPOINT_URL or None,
+        region_name=settings.S3_REGION,
+        aws_access_key_id=settings.S3_ACCESS_KEY_ID or None,
+        aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY or None,
+        # MinIO и прочие совместимые хранилища обычно не поддерживают адресацию через поддомен бакета
+        config=Config(signature_version="s3v4", s3={"addressing_style": "path"}),
+    )
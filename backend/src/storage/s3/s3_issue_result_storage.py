@@ -0,0 +1,180 @@
+import io
+import logging
+from contextlib import contextmanager
+from typing import Generator, BinaryIO
+from urllib.parse import quote
+
+from botocore.exceptions import ClientError
+
+from src.config import settings
+from src.core.results.iface import IssueResultFileStorageABC
+from src.core.results.types import IssueResultFileInfo
+from src.storage.s3.connection import create_s3_client
+from src.application.provider import Registerable, Provider, Singleton
+
+
+DOCX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+MIN_PART_SIZE = 5 * 1024 * 1024
+"""
+Минимальный размер части multipart загрузки (кроме последней) в S3.
+"""
+
+
+class MultipartUploadWriter(io.RawIOBase):
+    """
+    Файл только для записи, который отправляет содержимое в S3 частями по мере записи.
+    В памяти держится не больше одной части. Объект появляется в бакете только после complete.
+
+    Файл не поддерживает seek, поэтому zipfile (и docxtpl через него) пишет DOCX в потоковом режиме.
+    """
+
+    def __init__(self, client, bucket: str, key: str, part_size: int = MIN_PART_SIZE,
+                 content_type: str = DOCX_CONTENT_TYPE):
+        super().__init__()
+        if part_size < MIN_PART_SIZE:
+            raise ValueError(f"S3 part size must be at least {MIN_PART_SIZE} bytes")
+        self.__client = client
+        self.__bucket = bucket
+        self.__key = key
+        self.__part_size = part_size
+        self.__content_type = content_type
+        self.__buffer = bytearray()
+        self.__position = 0
+        self.__upload_id = None
+        self.__parts = []
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.__position
+
+    def write(self, data) -> int:
+        self.__buffer += data
+        self.__position += len(data)
+        while len(self.__buffer) >= self.__part_size:
+            self.__upload_part(bytes(self.__buffer[:self.__part_size]))
+            del self.__buffer[:self.__part_size]
+        return len(data)
+
+    def __upload_part(self, data: bytes):
+        if self.__upload_id is None:
+            response = self.__client.create_multipart_upload(Bucket=self.__bucket, Key=self.__key,
+                                                             ContentType=self.__content_type)
+            self.__upload_id = response["UploadId"]
+
+        number = len(self.__parts) + 1
+        response = self.__client.upload_part(Bucket=self.__bucket, Key=self.__key, UploadId=self.__upload_id,
+                                             PartNumber=number, Body=data)
+        self.__parts.append({"PartNumber": number, "ETag": response["ETag"]})
+
+    def complete(self):
+        """
+        Отправляет остаток и публикует объект. Файл меньше одной части отправляется обычным PutObject.
+        """
+        if self.__upload_id is None:
+            self.__client.put_object(Bucket=self.__bucket, Key=self.__key, Body=bytes(self.__buffer),
+                                     ContentType=self.__content_type)
+        else:
+            if self.__buffer:
+                self.__upload_part(bytes(self.__buffer))
+            self.__client.complete_multipart_upload(Bucket=self.__bucket, Key=self.__key, UploadId=self.__upload_id,
+                                                    MultipartUpload={"Parts": self.__parts})
+        self.__buffer.clear()
+
+    def abort(self):
+        """
+        Отменяет загрузку. Уже отправленные части удаляются, предыдущая версия объекта остается.
+        """
+        if self.__upload_id is not None:
+            self.__client.abort_multipart_upload(Bucket=self.__bucket, Key=self.__key, UploadId=self.__upload_id)
+        self.__buffer.clear()
+
+
+class S3IssueResultStorage(IssueResultFileStorageABC, Registerable):
+    """
+    Выходные файлы в S3-совместимом хранилище: results/{issue_id}.docx.
+    Не привязывает документы к одной машине, поэтому бэкенд можно запускать на нескольких хостах.
+
+    Рендер пишет DOCX сразу в multipart загрузку, а скачивание через presigned URL (RESULTS_DOWNLOAD_MODE=presigned)
+    идет напрямую из S3, минуя бэкенд.
+    """
+
+    @classmethod
+    async def on_build_provider(cls, provider: Provider):
+        if settings.RESULTS_STORAGE != "s3":
+            return
+        if not settings.S3_BUCKET:
+            raise Exception("S3_BUCKET env var must be set")
+        storage = cls(create_s3_client(),
+                      settings.S3_BUCKET,
+                      settings.S3_RESULTS_PREFIX,
+                      settings.S3_MULTIPART_CHUNK_MB * 1024 * 1024,
+                      create_s3_client(settings.S3_PUBLIC_ENDPOINT_URL or None),
+                      settings.S3_PRESIGNED_URL_SECONDS)
+        provider.register(IssueResultFileStorageABC, Singleton(storage))
+
+    __bucket: str
+    __prefix: str
+    __part_size: int
+    __presign_seconds: int
+    __logger: logging.Logger
+
+    def __init__(self, client, bucket: str, prefix: str = "results/", part_size: int = MIN_PART_SIZE,
+                 presign_client=None, presign_seconds: int = 300):
+        """
+        :param presign_client: Клиент для подписи ссылок. Нужен, если браузер ходит в S3 по другому адресу,
+            чем бэкенд (подпись включает хост). None - основной клиент.
+        """
+        self.__client = client
+        self.__bucket = bucket
+        self.__prefix = prefix
+        self.__part_size = part_size
+        self.__presign_client = presign_client or client
+        self.__presign_seconds = presign_seconds
+        self.__logger = logging.getLogger(self.__class__.__name__)
+
+    def __get_key(self, issue_id: int) -> str:
+        return f"{self.__prefix}{issue_id}.docx"
+
+    @contextmanager
+    def write_issue_result_file(self, issue_id: int) -> Generator[BinaryIO, None, None]:
+        writer = MultipartUploadWriter(self.__client, self.__bucket, self.__get_key(issue_id), self.__part_size)
+        try:
+            yield writer
+            writer.complete()
+        except BaseException:
+            try:
+                writer.abort()
+            except Exception as e:
+                # незавершенные части удалит lifecycle правило бакета
+                self.__logger.warning("Failed to abort upload for issue %s", issue_id, exc_info=e)
+            raise
+
+    def read_issue_result_file(self, issue_id: int) -> BinaryIO:
+        try:
+            return self.__client.get_object(Bucket=self.__bucket, Key=self.__get_key(issue_id))["Body"]
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                raise FileNotFoundError(f"File for issue {issue_id} not found") from e
+            raise
+
+    def get_issue_result_file_info(self, issue_id: int) -> IssueResultFileInfo:
+        raise NotImplementedError("S3 storage has no local files")
+
+    def get_issue_result_download_url(self, issue_id: int, filename: str) -> str:
+        key = self.__get_key(issue_id)
+        try:
+            # presigned URL на несуществующий объект браузер получит как 403 от S3, лучше ответить 404 сразу
+            self.__client.head_object(Bucket=self.__bucket, Key=key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                raise FileNotFoundError(f"File for issue {issue_id} not found") from e
+            raise
+
+        return self.__presign_client.generate_presigned_url("get_object", Params={
+            "Bucket": self.__bucket,
+            "Key": key,
+            "ResponseContentDisposition": f"attachment; filename*=utf-8''{quote(filename)}",
+            "ResponseContentType": DOCX_CONTENT_TYPE,
+        }, ExpiresIn=self.__presign_seconds)
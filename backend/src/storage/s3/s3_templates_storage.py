@@ -0,0 +1,150 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Generator
+
+from botocore.exceptions import ClientError
+
+from src.config import settings
+from src.core.templates.iface import TemplatesFileStorageABC
+from src.core.templates.types import TemplateFileInfo
+from src.storage.s3.connection import create_s3_client
+from src.application.provider import Registerable, Provider, Singleton
+
+
+def _to_ns(value: datetime) -> int:
+    return int(value.timestamp() * 1_000_000_000)
+
+
+class S3TemplatesStorage(TemplatesFileStorageABC, Registerable):
+    """
+    Шаблоны в S3-совместимом хранилище с локальным кэшем файлов (read-through).
+
+    Версия файла (размер и время изменения объекта) запрашивается HEAD не чаще раза в info_ttl секунд.
+    Скачанный файл получает mtime объекта, поэтому совпадение размера и mtime локальной копии означает,
+    что она актуальна, и файл открывается с диска без обращения к S3.
+
+    Объект передается в процессы пула рендеринга через pickle, клиент S3 в каждом процессе создается заново.
+    """
+
+    @classmethod
+    async def on_build_provider(cls, provider: Provider):
+        if settings.TEMPLATES_STORAGE != "s3":
+            return
+        if not settings.S3_BUCKET:
+            raise Exception("S3_BUCKET env var must be set")
+        storage = cls(settings.S3_BUCKET, settings.S3_TEMPLATES_PREFIX, settings.TEMPLATES_CACHE_DIR,
+                      settings.TEMPLATES_S3_INFO_TTL_SECONDS)
+        provider.register(TemplatesFileStorageABC, Singleton(storage))
+
+    __bucket: str
+    __prefix: str
+    __cache_dir: Path
+    __info_ttl: float
+    __infos: dict[str, tuple[float, TemplateFileInfo]]
+    __lock: threading.Lock
+    __logger: logging.Logger
+
+    def __init__(self, bucket: str, prefix: str, cache_dir: os.PathLike, info_ttl: float = 30, client=None):
+        """
+        :param info_ttl: Сколько секунд считать версию файла актуальной. Столько же будет видна старая версия
+            шаблона после его замены в S3.
+        :param client: Клиент boto3. None - по настройкам из окружения.
+        """
+        self.__bucket = bucket
+        self.__prefix = prefix
+        self.__cache_dir = Path(cache_dir)
+        self.__cache_dir.mkdir(parents=True, exist_ok=True)
+        self.__info_ttl = info_ttl
+        self.__client = client
+        self.__infos = {}
+        self.__lock = threading.Lock()
+        self.__logger = logging.getLogger(self.__class__.__name__)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # клиент boto3 и блокировка не сериализуются
+        del state["_S3TemplatesStorage__client"], state["_S3TemplatesStorage__lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__client = None
+        self.__lock = threading.Lock()
+
+    def __get_client(self):
+        if self.__client is None:
+            self.__client = create_s3_client()
+        return self.__client
+
+    def __raise_if_missing(self, e: ClientError, filename: str):
+        if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+            raise FileNotFoundError(f"Template file {filename} not found") from e
+
+    def list_template_files(self) -> list[str]:
+        paginator = self.__get_client().get_paginator("list_objects_v2")
+        result = []
+        for page in paginator.paginate(Bucket=self.__bucket, Prefix=self.__prefix, Delimiter="/"):
+            for obj in page.get("Contents", []):
+                name = obj["Key"][len(self.__prefix):]
+                if name.endswith(".docx") and not name.startswith("~$"):
+                    result.append(name)
+        return sorted(result)
+
+    def get_template_file_info(self, filename: str) -> TemplateFileInfo:
+        now = time.monotonic()
+        with self.__lock:
+            cached = self.__infos.get(filename)
+        if cached is not None and now - cached[0] < self.__info_ttl:
+            return cached[1]
+
+        try:
+            head = self.__get_client().head_object(Bucket=self.__bucket, Key=self.__prefix + filename)
+        except ClientError as e:
+            self.__raise_if_missing(e, filename)
+            raise
+
+        info = TemplateFileInfo(head["ContentLength"], _to_ns(head["LastModified"]))
+        with self.__lock:
+            self.__infos[filename] = (now, info)
+        return info
+
+    def __download(self, filename: str, info: TemplateFileInfo) -> Path:
+        local_path = self.__cache_dir / filename
+        fd, tmp_path = tempfile.mkstemp(dir=self.__cache_dir, prefix=f".{filename}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                self.__get_client().download_fileobj(self.__bucket, self.__prefix + filename, f)
+            os.utime(tmp_path, ns=(info.modified_ns, info.modified_ns))
+            os.replace(tmp_path, local_path)
+        except ClientError as e:
+            os.unlink(tmp_path)
+            self.__raise_if_missing(e, filename)
+            raise
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        self.__logger.info("Template %s downloaded to the local cache", filename)
+        return local_path
+
+    @contextmanager
+    def open_template_file(self, filename: str) -> Generator[BinaryIO, None, None]:
+        info = self.get_template_file_info(filename)
+        local_path = self.__cache_dir / filename
+        try:
+            stat = local_path.stat()
+            is_actual = stat.st_size == info.size and stat.st_mtime_ns == info.modified_ns
+        except FileNotFoundError:
+            is_actual = False
+
+        if not is_actual:
+            local_path = self.__download(filename, info)
+
+        with open(local_path, "rb") as f:
+            yield f
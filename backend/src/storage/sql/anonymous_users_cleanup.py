@@ -0,0 +1,121 @@
+import asyncio
+import datetime
+import logging
+
+from sqlalchemy import select, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from src.config import settings
+from src.core.users.types import ANONYMOUS_SSO_PROVIDER
+from src.storage.cache.ttl_cache import UserInfoCache
+from src.storage.sql.connection import async_session
+from src.storage.sql.models import User, Issue
+from src.application.provider import Registerable, Provider, Singleton
+
+
+class AnonymousUsersCleanup(Registerable):
+    """
+    Фоновое удаление записей анонимных пользователей, которые создавались на каждого гостя до JWT-only сессий.
+
+    Удаляются записи старше max_age (по умолчанию - время жизни токена: войти под таким пользователем уже нельзя).
+    Их обращения переносятся в anonymous_id, чтобы не потерять владельца.
+    Работает пачками по batch_size в отдельных транзакциях, чтобы не держать долгие блокировки на users.
+    SKIP LOCKED позволяет нескольким воркерам бэкенда чистить одновременно.
+    """
+
+    __REG_ORDER__ = 1
+
+    @classmethod
+    async def on_build_provider(cls, provider: Provider):
+        if settings.ANONYMOUS_CLEANUP_INTERVAL_SECONDS <= 0:
+            return
+        cleanup = cls(async_session,
+                      provider[UserInfoCache],
+                      settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+                      settings.ANONYMOUS_CLEANUP_BATCH_SIZE,
+                      settings.ANONYMOUS_CLEANUP_INTERVAL_SECONDS)
+        cleanup.start()
+        provider.register(AnonymousUsersCleanup, Singleton(cleanup))
+
+    __session_factory: sessionmaker
+    __cache: UserInfoCache | None
+    __max_age: float
+    __batch_size: int
+    __interval: float
+    __task: asyncio.Task | None
+    __logger: logging.Logger
+
+    def __init__(self, session_factory: sessionmaker, cache: UserInfoCache | None = None, max_age: float = 86400,
+                 batch_size: int = 500, interval: float = 3600):
+        """
+        :param max_age: Возраст записи в секундах, после которого она удаляется.
+        """
+        self.__session_factory = session_factory
+        self.__cache = cache
+        self.__max_age = max_age
+        self.__batch_size = batch_size
+        self.__interval = interval
+        self.__task = None
+        self.__logger = logging.getLogger(self.__class__.__name__)
+
+    def start(self):
+        self.__task = asyncio.create_task(self.__run())
+
+    async def stop_async(self):
+        if self.__task:
+            self.__task.cancel()
+            try:
+                await self.__task
+            except asyncio.CancelledError:
+                pass
+            self.__task = None
+
+    async def __run(self):
+        while True:
+            try:
+                await self.cleanup_async()
+            except Exception as e:
+                # повторим на следующем проходе
+                self.__logger.warning("Failed to clean up anonymous users", exc_info=e)
+            await asyncio.sleep(self.__interval)
+
+    async def __delete_batch(self, session: AsyncSession, cutoff: datetime.datetime) -> int:
+        ids = (await session.execute(
+            select(User.id)
+            .where(User.sso_provider == ANONYMOUS_SSO_PROVIDER, User.created_at < cutoff)
+            .limit(self.__batch_size)
+            .with_for_update(skip_locked=True)
+        )).scalars().all()
+        if not ids:
+            return 0
+
+        await session.execute(
+            update(Issue)
+            .where(Issue.user_id.in_(ids))
+            .values(anonymous_id=Issue.user_id, user_id=None)
+        )
+        await session.execute(delete(User).where(User.id.in_(ids)))
+        await session.commit()
+
+        if self.__cache is not None:
+            for user_id in ids:
+                self.__cache.invalidate(str(user_id))
+        return len(ids)
+
+    async def cleanup_async(self) -> int:
+        """
+        :return: Количество удаленных записей.
+        """
+        cutoff = datetime.datetime.now(datetime.UTC) - datetime.timedelta(seconds=self.__max_age)
+        removed = 0
+        while True:
+            async with self.__session_factory() as session:
+                batch = await self.__delete_batch(session, cutoff)
+            removed += batch
+            if batch < self.__batch_size:
+                break
+
+        if removed:
+            self.__logger.info("Removed %s stale anonymous users", removed)
+        return removed
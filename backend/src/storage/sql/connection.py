@@ -1,20 +1,46 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
-import logging
 
 from src.config import settings
+from src.storage.sql.pool_metrics import InstrumentedAsyncQueuePool
 
-logger = logging.getLogger(__name__)
 
-database_url = settings.DATABASE_URL
+def normalize_url(url: str) -> str:
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
 
-if database_url.startswith("postgresql://"):
-    database_url = database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
 
-engine = create_async_engine(
-    database_url,
-    echo=settings.DEBUG,
-    future=True
+def create_engine(url: str) -> AsyncEngine:
+    connect_args = {}
+    if url.startswith("postgresql+asyncpg://"):
+        # кэш подготовленных запросов адаптера SQLAlchemy и самого asyncpg. 0 - для pgbouncer в режиме transaction
+        connect_args["prepared_statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+        connect_args["statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+
+    return create_async_engine(
+        url,
+        echo=settings.DEBUG,
+        future=True,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        # соединение, разорванное Postgres или балансировщиком, заменяется до выдачи, а не падает в запросе
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+
+
+database_url = normalize_url(settings.DATABASE_URL)
+engine = create_engine(database_url)
+
+replica_url = normalize_url(settings.DATABASE_REPLICA_URL) if settings.DATABASE_REPLICA_URL else None
+# без реплики чтение идет в основную БД через тот же пул
+read_engine = (create_engine(replica_url) if replica_url else engine).execution_options(
+    # без BEGIN и COMMIT/ROLLBACK: каждый SELECT - один запрос к серверу
+    isolation_level="AUTOCOMMIT",
 )
 
 async_session = sessionmaker(
@@ -23,6 +49,13 @@ async_session = sessionmaker(
     expire_on_commit=False
 )
 
+async_read_session = sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+)
+
 
 async def get_session() -> AsyncSession:
     async with async_session() as session:
@@ -32,8 +65,9 @@ async def get_session() -> AsyncSession:
             await session.close()
 
 
-async def create_tables():
-    async with engine.begin() as conn:
-        from src.storage.sql.base import Base
-        await conn.run_sync(Base.metadata.create_all)
-        logger.info("Database tables created successfully")
\ No newline at end of file
+async def get_read_session() -> AsyncSession:
+    async with async_read_session() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, Text, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, String, Boolean, Text, Integer, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 import uuid
@@ -8,8 +8,12 @@ from src.storage.sql.base import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # один пользователь на аккаунт SSO, по этому индексу get_or_create находит конфликт при входе
+        Index("uq_users_sso_provider_sso_id", "sso_provider", "sso_id", unique=True),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String(255), nullable=False, index=True)
     sso_provider = Column(String(50), nullable=False)
     sso_id = Column(String(255), nullable=False)
@@ -27,10 +31,29 @@ class User(Base):
 class Issue(Base):
     __tablename__ = "issues"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     text = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
+    anonymous_id = Column(UUID(as_uuid=True), nullable=True)
+    """
+    id анонимного пользователя из JWT. Записи в users для него нет, поэтому без внешнего ключа.
+    """
 
     def __repr__(self):
         return f"<Issue {self.id} ({self.text})>"
+
+
+class OAuthState(Base):
+    __tablename__ = "oauth_states"
+
+    state = Column(String(64), primary_key=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<OAuthState {self.state}>"
+
+
+# список обращений пользователя: WHERE user_id = ? ORDER BY created_at DESC читается по индексу без сортировки
+Index("ix_issues_user_id_created_at", Issue.user_id, Issue.created_at.desc())
+Index("ix_issues_anonymous_id_created_at", Issue.anonymous_id, Issue.created_at.desc())
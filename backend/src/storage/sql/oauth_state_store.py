@@ -0,0 +1,63 @@
+import datetime
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import sessionmaker
+
+from src.config import settings
+from src.core.users.iface import OAuthStateStoreABC
+from src.storage.sql.connection import async_session
+from src.storage.sql.models import OAuthState
+from src.application.provider import Registerable, Provider, Singleton
+
+
+class SQLOAuthStateStore(OAuthStateStoreABC, Registerable):
+    """
+    State OAuth в таблице oauth_states: callback проходит в любом воркере бэкенда.
+    Каждая операция - один запрос в своей короткой транзакции, не зависящей от сессии запроса.
+    """
+
+    __REG_ORDER__ = -1
+
+    @classmethod
+    async def on_build_provider(cls, provider: Provider):
+        if settings.OAUTH_STATE_STORE != "sql":
+            return
+        provider.register(OAuthStateStoreABC, Singleton(cls(async_session)))
+
+    __session_factory: sessionmaker
+
+    def __init__(self, session_factory: sessionmaker):
+        self.__session_factory = session_factory
+
+    @staticmethod
+    def __now() -> datetime.datetime:
+        return datetime.datetime.now(datetime.UTC)
+
+    async def add(self, state: str, ttl: float):
+        async with self.__session_factory() as session:
+            await session.execute(insert(OAuthState).values(
+                state=state,
+                expires_at=self.__now() + datetime.timedelta(seconds=ttl),
+            ))
+            await session.commit()
+
+    async def consume(self, state: str) -> bool:
+        async with self.__session_factory() as session:
+            # DELETE ... RETURNING атомарен: из двух одновременных callback с одним state пройдет только один
+            expires_at = (await session.execute(
+                delete(OAuthState).where(OAuthState.state == state).returning(OAuthState.expires_at)
+            )).scalar_one_or_none()
+            await session.commit()
+
+        if expires_at is None:
+            return False
+        if expires_at.tzinfo is None:
+            # SQLite возвращает время без часового пояса
+            expires_at = expires_at.replace(tzinfo=datetime.UTC)
+        return expires_at > self.__now()
+
+    async def sweep(self) -> int:
+        async with self.__session_factory() as session:
+            result = await session.execute(delete(OAuthState).where(OAuthState.expires_at <= self.__now()))
+            await session.commit()
+        return result.rowcount
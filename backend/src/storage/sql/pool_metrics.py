@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class PoolMetrics:
+    """
+    Счетчики и скользящее окно задержек получения соединения из пула.
+    """
+
+    WINDOW = 1024
+
+    checkouts: int
+    waits: int
+    """
+    Получения, которым пришлось ждать освобождения соединения: свободных нет и overflow исчерпан.
+    """
+    timeouts: int
+    max_in_use: int
+    __latencies: deque[float]
+    __lock: threading.Lock
+
+    def __init__(self):
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.max_in_use = 0
+        self.__latencies = deque(maxlen=self.WINDOW)
+        self.__lock = threading.Lock()
+
+    def observe(self, latency: float, waited: bool, in_use: int):
+        with self.__lock:
+            self.checkouts += 1
+            self.waits += waited
+            self.max_in_use = max(self.max_in_use, in_use)
+            self.__latencies.append(latency)
+
+    def observe_timeout(self):
+        with self.__lock:
+            self.timeouts += 1
+            self.waits += 1
+
+    def to_dict(self) -> dict[str, float | int]:
+        with self.__lock:
+            ordered = sorted(self.__latencies)
+        return {
+            "checkouts": self.checkouts,
+            "waits": self.waits,
+            "timeouts": self.timeouts,
+            "max_in_use": self.max_in_use,
+            "checkout_p50_ms": _percentile(ordered, 50) * 1000,
+            "checkout_p95_ms": _percentile(ordered, 95) * 1000,
+            "checkout_p99_ms": _percentile(ordered, 99) * 1000,
+        }
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений AsyncEngine, который замеряет время получения соединения (вместе с pre-ping) и ожидания.
+    По этим данным подбираются DB_POOL_SIZE и DB_MAX_OVERFLOW под реальную конкурентность.
+    """
+
+    metrics: PoolMetrics
+
+    def __init__(self, creator, pool_size: int = 5, max_overflow: int = 10, **kw):
+        super().__init__(creator, pool_size=pool_size, max_overflow=max_overflow, **kw)
+        self.__max_overflow = max_overflow
+        self.metrics = PoolMetrics()
+
+    def connect(self) -> PoolProxiedConnection:
+        # max_overflow = -1 - без ограничения, ждать не приходится никогда
+        waited = self.__max_overflow > -1 and self.checkedin() == 0 and self.overflow() >= self.__max_overflow
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.observe_timeout()
+            raise
+        self.metrics.observe(time.perf_counter() - started, waited, self.checkedout())
+        return connection
+
+    def describe(self) -> dict[str, float | int]:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "in_use": self.checkedout(),
+            "overflow": self.overflow(),
+            **self.metrics.to_dict(),
+        }
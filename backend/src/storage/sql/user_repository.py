@@ -1,12 +1,14 @@
 from httptools.parser.parser import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, func
+from sqlalchemy.dialects import postgresql, sqlite
 import uuid
-from uuid import uuid4
 
 from src.storage.sql.models import User
 from src.core.users.iface import UserRepositoryABC
 from src.core.users.types import UserInfo, UserSSOInfo
+from src.storage.cache.cached_repositories import CachedUserRepository
+from src.storage.cache.ttl_cache import UserInfoCache
 from src.application.provider import Registerable, Provider, Transient
 
 
@@ -14,7 +16,10 @@ class UserRepository(UserRepositoryABC, Registerable):
 
     @classmethod
     async def on_build_provider(cls, provider: Provider):
-        provider.register(UserRepositoryABC, Transient(cls))
+        if provider[UserInfoCache].max_entries > 0:
+            provider.register(UserRepositoryABC, Transient(CachedSQLUserRepository))
+        else:
+            provider.register(UserRepositoryABC, Transient(cls))
 
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -73,31 +78,40 @@ class UserRepository(UserRepositoryABC, Registerable):
         return UserInfo.model_validate(user)
 
     async def get_or_create(self, user_data: UserSSOInfo) -> UserInfo:
-        user = await self.get_by_sso(user_data.sso_provider, user_data.sso_id)
-        if user:
-            return user
-
-        user = await self.get_by_email(user_data.email)
-        if user:
-            return user
-
-        return await self.create(user_data)
-
-    async def create_anonymous(self) -> UserInfo:
-        anon_id = uuid4()
-
-        user = User(
-            id=anon_id,
-            email=f"anon_{anon_id}@anon.local",
-            sso_provider="anonymous",
-            sso_id=str(anon_id),
-            first_name="Гость",
-            last_name="",
-            avatar_url="",
+        """
+        Один запрос INSERT ... ON CONFLICT DO UPDATE ... RETURNING: одновременные входы одного пользователя
+        сходятся на одной записи. Существующему пользователю обновляются данные профиля из SSO.
+        """
+        # SQLite - для тестов
+        insert = sqlite.insert if self.db.get_bind().dialect.name == "sqlite" else postgresql.insert
+        statement = insert(User).values(
+            id=uuid.uuid4(),
+            email=user_data.email,
+            sso_provider=user_data.sso_provider,
+            sso_id=user_data.sso_id,
+            first_name=user_data.first_name,
+            last_name=user_data.last_name,
+            avatar_url=user_data.avatar_url,
         )
-
-        self.db.add(user)
-        await self.db.flush()
-        await self.db.refresh(user)
-
-        return UserInfo.model_validate(user)
\ No newline at end of file
+        statement = statement.on_conflict_do_update(
+            index_elements=[User.sso_provider, User.sso_id],
+            set_={
+                "email": statement.excluded.email,
+                "first_name": statement.excluded.first_name,
+                "last_name": statement.excluded.last_name,
+                "avatar_url": statement.excluded.avatar_url,
+                "updated_at": func.now(),
+            },
+        ).returning(User).execution_options(populate_existing=True)
+
+        result = await self.db.execute(statement)
+        return UserInfo.model_validate(result.scalar_one())
+
+
+class CachedSQLUserRepository(CachedUserRepository):
+    """
+    Transient создает объект по аннотациям конструктора, поэтому сессия и кэш передаются сюда, а не готовый репозиторий.
+    """
+
+    def __init__(self, db: AsyncSession, cache: UserInfoCache):
+        super().__init__(UserRepository(db), cache)
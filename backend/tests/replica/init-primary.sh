@@ -0,0 +1,5 @@
+#!/bin/bash
+set -e
+
+psql -v ON_ERROR_STOP=1 -U "$POSTGRES_USER" -c "CREATE ROLE replicator WITH REPLICATION LOGIN PASSWORD 'replicator'"
+echo "host replication replicator all scram-sha-256" >> "$PGDATA/pg_hba.conf"
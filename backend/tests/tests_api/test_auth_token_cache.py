@@ -0,0 +1,52 @@
+import time
+import uuid
+from unittest.mock import patch
+
+from jose import jwt
+
+from src.core.users import auth_service
+from src.core.users.auth_service import AuthService
+from src.core.users.types import UserInfo
+
+
+def make_token(service: AuthService) -> tuple[str, UserInfo]:
+    user = UserInfo(id=uuid.uuid4(), email="user@example.com", sso_provider="google", sso_id="1",
+                    first_name="", last_name="", avatar_url="")
+    return service.authenticate(user).access_token, user
+
+
+def test_verified_token_is_decoded_once():
+    service = AuthService(cache_size=10)
+    token, user = make_token(service)
+
+    with patch.object(auth_service.jwt, "decode", wraps=jwt.decode) as decode:
+        for _ in range(5):
+            assert service.read_token(token) == str(user.id)
+
+    decode.assert_called_once()
+
+
+def test_invalid_tokens_are_not_cached():
+    service = AuthService(cache_size=10)
+    token, _ = make_token(service)
+    forged = token[:-2] + ("AA" if not token.endswith("AA") else "BB")
+    expired = jwt.encode({"sub": "1", "type": "access", "exp": int(time.time()) - 10},
+                         service.secret_key, algorithm=service.jwt_algorithm)
+
+    with patch.object(auth_service.jwt, "decode", wraps=jwt.decode) as decode:
+        for _ in range(2):
+            assert service.read_token(forged) is None
+            assert service.read_token(expired) is None
+
+    assert decode.call_count == 4
+
+
+def test_cache_can_be_disabled():
+    service = AuthService(cache_size=0)
+    token, user = make_token(service)
+
+    with patch.object(auth_service.jwt, "decode", wraps=jwt.decode) as decode:
+        assert service.read_token(token) == str(user.id)
+        assert service.read_token(token) == str(user.id)
+
+    assert decode.call_count == 2
@@ -0,0 +1,161 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.api.issue import router as issue_router
+from src.application import provider as provider_module
+from src.application.provider import Provider, Singleton, Transient
+from src.core.chats.service import IssueChatService, IssueChatState
+from src.core.issue_service import IssueService
+from src.core.users.auth_service import AuthService
+from src.core.users.iface import AuthServiceABC, UserRepositoryABC
+from src.core.users.types import UserInfo
+from src.exceptions import ExternalServiceUnavailableException
+from src.storage.sql.base import Base
+from src.storage.sql.connection import get_session, get_read_session
+from src.storage.sql.models import Issue, User
+from src.storage.sql.user_repository import UserRepository
+
+
+LLM_SECONDS = 0.3
+
+
+class _SlowChatService:
+    """
+    Имитирует работу графа с LLM и запоминает, сколько соединений было занято в это время.
+    """
+
+    def __init__(self, engine, fail: bool = False):
+        self.engine = engine
+        self.fail = fail
+        self.checked_out_during_llm = None
+
+    async def process_new_user_message(self, issue_id: int, message_text: str) -> IssueChatState:
+        self.checked_out_during_llm = self.engine.pool.checkedout()
+        await asyncio.sleep(LLM_SECONDS)
+        if self.fail:
+            raise ExternalServiceUnavailableException()
+        return IssueChatState([], False, False)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}")
+
+    async def _create():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(_create())
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+def _client(engine, chat_service, monkeypatch) -> TestClient:
+    test_provider = Provider()
+    test_provider.register(AuthServiceABC, Singleton(AuthService()))
+    test_provider.register(UserRepositoryABC, Transient(UserRepository))
+    test_provider.register(IssueService, Transient(IssueService))
+    test_provider.register(IssueChatService, Singleton(chat_service))
+    monkeypatch.setattr(provider_module, "global_provider", test_provider, raising=False)
+
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def _get_session():
+        async with session_factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(issue_router)
+    app.dependency_overrides[get_session] = _get_session
+    app.dependency_overrides[get_read_session] = _get_session
+    return TestClient(app)
+
+
+def _hold_times(engine) -> list[float]:
+    hold_times, checked_out_at = [], {}
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def _checkout(dbapi_connection, *_):
+        checked_out_at[id(dbapi_connection)] = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def _checkin(dbapi_connection, *_):
+        started = checked_out_at.pop(id(dbapi_connection), None)
+        if started is not None:
+            hold_times.append(time.perf_counter() - started)
+
+    return hold_times
+
+
+class TestCreateIssueConnection:
+
+    def test_connection_released_before_llm(self, engine, monkeypatch):
+        chat_service = _SlowChatService(engine)
+        hold_times = _hold_times(engine)
+
+        response = _client(engine, chat_service, monkeypatch).post("/issue/create/", json={"text": "Не вернули деньги"})
+
+        assert response.status_code == 200
+        assert response.headers["X-Anonymous"] == "true"
+        assert chat_service.checked_out_during_llm == 0
+        assert hold_times and max(hold_times) < LLM_SECONDS
+
+    def test_connection_released_before_llm_for_user(self, engine, monkeypatch):
+        user = User(email="user@example.com", sso_provider="google", sso_id="1", first_name="Test", last_name="User",
+                    avatar_url="")
+
+        async def _create_user():
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                session.add(user)
+                await session.commit()
+
+        asyncio.run(_create_user())
+        token = AuthService().authenticate(UserInfo.model_validate(user)).access_token
+        chat_service = _SlowChatService(engine)
+        hold_times = _hold_times(engine)
+
+        # пользователь читается из БД (кэша в провайдере нет), соединение чтения тоже должно освободиться до LLM
+        response = _client(engine, chat_service, monkeypatch).post("/issue/create/", json={"text": "Не вернули деньги"},
+                                                                   headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == 200
+        assert "X-Anonymous" not in response.headers
+        assert chat_service.checked_out_during_llm == 0
+        assert hold_times and max(hold_times) < LLM_SECONDS
+
+    def test_issue_removed_when_llm_fails(self, engine, monkeypatch):
+        response = _client(engine, _SlowChatService(engine, fail=True), monkeypatch).post("/issue/create/",
+                                                                                           json={"text": "text"})
+        assert response.status_code == 503
+
+        async def _count() -> int:
+            async with AsyncSession(engine) as session:
+                return len((await session.execute(select(Issue))).scalars().all())
+
+        assert asyncio.run(_count()) == 0
+
+    def test_anonymous_issue_creates_no_user_row(self, engine, monkeypatch):
+        client = _client(engine, _SlowChatService(engine), monkeypatch)
+        response = client.post("/issue/create/", json={"text": "text"})
+        assert response.status_code == 200
+
+        async def _rows():
+            async with AsyncSession(engine) as session:
+                return ((await session.execute(select(User))).scalars().all(),
+                        (await session.execute(select(Issue))).scalar_one())
+
+        users, issue = asyncio.run(_rows())
+        assert users == []
+        assert issue.user_id is None and issue.anonymous_id is not None
+
+        # повторный запрос с токеном анонима получает того же пользователя без обращения к users
+        token = response.headers["X-Auth-Token"]
+        claims = AuthService().read_claims(token)
+        assert claims.anonymous and claims.user_id == str(issue.anonymous_id)
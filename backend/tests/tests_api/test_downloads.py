@@ -0,0 +1,73 @@
+import io
+import os
+import zipfile
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from src.api.downloads import file_download_response, iter_zip
+from src.config import settings
+from src.storage.filesystem.fs_sharded_issue_result_storage import ShardedIssueResultStorage
+
+
+@pytest.fixture
+def client(tmp_path):
+    storage = ShardedIssueResultStorage(tmp_path)
+    with storage.write_issue_result_file(1) as file:
+        file.write(b"0123456789")
+
+    app = FastAPI()
+
+    @app.get("/download/{issue_id}")
+    async def download(issue_id: int, request: Request):
+        return file_download_response(request, storage.get_issue_result_file_info(issue_id), "result.docx")
+
+    return TestClient(app)
+
+
+class TestFileDownloadResponse:
+
+    def test_direct_etag_and_range(self, client):
+        response = client.get("/download/1")
+        assert response.status_code == 200
+        assert response.content == b"0123456789"
+        etag = response.headers["etag"]
+
+        assert client.get("/download/1", headers={"If-None-Match": etag}).status_code == 304
+        assert client.get("/download/1", headers={"If-None-Match": '"other"'}).status_code == 200
+        last_modified = response.headers["last-modified"]
+        assert client.get("/download/1", headers={"If-Modified-Since": last_modified}).status_code == 304
+
+        partial = client.get("/download/1", headers={"Range": "bytes=2-4"})
+        assert partial.status_code == 206
+        assert partial.content == b"234"
+
+    def test_accel_redirect(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "RESULTS_DOWNLOAD_MODE", "accel")
+        response = client.get("/download/1")
+
+        assert response.status_code == 200
+        assert response.content == b""
+        assert response.headers["x-accel-redirect"].startswith("/internal/results/blobs/")
+        assert "result.docx" in response.headers["content-disposition"]
+
+
+def test_iter_zip_streams_entries():
+    large = os.urandom(1024 * 1024)
+
+    def _missing():
+        raise FileNotFoundError()
+
+    chunks = list(iter_zip([("a.docx", lambda: io.BytesIO(b"first")),
+                            ("missing.docx", _missing),
+                            ("b.docx", lambda: io.BytesIO(large))],
+                           chunk_size=64 * 1024))
+
+    # ни один кусок ответа не держит файл целиком
+    assert max(len(chunk) for chunk in chunks) < 64 * 1024 + 1024
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert archive.namelist() == ["a.docx", "b.docx"]
+        assert archive.read("a.docx") == b"first"
+        assert archive.read("b.docx") == large
+        assert archive.testzip() is None
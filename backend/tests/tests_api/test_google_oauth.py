@@ -0,0 +1,147 @@
+import hashlib
+import time
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+from jose.utils import calculate_at_hash
+
+from src.external.google_oauth import GoogleOAuth
+from src.storage.cache.oauth_state_store import InMemoryOAuthStateStore
+
+
+class FakeGoogle:
+    """
+    Эндпоинты Google для httpx.MockTransport: discovery, JWKS, обмен кода на токены, userinfo.
+    """
+
+    def __init__(self, client_id: str):
+        self.client_id = client_id
+        self.requests: list[str] = []
+        self.keys: dict[str, str] = {}
+        self.signing_kid = self.rotate_key()
+        self.id_token_audience = client_id
+        self.with_id_token = True
+
+    def rotate_key(self) -> str:
+        kid = f"key{len(self.keys)}"
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.keys[kid] = private_key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                                   serialization.NoEncryption()).decode()
+        self.signing_kid = kid
+        return kid
+
+    def __jwks(self) -> dict:
+        keys = []
+        for kid, pem in self.keys.items():
+            public = jwk.construct(pem, "RS256").public_key().to_dict()
+            keys.append({**public, "kid": kid, "alg": "RS256", "use": "sig"})
+        return {"keys": keys}
+
+    def __tokens(self) -> dict:
+        access_token = "access-token"
+        tokens = {"access_token": access_token}
+        if self.with_id_token:
+            now = int(time.time())
+            claims = {"iss": "https://accounts.google.com", "aud": self.id_token_audience, "sub": "42",
+                      "email": "user@example.com", "given_name": "Test", "family_name": "User",
+                      "picture": "https://example.com/a.png", "iat": now, "exp": now + 3600,
+                      "at_hash": calculate_at_hash(access_token, hashlib.sha256)}
+            tokens["id_token"] = jwt.encode(claims, self.keys[self.signing_kid], algorithm="RS256",
+                                            headers={"kid": self.signing_kid})
+        return tokens
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.requests.append(path)
+        if path == "/.well-known/openid-configuration":
+            return httpx.Response(200, headers={"Cache-Control": "public, max-age=3600"}, json={
+                "issuer": "https://accounts.google.com",
+                "token_endpoint": "https://oauth2.googleapis.com/token",
+                "jwks_uri": "https://www.googleapis.com/oauth2/v3/certs",
+                "userinfo_endpoint": "https://openidconnect.googleapis.com/v1/userinfo",
+            })
+        if path == "/oauth2/v3/certs":
+            return httpx.Response(200, headers={"Cache-Control": "public, max-age=20000"}, json=self.__jwks())
+        if path == "/token":
+            return httpx.Response(200, json=self.__tokens())
+        if path == "/v1/userinfo":
+            return httpx.Response(200, json={"sub": "42", "email": "user@example.com", "given_name": "Test",
+                                             "family_name": "User", "picture": "https://example.com/a.png"})
+        return httpx.Response(404)
+
+
+@pytest.fixture
+def google():
+    return FakeGoogle("client-id")
+
+
+@pytest.fixture
+def oauth(google):
+    oauth = GoogleOAuth(InMemoryOAuthStateStore(10, 600), httpx.AsyncClient(transport=httpx.MockTransport(google)))
+    oauth.client_id = google.client_id
+    return oauth
+
+
+@pytest.mark.asyncio
+async def test_id_token_verified_locally_with_cached_documents(oauth, google):
+    for _ in range(3):
+        user = await oauth.get_user_info("code")
+        assert (user.sso_id, user.email, user.first_name, user.last_name) == ("42", "user@example.com", "Test", "User")
+
+    # discovery и JWKS загружены один раз, userinfo не запрашивался
+    assert google.requests.count("/.well-known/openid-configuration") == 1
+    assert google.requests.count("/oauth2/v3/certs") == 1
+    assert google.requests.count("/token") == 3
+    assert "/v1/userinfo" not in google.requests
+
+
+@pytest.mark.asyncio
+async def test_rotated_key_reloads_jwks(oauth, google):
+    await oauth.get_user_info("code")
+    google.rotate_key()
+    oauth.jwks.min_refresh_interval = 0
+
+    assert (await oauth.get_user_info("code")).sso_id == "42"
+    assert google.requests.count("/oauth2/v3/certs") == 2
+
+
+@pytest.mark.asyncio
+async def test_unknown_key_refresh_is_rate_limited(oauth, google):
+    await oauth.get_user_info("code")
+    google.rotate_key()
+
+    with pytest.raises(ValueError):
+        await oauth.get_user_info("code")
+    # повторный токен с тем же неизвестным kid не вызывает новую загрузку JWKS
+    with pytest.raises(ValueError):
+        await oauth.get_user_info("code")
+    assert google.requests.count("/oauth2/v3/certs") == 1
+
+
+@pytest.mark.asyncio
+async def test_id_token_for_another_client_rejected(oauth, google):
+    google.id_token_audience = "other-client"
+
+    with pytest.raises(ValueError):
+        await oauth.get_user_info("code")
+
+
+@pytest.mark.asyncio
+async def test_userinfo_used_without_id_token(oauth, google):
+    google.with_id_token = False
+
+    assert (await oauth.get_user_info("code")).email == "user@example.com"
+    assert "/v1/userinfo" in google.requests
+
+
+@pytest.mark.asyncio
+async def test_client_shared_until_closed(oauth):
+    client = oauth.client
+    await oauth.get_user_info("code")
+    assert oauth.client is client and not client.is_closed
+
+    await oauth.close_async()
+    assert client.is_closed
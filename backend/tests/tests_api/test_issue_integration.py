@@ -50,7 +50,7 @@ class TestIssueIntegration:
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
         assert data["issue_id"] == 1
-        mock_service.create_issue.assert_called_once_with("Test issue text", user.id)
+        mock_service.create_issue.assert_called_once_with("Test issue text", user)
 
     @pytest.mark.asyncio
     async def test_download_issue_file_authorized(self):
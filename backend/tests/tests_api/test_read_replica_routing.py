@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.api.issue import router as issue_router
+from src.application import provider as provider_module
+from src.application.provider import Provider, Singleton, Transient
+from src.config import settings
+from src.core.chats.service import IssueChatService, IssueChatState
+from src.core.issue_service import IssueService
+from src.storage.sql import connection
+from src.storage.sql.base import Base
+from src.storage.sql.connection import get_session, get_read_session
+from src.storage.sql.models import Issue
+
+
+class _ChatService:
+    async def get_state(self, issue_id: int) -> IssueChatState:
+        return IssueChatState([], False, False)
+
+
+def _engine(path, issue_ids: list[int]):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+    async def _create():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            session.add_all([Issue(id=issue_id, text="text") for issue_id in issue_ids])
+            await session.commit()
+
+    asyncio.run(_create())
+    return engine
+
+
+@pytest.fixture
+def engines(tmp_path):
+    # реплика отстает: в ней еще нет только что созданного обращения 2
+    primary = _engine(tmp_path / "primary.sqlite", [1, 2])
+    replica = _engine(tmp_path / "replica.sqlite", [1])
+    yield primary, replica.execution_options(isolation_level="AUTOCOMMIT")
+    asyncio.run(primary.dispose())
+    asyncio.run(replica.dispose())
+
+
+def _record(engine, event_name: str) -> list:
+    events = []
+    event.listen(engine.sync_engine, event_name, lambda *args: events.append(args))
+    return events
+
+
+@pytest.fixture
+def client(engines, monkeypatch):
+    primary, replica = engines
+    test_provider = Provider()
+    test_provider.register(IssueService, Transient(IssueService))
+    test_provider.register(IssueChatService, Singleton(_ChatService()))
+    monkeypatch.setattr(provider_module, "global_provider", test_provider, raising=False)
+
+    primary_sessions = sessionmaker(primary, class_=AsyncSession, expire_on_commit=False)
+    replica_sessions = sessionmaker(replica, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(connection, "async_session", primary_sessions)
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_URL", "sqlite+aiosqlite:///replica.sqlite")
+
+    async def _get_session():
+        async with primary_sessions() as session:
+            yield session
+
+    async def _get_read_session():
+        async with replica_sessions() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(issue_router)
+    app.dependency_overrides[get_session] = _get_session
+    app.dependency_overrides[get_read_session] = _get_read_session
+    return TestClient(app)
+
+
+class TestReadReplicaRouting:
+
+    def test_get_reads_from_replica_without_commit(self, client, engines):
+        primary, replica = engines
+        primary_checkouts, replica_commits = _record(primary, "checkout"), _record(replica, "commit")
+
+        assert client.get("/issue/1/chat/").status_code == 200
+
+        assert primary_checkouts == []
+        assert replica_commits == []
+
+    def test_falls_back_to_primary_when_replica_lags(self, client, engines):
+        primary, _ = engines
+        primary_checkouts = _record(primary, "checkout")
+
+        assert client.get("/issue/2/chat/").status_code == 200
+
+        assert len(primary_checkouts) == 1
@@ -0,0 +1,10 @@
+import importlib
+import pkgutil
+
+import src
+
+
+def test_all_src_modules_importable():
+    # build_async импортирует каждый модуль src при поиске Registerable: ошибка импорта не дает запустить бэкенд
+    for module_info in pkgutil.walk_packages(src.__path__, "src."):
+        importlib.import_module(module_info.name)
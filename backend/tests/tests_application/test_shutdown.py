@@ -0,0 +1,59 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.application.provider import Provider, Singleton
+from src.application.shutdown import shutdown_async
+from src.core.templates.iface import TemplatesWatcherABC
+from src.core.templates.rendering_service import TemplateRenderingService
+from src.external.google_oauth import GoogleOAuth
+from src.storage.cache.oauth_state_store import InMemoryOAuthStateStore
+from src.storage.chroma.chroma_templates_catalog import ChromaTemplatesCatalog
+from src.storage.chroma.resilient_client import ResilientChromaClient
+from src.storage.oauth_state_sweeper import OAuthStateSweeper
+from src.storage.sql.anonymous_users_cleanup import AnonymousUsersCleanup
+
+
+@pytest.mark.asyncio
+async def test_registered_services_stopped_in_order():
+    calls = []
+
+    def _service(cls: type, method: str, is_async: bool, error: Exception | None = None):
+        def _stop():
+            calls.append(cls)
+            if error:
+                raise error
+
+        service = MagicMock(spec=cls)
+        setattr(service, method, (AsyncMock if is_async else MagicMock)(side_effect=_stop))
+        return service
+
+    provider = Provider()
+    services = [
+        (TemplatesWatcherABC, _service(TemplatesWatcherABC, "stop_async", True)),
+        (AnonymousUsersCleanup, _service(AnonymousUsersCleanup, "stop_async", True, RuntimeError("stuck"))),
+        (ChromaTemplatesCatalog, _service(ChromaTemplatesCatalog, "close_async", True)),
+        (TemplateRenderingService, _service(TemplateRenderingService, "shutdown", False)),
+        (GoogleOAuth, _service(GoogleOAuth, "close_async", True)),
+        (ResilientChromaClient, _service(ResilientChromaClient, "close", False)),
+    ]
+    for iface, service in services:
+        provider.register(iface, Singleton(service))
+
+    await shutdown_async(provider)
+
+    # OAuthStateSweeper не зарегистрирован и пропускается, ошибка AnonymousUsersCleanup не останавливает остальных
+    assert calls == [iface for iface, _ in services]
+
+
+@pytest.mark.asyncio
+async def test_background_task_cancelled():
+    sweeper = OAuthStateSweeper(InMemoryOAuthStateStore(10, 600), interval=60)
+    sweeper.start()
+    task = sweeper._OAuthStateSweeper__task
+    provider = Provider()
+    provider.register(OAuthStateSweeper, Singleton(sweeper))
+
+    await shutdown_async(provider)
+
+    assert task.cancelled()
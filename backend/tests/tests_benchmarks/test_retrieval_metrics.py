@@ -0,0 +1,49 @@
+import asyncio
+import pytest
+
+from benchmarks.metrics import recall_at_k, reciprocal_rank, percentile, run_concurrent
+from benchmarks.retrieval import load_laws_fixture, load_templates_fixture
+
+
+class TestRetrievalMetrics:
+
+    def test_recall_at_k(self):
+        retrieved = ["a", "b", "c", "d"]
+        assert recall_at_k(retrieved, ["a", "c"], 1) == 0.5
+        assert recall_at_k(retrieved, ["a", "c"], 3) == 1.0
+        assert recall_at_k(retrieved, ["x"], 4) == 0.0
+        assert recall_at_k(retrieved, [], 4) == 0.0
+
+    def test_reciprocal_rank(self):
+        assert reciprocal_rank(["a", "b", "c"], ["a"]) == 1.0
+        assert reciprocal_rank(["a", "b", "c"], ["c", "b"]) == 0.5
+        assert reciprocal_rank(["a", "b", "c"], ["x"]) == 0.0
+
+    def test_percentile(self):
+        samples = list(range(1, 101))
+        assert percentile(samples, 50) == pytest.approx(50.5)
+        assert percentile(samples, 99) == pytest.approx(99.01)
+        assert percentile([], 95) == 0.0
+
+    @pytest.mark.asyncio
+    async def test_run_concurrent_counts_every_call(self):
+        calls = []
+
+        async def _func(item: int):
+            await asyncio.sleep(0)
+            calls.append(item)
+
+        stats = await run_concurrent(_func, list(range(20)), concurrency=4)
+
+        assert sorted(calls) == list(range(20))
+        assert stats.count == 20
+        assert stats.throughput_rps > 0
+
+    def test_fixtures_are_consistent(self):
+        fragments, queries = load_laws_fixture()
+        fragment_ids = {f.fragment_id for f in fragments}
+        assert all(set(q.relevant) <= fragment_ids for q in queries)
+
+        templates, queries = load_templates_fixture()
+        template_ids = {t["id"] for t in templates}
+        assert all(set(q.relevant) <= template_ids for q in queries)
@@ -19,7 +19,7 @@ class TestFreeTemplateSubgraph:
         mock_service = AsyncMock()
         mock_service.get_free_template_async = AsyncMock(return_value={"id": 1, "name": "free"})
         mock_file_service = MagicMock()
-        mock_file_service.extract_text = MagicMock(return_value="template text")
+        mock_file_service.extract_text_async = AsyncMock(return_value="template text")
         mock_llm_use_cases = MagicMock()
         mock_llm_use_cases.setup_free_template_loop = MagicMock(return_value=[ChatMessage.from_ai("Setup complete")])
 
@@ -136,8 +136,8 @@ class TestFullChatGraph:
             mock_free_template_service.return_value = mock_free_template_service_instance
 
             mock_file_service = MagicMock()
-            mock_file_service.extract_text = MagicMock(return_value="template text")
-            mock_file_service.fill_with_values = MagicMock()
+            mock_file_service.extract_text_async = AsyncMock(return_value="template text")
+            mock_file_service.fill_with_values_async = AsyncMock()
             mock_template_file_service.return_value = mock_file_service
             mock_free_file_service.return_value = mock_file_service
 
@@ -216,8 +216,8 @@ class TestFullChatGraph:
             mock_template_service.return_value = mock_template_service_instance
 
             mock_file_service = MagicMock()
-            mock_file_service.extract_text = MagicMock(return_value="template text")
-            mock_file_service.fill_with_values = MagicMock()
+            mock_file_service.extract_text_async = AsyncMock(return_value="template text")
+            mock_file_service.fill_with_values_async = AsyncMock()
             mock_template_file_service.return_value = mock_file_service
             mock_strict_file_service.return_value = mock_file_service
 
@@ -327,8 +327,8 @@ class TestFullChatGraph:
             mock_free_template_service.return_value = mock_free_template_service_instance
 
             mock_file_service = MagicMock()
-            mock_file_service.extract_text = MagicMock(return_value="template text")
-            mock_file_service.fill_with_values = MagicMock()
+            mock_file_service.extract_text_async = AsyncMock(return_value="template text")
+            mock_file_service.fill_with_values_async = AsyncMock()
             mock_template_file_service.return_value = mock_file_service
             mock_free_file_service.return_value = mock_file_service
 
@@ -16,7 +16,7 @@ class TestStrictTemplateSubgraph:
         subgraph = StrictTemplateSubgraph()
 
         mock_file_service = MagicMock()
-        mock_file_service.extract_text = MagicMock(return_value="template text")
+        mock_file_service.extract_text_async = AsyncMock(return_value="template text")
         mock_llm_use_cases = MagicMock()
         mock_llm_use_cases.setup_strict_template_loop = MagicMock(return_value=[ChatMessage.from_ai("Setup complete")])
 
@@ -74,7 +74,7 @@ class TestStrictTemplateSubgraph:
         subgraph = StrictTemplateSubgraph()
 
         mock_file_service = MagicMock()
-        mock_file_service.fill_with_values = MagicMock()
+        mock_file_service.fill_with_values_async = AsyncMock()
         mock_result_storage = MagicMock()
         mock_result_file = MagicMock()
         mock_result_storage.write_issue_result_file = MagicMock(return_value=mock_result_file)
@@ -92,4 +92,4 @@ class TestStrictTemplateSubgraph:
         assert "success" in result
         assert result["success"] is True
         assert len(result["messages"]) == 2
-        mock_file_service.fill_with_values.assert_called_once()
\ No newline at end of file
+        mock_file_service.fill_with_values_async.assert_awaited_once()
\ No newline at end of file
@@ -32,7 +32,7 @@ class TestTemplateAnalysisSubgraph:
         subgraph = TemplateAnalysisSubgraph()
 
         mock_file_service = MagicMock()
-        mock_file_service.extract_text = MagicMock(return_value="template text")
+        mock_file_service.extract_texts_async = AsyncMock(return_value=["template text"])
         mock_llm = AsyncMock()
         mock_llm_use_cases = AsyncMock()
 
@@ -60,7 +60,7 @@ class TestTemplateAnalysisSubgraph:
         subgraph = TemplateAnalysisSubgraph()
 
         mock_file_service = MagicMock()
-        mock_file_service.extract_text = MagicMock(return_value="template text")
+        mock_file_service.extract_texts_async = AsyncMock(return_value=["template text"])
         mock_llm = AsyncMock()
         mock_llm_use_cases = AsyncMock()
 
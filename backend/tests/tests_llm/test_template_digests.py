@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from src.core.chats.types import ChatMessage, MessageRole
+from src.core.llm.iface import LLMABC
+from src.core.llm import use_cases as llm_use_cases
+from src.core.templates.types import Template, TemplateField
+
+
+class _FakeLLM(LLMABC):
+
+    def __init__(self, response: dict):
+        self.response = response
+        self.calls = []
+
+    async def invoke_async(self, messages, weak_model: bool = False, json_output: bool = False) -> ChatMessage:
+        self.calls.append((list(messages), weak_model))
+        return ChatMessage.from_ai(json.dumps(self.response, ensure_ascii=False))
+
+
+TEMPLATE = Template("git_salary_delay", "Жалоба на задержку зарплаты", "git_salary_delay.docx",
+                    {"employer": TemplateField("employer", "Название работодателя"),
+                     "debt_period": TemplateField("debt_period", "Период задолженности")})
+
+
+class TestTemplateDigests:
+
+    @pytest.mark.asyncio
+    async def test_generate_digest_with_weak_model(self):
+        llm = _FakeLLM({"addressee": "Государственная инспекция труда", "purpose": "Жалоба на задержку зарплаты"})
+        digest = await llm_use_cases.generate_template_digest_async(llm, TEMPLATE, "Полный текст шаблона")
+
+        assert digest == ("Название: Жалоба на задержку зарплаты\n"
+                          "Адресат: Государственная инспекция труда\n"
+                          "Назначение: Жалоба на задержку зарплаты\n"
+                          "Ключевые поля: Название работодателя, Период задолженности")
+        messages, weak_model = llm.calls[0]
+        assert weak_model
+        assert messages[0].text == "Полный текст шаблона"
+
+    @pytest.mark.asyncio
+    async def test_select_by_digests(self):
+        llm = _FakeLLM({"relevant_template_index": 1, "user_message": "Нашел шаблон"})
+        history = [ChatMessage.from_user("Не платят зарплату")]
+        result = await llm_use_cases.analyze_templates_async(llm, history, ["описание 0", "описание 1"], digests=True)
+
+        assert result.relevant_template_index == 1
+        messages, weak_model = llm.calls[0]
+        assert not weak_model
+        # все описания в одном сообщении с номерами
+        assert len(messages) == 3
+        assert messages[1].role == MessageRole.SYSTEM
+        assert messages[1].text == "Шаблон 0:\nописание 0\n\nШаблон 1:\nописание 1"
+        assert "краткие описания" in messages[2].text
@@ -0,0 +1,135 @@
+import asyncio
+import multiprocessing
+
+import docx
+import pytest
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import StateGraph, START
+from langgraph.types import interrupt
+
+from src.core.chats.graph.common import BaseState
+from src.core.results.rerender_service import ResultsRerenderService
+from src.core.templates.types import Template
+from src.storage.filesystem.fs_issue_result_storage import FilesystemIssueResultStorageABC
+from src.storage.filesystem.fs_templates_storage import FilesystemTemplatesStorage
+
+
+CLAIM = Template("claim", "claim", "claim.docx", {})
+OTHER = Template("other", "other", "other.docx", {})
+
+
+def _save_template(path, text: str):
+    document = docx.Document()
+    document.add_paragraph(text)
+    document.save(path)
+
+
+def _read_text(path) -> str:
+    return docx.Document(path).paragraphs[0].text
+
+
+async def _run_chat(checkpointer, issue_id: int, state: BaseState, finished: bool = True):
+    def _node(_state: BaseState) -> BaseState:
+        if not finished:
+            interrupt(None)
+        return state
+
+    graph = StateGraph(BaseState)
+    graph.add_node("node", _node)
+    graph.add_edge(START, "node")
+    await graph.compile(checkpointer=checkpointer).ainvoke({"issue_id": issue_id},
+                                                           {"configurable": {"thread_id": issue_id}})
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    templates_dir, results_dir = tmp_path / "templates", tmp_path / "results"
+    templates_dir.mkdir()
+    results_dir.mkdir()
+    _save_template(templates_dir / "claim.docx", "Прошу {{ request }}")
+    _save_template(templates_dir / "other.docx", "Другой {{ request }}")
+    return templates_dir, results_dir
+
+
+class TestResultsRerenderService:
+
+    @pytest.mark.asyncio
+    async def test_rerenders_finished_chats(self, dirs):
+        templates_dir, results_dir = dirs
+        checkpointer = InMemorySaver()
+        await _run_chat(checkpointer, 1, {"success": True, "relevant_template": CLAIM, "field_values": {"request": "выплатить"}})
+        await _run_chat(checkpointer, 2, {"success": True, "relevant_template": OTHER, "field_values": {"request": "вернуть"}})
+        await _run_chat(checkpointer, 3, {"relevant_template": CLAIM, "field_values": {"request": "x"}}, finished=False)
+
+        # исправили шаблон
+        _save_template(templates_dir / "claim.docx", "Настоящим прошу {{ request }}")
+        service = ResultsRerenderService(checkpointer,
+                                         FilesystemIssueResultStorageABC(results_dir),
+                                         FilesystemTemplatesStorage(templates_dir),
+                                         workers=2)
+        reports = []
+        progress = await service.rerender_async({"claim.docx"}, on_progress=reports.append)
+
+        assert (progress.total, progress.done, progress.failed_issue_ids) == (1, 1, [])
+        assert reports[-1] is progress
+        assert _read_text(results_dir / "1.docx") == "Настоящим прошу выплатить"
+        assert not (results_dir / "2.docx").exists()
+        assert not (results_dir / "3.docx").exists()
+        assert sorted(p.name for p in results_dir.iterdir()) == ["1.docx"]
+
+    @pytest.mark.asyncio
+    async def test_failed_document_keeps_old_file(self, dirs):
+        templates_dir, results_dir = dirs
+        checkpointer = InMemorySaver()
+        await _run_chat(checkpointer, 1, {"success": True, "relevant_template": CLAIM, "field_values": {"request": "a"}})
+        await _run_chat(checkpointer, 2, {"success": True, "relevant_template": OTHER, "field_values": {"request": "b"}})
+        (results_dir / "2.docx").write_bytes(b"old")
+        (templates_dir / "other.docx").unlink()
+
+        service = ResultsRerenderService(checkpointer,
+                                         FilesystemIssueResultStorageABC(results_dir),
+                                         FilesystemTemplatesStorage(templates_dir),
+                                         workers=1)
+        progress = await service.rerender_async()
+
+        assert (progress.total, progress.done, progress.failed_issue_ids) == (2, 1, [2])
+        assert (results_dir / "2.docx").read_bytes() == b"old"
+        assert _read_text(results_dir / "1.docx") == "Прошу a"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_batch_shuts_down_pool(self, dirs):
+        templates_dir, results_dir = dirs
+        checkpointer = InMemorySaver()
+        for issue_id in range(1, 31):
+            await _run_chat(checkpointer, issue_id, {"success": True, "relevant_template": CLAIM,
+                                                     "field_values": {"request": str(issue_id)}})
+
+        service = ResultsRerenderService(checkpointer,
+                                         FilesystemIssueResultStorageABC(results_dir),
+                                         FilesystemTemplatesStorage(templates_dir),
+                                         workers=1)
+        first_done = asyncio.Event()
+        batch = asyncio.create_task(service.rerender_async(on_progress=lambda _: first_done.set(), progress_every=1))
+        await first_done.wait()
+        batch.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await batch
+        # рендеры из очереди отменены, процессы пула завершены
+        assert len(list(results_dir.iterdir())) < 30
+        assert multiprocessing.active_children() == []
+
+
+def test_result_storage_write_is_atomic(tmp_path):
+    storage = FilesystemIssueResultStorageABC(tmp_path)
+    with storage.write_issue_result_file(1) as file:
+        file.write(b"first")
+
+    with pytest.raises(RuntimeError):
+        with storage.write_issue_result_file(1) as file:
+            file.write(b"partial")
+            raise RuntimeError()
+
+    with storage.read_issue_result_file(1) as file:
+        assert file.read() == b"first"
+    assert [p.name for p in tmp_path.iterdir()] == ["1.docx"]
@@ -0,0 +1,56 @@
+import datetime
+import uuid
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.core.users.types import ANONYMOUS_SSO_PROVIDER, UserInfo
+from src.storage.cache.ttl_cache import UserInfoCache
+from src.storage.sql.anonymous_users_cleanup import AnonymousUsersCleanup
+from src.storage.sql.base import Base
+from src.storage.sql.models import User, Issue
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+def _user(provider: str, age: datetime.timedelta) -> User:
+    user_id = uuid.uuid4()
+    return User(id=user_id, email=f"{user_id}@example.com", sso_provider=provider, sso_id=str(user_id),
+                created_at=datetime.datetime.now(datetime.UTC) - age)
+
+
+@pytest.mark.asyncio
+async def test_stale_anonymous_users_removed_in_batches(session_factory):
+    stale = [_user(ANONYMOUS_SSO_PROVIDER, datetime.timedelta(days=2)) for _ in range(5)]
+    fresh = _user(ANONYMOUS_SSO_PROVIDER, datetime.timedelta(minutes=5))
+    registered = _user("google", datetime.timedelta(days=30))
+    async with session_factory() as session:
+        session.add_all([*stale, fresh, registered])
+        await session.flush()
+        session.add(Issue(text="issue", user_id=stale[0].id))
+        await session.commit()
+
+    cache = UserInfoCache(max_entries=10, ttl=60)
+    cache.put(str(stale[0].id), UserInfo.anonymous(stale[0].id), cache.generation)
+    cleanup = AnonymousUsersCleanup(session_factory, cache, max_age=86400, batch_size=2)
+
+    assert await cleanup.cleanup_async() == 5
+    assert await cleanup.cleanup_async() == 0
+
+    async with session_factory() as session:
+        remaining = set((await session.execute(select(User.id))).scalars().all())
+        issue = (await session.execute(select(Issue))).scalar_one()
+    assert remaining == {fresh.id, registered.id}
+    # обращение не потеряло владельца
+    assert (issue.user_id, issue.anonymous_id) == (None, stale[0].id)
+    assert cache.get(str(stale[0].id)) is None
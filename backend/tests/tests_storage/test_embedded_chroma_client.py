@@ -0,0 +1,46 @@
+import threading
+
+import pytest
+
+from benchmarks.local_chroma import HashingEmbeddingFunction, LocalAsyncChromaClient
+from src.core.laws.types import LawFragment
+from src.storage.chroma.chroma_law_docs_repo import ChromaLawDocsRepository
+from src.storage.chroma.resilient_client import ResilientChromaClient, ChromaCallPolicy
+
+
+class TestEmbeddedChromaClient:
+
+    @pytest.mark.asyncio
+    async def test_persists_between_clients(self, tmp_path):
+        client = LocalAsyncChromaClient(HashingEmbeddingFunction(), path=str(tmp_path))
+        repo = ChromaLawDocsRepository(ResilientChromaClient(client, ChromaCallPolicy(read_retries=0)))
+        await repo.init_async()
+        await repo.add_of_update_fragment_async(LawFragment("tk_81", "tk", "Расторжение трудового договора по инициативе работодателя"))
+        await repo.add_of_update_fragment_async(LawFragment("tk_136", "tk", "Порядок, место и сроки выплаты заработной платы"))
+        client.close()
+
+        reopened = LocalAsyncChromaClient(HashingEmbeddingFunction(), path=str(tmp_path))
+        repo = ChromaLawDocsRepository(reopened)
+        await repo.init_async()
+        found = await repo.find_fragments_async("сроки выплаты заработной платы", n_results=1)
+        reopened.close()
+
+        assert [f.fragment_id for f in found] == ["tk_136"]
+
+    @pytest.mark.asyncio
+    async def test_calls_run_in_pool(self):
+        thread_names = []
+
+        class _RecordingEmbedding(HashingEmbeddingFunction):
+            def __call__(self, input):
+                thread_names.append(threading.current_thread().name)
+                return super().__call__(input)
+
+        client = LocalAsyncChromaClient(_RecordingEmbedding())
+        collection = await client.get_or_create_collection("test_embedded_pool")
+        await collection.upsert(ids=["a"], documents=["текст"])
+        await collection.query(query_texts=["текст"], n_results=1)
+        await client.delete_collection("test_embedded_pool")
+        client.close()
+
+        assert thread_names and all(name.startswith("chroma") for name in thread_names)
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.storage.cache.oauth_state_store import InMemoryOAuthStateStore
+from src.storage.oauth_state_sweeper import OAuthStateSweeper
+from src.storage.sql.base import Base
+from src.storage.sql.models import OAuthState
+from src.storage.sql.oauth_state_store import SQLOAuthStateStore
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_memory_state_consumed_once():
+    store = InMemoryOAuthStateStore(max_entries=10, ttl=600)
+    await store.add("state", 600)
+
+    assert await store.consume("state")
+    assert not await store.consume("state")
+    assert not await store.consume("unknown")
+
+
+@pytest.mark.asyncio
+async def test_memory_store_is_bounded_and_swept():
+    store = InMemoryOAuthStateStore(max_entries=3, ttl=600)
+    for i in range(5):
+        await store.add(f"state{i}", 600)
+    await store.add("short", 0.01)
+
+    assert len(store) == 3
+    # вытесняются самые старые
+    assert not await store.consume("state0")
+
+    await asyncio.sleep(0.02)
+    assert await store.sweep() == 1
+    assert len(store) == 2
+    assert await store.consume("state4")
+
+
+@pytest.mark.asyncio
+async def test_sql_state_shared_between_instances(session_factory):
+    worker1 = SQLOAuthStateStore(session_factory)
+    worker2 = SQLOAuthStateStore(session_factory)
+    await worker1.add("state", 600)
+
+    assert await worker2.consume("state")
+    assert not await worker1.consume("state")
+
+
+@pytest.mark.asyncio
+async def test_sql_expired_state_rejected_and_swept(session_factory):
+    store = SQLOAuthStateStore(session_factory)
+    await store.add("expired", -1)
+    await store.add("stale", -1)
+    await store.add("fresh", 600)
+
+    assert not await store.consume("expired")
+    assert await store.sweep() == 1
+
+    async with session_factory() as session:
+        assert (await session.execute(select(OAuthState.state))).scalars().all() == ["fresh"]
+
+
+@pytest.mark.asyncio
+async def test_sweeper_runs_in_background():
+    store = InMemoryOAuthStateStore(max_entries=10, ttl=600)
+    await store.add("short", 0.01)
+    sweeper = OAuthStateSweeper(store, interval=0.02)
+    sweeper.start()
+    try:
+        await asyncio.sleep(0.1)
+    finally:
+        await sweeper.stop_async()
+
+    assert len(store) == 0
@@ -0,0 +1,128 @@
+import asyncio
+import httpx
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.exceptions import ExternalServiceUnavailableException
+from src.storage.chroma.resilient_client import ResilientChromaClient, ChromaCallPolicy, CircuitBreaker
+
+
+def _make_client(collection, policy: ChromaCallPolicy | None = None, breaker: CircuitBreaker | None = None):
+    raw_client = MagicMock()
+    raw_client.get_or_create_collection = AsyncMock(return_value=collection)
+    policy = policy or ChromaCallPolicy(timeout=0.05, read_retries=2, backoff_base=0, backoff_max=0)
+    return ResilientChromaClient(raw_client, policy, breaker or CircuitBreaker(failure_threshold=100))
+
+
+class TestResilientChromaClient:
+
+    @pytest.mark.asyncio
+    async def test_read_is_retried_after_transient_error(self):
+        collection = MagicMock()
+        collection.name = "laws"
+        collection.query = AsyncMock(side_effect=[httpx.ConnectError("down"), {"ids": [["a"]]}])
+        client = _make_client(collection)
+
+        wrapped = await client.get_or_create_collection("laws")
+        assert await wrapped.query(query_texts=["q"], n_results=1) == {"ids": [["a"]]}
+
+        stats = client.metrics.snapshot()["laws.query"]
+        assert (stats["calls"], stats["errors"], stats["retries"]) == (2, 1, 1)
+
+    @pytest.mark.asyncio
+    async def test_write_is_not_retried(self):
+        collection = MagicMock()
+        collection.name = "laws"
+        collection.upsert = AsyncMock(side_effect=httpx.ConnectError("down"))
+        client = _make_client(collection)
+
+        wrapped = await client.get_or_create_collection("laws")
+        with pytest.raises(ExternalServiceUnavailableException):
+            await wrapped.upsert(ids=["a"], documents=["text"])
+        assert collection.upsert.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_deadline(self):
+        async def _slow_query(**kwargs):
+            await asyncio.sleep(1)
+
+        collection = MagicMock()
+        collection.name = "laws"
+        collection.query = _slow_query
+        client = _make_client(collection, ChromaCallPolicy(timeout=0.01, read_retries=0))
+
+        wrapped = await client.get_or_create_collection("laws")
+        with pytest.raises(ExternalServiceUnavailableException):
+            await wrapped.query(query_texts=["q"])
+        assert client.metrics.snapshot()["laws.query"]["timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_breaker_opens_and_recovers(self):
+        collection = MagicMock()
+        collection.name = "laws"
+        collection.get = AsyncMock(side_effect=httpx.ConnectError("down"))
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        client = _make_client(collection, ChromaCallPolicy(read_retries=0), breaker)
+        wrapped = await client.get_or_create_collection("laws")
+
+        for _ in range(2):
+            with pytest.raises(ExternalServiceUnavailableException):
+                await wrapped.get(ids=["a"])
+        assert breaker.state == CircuitBreaker.OPEN
+
+        # пока breaker открыт, Chroma не вызывается
+        with pytest.raises(ExternalServiceUnavailableException):
+            await wrapped.get(ids=["a"])
+        assert collection.get.await_count == 2
+
+        await asyncio.sleep(0.06)
+        collection.get = AsyncMock(return_value={"ids": ["a"]})
+        assert await wrapped.get(ids=["a"]) == {"ids": ["a"]}
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_cancelled_trial_call_releases_breaker(self):
+        collection = MagicMock()
+        collection.name = "laws"
+        collection.get = AsyncMock(side_effect=httpx.ConnectError("down"))
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        client = _make_client(collection, ChromaCallPolicy(read_retries=0), breaker)
+        wrapped = await client.get_or_create_collection("laws")
+
+        with pytest.raises(ExternalServiceUnavailableException):
+            await wrapped.get(ids=["a"])
+        await asyncio.sleep(0.06)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
+        # пробный вызов отменяется, например, из-за отключения клиента
+        started = asyncio.Event()
+
+        async def hang(**kwargs):
+            started.set()
+            await asyncio.sleep(10)
+
+        collection.get = AsyncMock(side_effect=hang)
+        trial = asyncio.create_task(wrapped.get(ids=["a"]))
+        await started.wait()
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
+        collection.get = AsyncMock(return_value={"ids": ["a"]})
+        assert await wrapped.get(ids=["a"]) == {"ids": ["a"]}
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_client_errors_do_not_open_breaker(self):
+        collection = MagicMock()
+        collection.name = "laws"
+        collection.get = AsyncMock(side_effect=ValueError("bad request"))
+        breaker = CircuitBreaker(failure_threshold=1)
+        client = _make_client(collection, breaker=breaker)
+        wrapped = await client.get_or_create_collection("laws")
+
+        with pytest.raises(ValueError):
+            await wrapped.get(ids=["a"])
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert collection.get.await_count == 1
@@ -0,0 +1,150 @@
+import asyncio
+import io
+import os
+import pickle
+import threading
+import urllib.request
+
+import boto3
+import docx
+import pytest
+
+from src.core.templates.content_service import TemplateContentService
+from src.core.templates.types import Template
+from src.storage.s3.s3_issue_result_storage import S3IssueResultStorage, MIN_PART_SIZE
+from src.storage.s3.s3_templates_storage import S3TemplatesStorage
+
+moto_server = pytest.importorskip("moto.server")
+
+
+BUCKET = "ailawyer"
+
+
+@pytest.fixture(scope="module")
+def endpoint_url():
+    # локальный S3-совместимый сервер, как MinIO
+    server = moto_server.ThreadedMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    yield f"http://{host}:{port}"
+    server.stop()
+
+
+@pytest.fixture
+def client(endpoint_url):
+    client = boto3.client("s3", endpoint_url=endpoint_url, region_name="us-east-1",
+                          aws_access_key_id="test", aws_secret_access_key="test")
+    client.create_bucket(Bucket=BUCKET)
+    yield client
+    for obj in client.list_objects_v2(Bucket=BUCKET).get("Contents", []):
+        client.delete_object(Bucket=BUCKET, Key=obj["Key"])
+    client.delete_bucket(Bucket=BUCKET)
+
+
+def _docx_bytes(text: str) -> bytes:
+    document = docx.Document()
+    document.add_paragraph(text)
+    output = io.BytesIO()
+    document.save(output)
+    return output.getvalue()
+
+
+class TestS3IssueResultStorage:
+
+    def test_small_and_multipart_writes(self, client):
+        storage = S3IssueResultStorage(client, BUCKET)
+        with storage.write_issue_result_file(1) as file:
+            file.write(b"small")
+        large = os.urandom(MIN_PART_SIZE * 2 + 123)
+        with storage.write_issue_result_file(2) as file:
+            for i in range(0, len(large), 1024 * 1024):
+                file.write(large[i:i + 1024 * 1024])
+
+        assert storage.read_issue_result_file(1).read() == b"small"
+        assert storage.read_issue_result_file(2).read() == large
+
+    def test_docx_render_streams_without_seek(self, client):
+        storage = S3IssueResultStorage(client, BUCKET)
+        with storage.write_issue_result_file(1) as file:
+            docx.Document(io.BytesIO(_docx_bytes("Прошу выплатить"))).save(file)
+
+        data = storage.read_issue_result_file(1).read()
+        assert docx.Document(io.BytesIO(data)).paragraphs[0].text == "Прошу выплатить"
+
+    def test_failed_write_keeps_previous_object(self, client):
+        storage = S3IssueResultStorage(client, BUCKET)
+        with storage.write_issue_result_file(1) as file:
+            file.write(b"first")
+
+        with pytest.raises(RuntimeError):
+            with storage.write_issue_result_file(1) as file:
+                file.write(os.urandom(MIN_PART_SIZE + 1))
+                raise RuntimeError()
+
+        assert storage.read_issue_result_file(1).read() == b"first"
+        assert client.list_multipart_uploads(Bucket=BUCKET).get("Uploads", []) == []
+
+    @pytest.mark.asyncio
+    async def test_async_write_completes_off_event_loop(self, client, monkeypatch):
+        loop_thread = threading.get_ident()
+        threads = []
+        for method in ("put_object", "abort_multipart_upload"):
+            original = getattr(client, method)
+
+            def _recording(*args, __original=original, **kwargs):
+                threads.append(threading.get_ident())
+                return __original(*args, **kwargs)
+            monkeypatch.setattr(client, method, _recording)
+
+        storage = S3IssueResultStorage(client, BUCKET)
+        async with storage.write_issue_result_file_async(1) as file:
+            file.write(b"content")
+        with pytest.raises(RuntimeError):
+            async with storage.write_issue_result_file_async(2) as file:
+                # часть уходит в S3 в пуле потоков, как при рендере через fill_with_values_async
+                await asyncio.to_thread(file.write, os.urandom(MIN_PART_SIZE + 1))
+                raise RuntimeError()
+
+        assert storage.read_issue_result_file(1).read() == b"content"
+        assert client.list_multipart_uploads(Bucket=BUCKET).get("Uploads", []) == []
+        # PutObject при выходе из контекста и отмена загрузки после ошибки
+        assert len(threads) == 2 and loop_thread not in threads
+
+    def test_presigned_url(self, client):
+        storage = S3IssueResultStorage(client, BUCKET)
+        with storage.write_issue_result_file(1) as file:
+            file.write(b"content")
+
+        with urllib.request.urlopen(storage.get_issue_result_download_url(1, "result.docx")) as response:
+            assert response.read() == b"content"
+            assert "result.docx" in response.headers["Content-Disposition"]
+
+        with pytest.raises(FileNotFoundError):
+            storage.get_issue_result_download_url(2, "result.docx")
+        with pytest.raises(FileNotFoundError):
+            storage.read_issue_result_file(2)
+
+
+class TestS3TemplatesStorage:
+
+    def test_read_through_cache(self, client, tmp_path):
+        client.put_object(Bucket=BUCKET, Key="templates/claim.docx", Body=_docx_bytes("Прошу {{ request }}"))
+        client.put_object(Bucket=BUCKET, Key="templates/notes.txt", Body=b"")
+        storage = S3TemplatesStorage(BUCKET, "templates/", tmp_path, info_ttl=0, client=client)
+        service = TemplateContentService(storage)
+        template = Template("claim", "claim", "claim.docx", {})
+
+        assert storage.list_template_files() == ["claim.docx"]
+        assert service.extract_text(template) == "Прошу {{ request }}"
+        assert (tmp_path / "claim.docx").exists()
+
+        client.put_object(Bucket=BUCKET, Key="templates/claim.docx", Body=_docx_bytes("Настоятельно прошу {{ request }}"))
+        assert service.extract_text(template) == "Настоятельно прошу {{ request }}"
+
+        with pytest.raises(FileNotFoundError):
+            storage.get_template_file_info("missing.docx")
+
+    def test_pickle_drops_client(self, client, tmp_path):
+        # так хранилище попадает в процессы пула рендеринга
+        storage = pickle.loads(pickle.dumps(S3TemplatesStorage(BUCKET, "templates/", tmp_path, client=client)))
+        assert isinstance(storage, S3TemplatesStorage)
@@ -0,0 +1,92 @@
+import pytest
+from unittest.mock import AsyncMock
+
+from src.core.laws.types import LawFragment
+from src.core.templates.types import Template
+from src.storage.cache.search_cache import VersionedSearchCache, normalize_query
+from src.storage.cache.cached_repositories import CachedLawDocsRepository, CachedTemplatesRepository
+
+
+class TestVersionedSearchCache:
+
+    def test_normalize_query(self):
+        assert normalize_query("  Задержка   ЗАРПЛАТЫ! ") == normalize_query("задержка зарплаты")
+        assert normalize_query("Ёлка") == "елка"
+
+    def test_bump_version_invalidates(self):
+        cache = VersionedSearchCache(max_entries=10)
+        cache.put("laws", cache.version("laws"), "q", ("result",))
+        assert cache.get("laws", "q") == ("result",)
+
+        cache.bump_version("laws")
+
+        assert cache.get("laws", "q") is None
+        assert len(cache) == 0
+        stats = cache.stats()["laws"]
+        assert (stats.hits, stats.misses, stats.invalidations) == (1, 1, 1)
+        assert stats.hit_rate == 0.5
+
+    def test_stale_put_is_ignored(self):
+        cache = VersionedSearchCache(max_entries=10)
+        version = cache.version("laws")
+        cache.bump_version("laws")
+        cache.put("laws", version, "q", ("stale",))
+        assert cache.get("laws", "q") is None
+
+    def test_lru_eviction(self):
+        cache = VersionedSearchCache(max_entries=2)
+        for key in ("a", "b"):
+            cache.put("laws", 0, key, (key,))
+        cache.get("laws", "a")
+        cache.put("laws", 0, "c", ("c",))
+
+        assert cache.get("laws", "b") is None
+        assert cache.get("laws", "a") == ("a",)
+        assert cache.get("laws", "c") == ("c",)
+
+
+class TestCachedRepositories:
+
+    @pytest.mark.asyncio
+    async def test_law_docs_repeat_query_hits_cache_until_write(self):
+        fragment = LawFragment("tk-136", "tk_rf", "Статья 136")
+        inner = AsyncMock()
+        inner.find_fragments_async = AsyncMock(return_value=[fragment])
+        repo = CachedLawDocsRepository(inner, VersionedSearchCache(max_entries=10), "laws")
+
+        assert await repo.find_fragments_async("Задержка зарплаты") == [fragment]
+        assert await repo.find_fragments_async("задержка  зарплаты?") == [fragment]
+        assert inner.find_fragments_async.await_count == 1
+
+        await repo.delete_fragment_async("tk-136")
+        await repo.find_fragments_async("задержка зарплаты")
+        assert inner.find_fragments_async.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_n_results_is_part_of_key(self):
+        inner = AsyncMock()
+        inner.find_fragments_async = AsyncMock(return_value=[])
+        repo = CachedLawDocsRepository(inner, VersionedSearchCache(max_entries=10), "laws")
+
+        await repo.find_fragments_async("запрос", 3)
+        await repo.find_fragments_async("запрос", 5)
+        await repo.find_fragments_async("запрос", 5)
+        assert inner.find_fragments_async.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_templates_returns_copies(self):
+        template = Template("tpl", "Шаблон", "tpl.docx", {})
+        inner = AsyncMock()
+        inner.get_template_async = AsyncMock(return_value=template)
+        repo = CachedTemplatesRepository(inner, VersionedSearchCache(max_entries=10), "templates")
+
+        await repo.get_template_async("tpl")
+        cached = await repo.get_template_async("tpl")
+        cached.title = "changed"
+
+        assert (await repo.get_template_async("tpl")).title == "Шаблон"
+        assert inner.get_template_async.await_count == 1
+
+        repo.invalidate()
+        await repo.get_template_async("tpl")
+        assert inner.get_template_async.await_count == 2
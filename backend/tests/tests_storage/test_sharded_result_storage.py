@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from src.application.provider import Provider
+from src.config import settings
+from src.core.results.iface import IssueResultFileStorageABC
+from src.storage.filesystem.fs_sharded_issue_result_storage import ShardedIssueResultStorage
+
+
+def _write(storage: ShardedIssueResultStorage, issue_id: int, data: bytes):
+    with storage.write_issue_result_file(issue_id) as file:
+        file.write(data)
+
+
+def _read(storage: ShardedIssueResultStorage, issue_id: int) -> bytes:
+    with storage.read_issue_result_file(issue_id) as file:
+        return file.read()
+
+
+def _blobs(path) -> list[str]:
+    return [name for _, _, names in os.walk(path / "blobs") for name in names]
+
+
+class TestShardedIssueResultStorage:
+
+    def test_deduplicates_identical_documents(self, tmp_path):
+        storage = ShardedIssueResultStorage(tmp_path)
+        _write(storage, 1, b"same")
+        _write(storage, 2, b"same")
+        _write(storage, 3, b"other")
+
+        assert (_read(storage, 1), _read(storage, 2), _read(storage, 3)) == (b"same", b"same", b"other")
+        assert len(_blobs(tmp_path)) == 2
+        assert os.listdir(tmp_path / "tmp") == []
+
+    def test_failed_write_keeps_previous_document(self, tmp_path):
+        storage = ShardedIssueResultStorage(tmp_path)
+        _write(storage, 1, b"first")
+
+        with pytest.raises(RuntimeError):
+            with storage.write_issue_result_file(1) as file:
+                file.write(b"partial")
+                raise RuntimeError()
+
+        assert _read(storage, 1) == b"first"
+        assert os.listdir(tmp_path / "tmp") == []
+
+    def test_missing_document(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            ShardedIssueResultStorage(tmp_path).read_issue_result_file(1)
+
+    def test_migrate_and_collect_garbage(self, tmp_path):
+        (tmp_path / "1.docx").write_bytes(b"legacy")
+        (tmp_path / "2.docx").write_bytes(b"legacy")
+        storage = ShardedIssueResultStorage(tmp_path)
+        assert _read(storage, 1) == b"legacy"
+
+        assert storage.migrate() == 2
+        assert not (tmp_path / "1.docx").exists()
+        assert (_read(storage, 1), _read(storage, 2)) == (b"legacy", b"legacy")
+        assert len(_blobs(tmp_path)) == 1
+
+        _write(storage, 1, b"new")
+        _write(storage, 2, b"new")
+        assert storage.collect_garbage(grace_seconds=3600) == 0
+        assert storage.collect_garbage(grace_seconds=-1) == 1
+        assert _blobs(tmp_path) and _read(storage, 1) == b"new"
+
+
+@pytest.mark.asyncio
+async def test_results_dir_required(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "RESULTS_STORAGE", "sharded")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("RESULTS_DIR", raising=False)
+
+    with pytest.raises(Exception, match="RESULTS_DIR"):
+        await ShardedIssueResultStorage.on_build_provider(Provider())
+    # в рабочей директории ничего не создано
+    assert list(tmp_path.iterdir()) == []
+
+    monkeypatch.setenv("RESULTS_DIR", str(tmp_path))
+    provider = Provider()
+    await ShardedIssueResultStorage.on_build_provider(provider)
+    assert isinstance(provider[IssueResultFileStorageABC], ShardedIssueResultStorage)
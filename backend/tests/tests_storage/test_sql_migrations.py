@@ -0,0 +1,69 @@
+import asyncio
+
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import inspect, pool, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.commands.migrate import migrate
+from src.storage.sql.base import Base
+
+
+def _run(url: str, fn):
+    async def _inner():
+        engine = create_async_engine(url, poolclass=pool.NullPool)
+        try:
+            async with engine.begin() as connection:
+                return await connection.run_sync(fn)
+        finally:
+            await engine.dispose()
+    return asyncio.run(_inner())
+
+
+def _index_names(connection, table: str) -> set[str]:
+    return {index["name"] for index in inspect(connection).get_indexes(table)}
+
+
+def test_migrations_match_models(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}"
+    migrate(url)
+
+    assert _run(url, lambda c: _index_names(c, "issues")) == {"ix_issues_user_id_created_at",
+                                                              "ix_issues_anonymous_id_created_at"}
+    assert _run(url, lambda c: _index_names(c, "users")) == {"ix_users_email", "uq_users_sso_provider_sso_id"}
+    assert _run(url, lambda c: _index_names(c, "oauth_states")) == {"ix_oauth_states_expires_at"}
+    # модели и миграции не разошлись: autogenerate не нашел бы изменений. Типы не сравниваются - у SQLite нет UUID
+    context_opts = {"compare_type": False}
+    assert _run(url, lambda c: compare_metadata(MigrationContext.configure(c, opts=context_opts), Base.metadata)) == []
+
+    migrate(url, "base", downgrade=True)
+    assert _run(url, lambda c: inspect(c).get_table_names()) == ["alembic_version"]
+
+
+def test_schema_created_before_migrations_is_stamped(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}"
+    # схема, как ее создавал create_all при старте, без таблицы версий
+    migrate(url, "0001")
+    _run(url, lambda c: c.execute(text("DROP TABLE alembic_version")))
+    _run(url, lambda c: c.execute(text("INSERT INTO users (id, email, sso_provider, sso_id) "
+                                       "VALUES ('u1', 'a@b.c', 'google', '1')")))
+
+    migrate(url)
+
+    assert "ix_issues_user_id_created_at" in _run(url, lambda c: _index_names(c, "issues"))
+    assert _run(url, lambda c: c.execute(text("SELECT count(*) FROM users")).scalar()) == 1
+
+
+def test_duplicate_sso_accounts_are_merged(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}"
+    migrate(url, "0003")
+    _run(url, lambda c: c.execute(text(
+        "INSERT INTO users (id, email, sso_provider, sso_id, created_at) VALUES "
+        "('first', 'a@b.c', 'google', '1', '2025-01-01'), ('second', 'a@b.c', 'google', '1', '2025-01-02'), "
+        "('other', 'd@b.c', 'google', '2', '2025-01-03')")))
+    _run(url, lambda c: c.execute(text("INSERT INTO issues (id, text, user_id) VALUES (1, 'issue', 'second')")))
+
+    migrate(url)
+
+    assert _run(url, lambda c: c.execute(text("SELECT id FROM users ORDER BY id")).scalars().all()) == ["first", "other"]
+    assert _run(url, lambda c: c.execute(text("SELECT user_id FROM issues")).scalar()) == "first"
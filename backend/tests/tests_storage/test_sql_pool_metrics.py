@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.storage.sql.pool_metrics import InstrumentedAsyncQueuePool
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_count_waits_and_timeouts(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}",
+                                 poolclass=InstrumentedAsyncQueuePool, pool_size=1, max_overflow=0,
+                                 pool_timeout=0.2, pool_pre_ping=True)
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            assert engine.pool.describe()["in_use"] == 1
+
+            # единственное соединение занято - второй запрос ждет и падает по таймауту
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+
+        async def _query():
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                await asyncio.sleep(0.05)
+
+        await asyncio.gather(_query(), _query())
+
+        stats = engine.pool.describe()
+        assert stats["checkouts"] == 3
+        assert stats["timeouts"] == 1
+        assert stats["waits"] == 2
+        assert stats["max_in_use"] == 1
+        assert stats["in_use"] == 0
+        assert stats["checkout_p99_ms"] >= 40
+    finally:
+        await engine.dispose()
@@ -0,0 +1,50 @@
+"""
+Проверка на настоящей паре Postgres: основная БД и реплика из tests/replica/docker-compose.yaml.
+Без TEST_DATABASE_URL и TEST_DATABASE_REPLICA_URL пропускается.
+"""
+
+import asyncio
+import os
+import uuid
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+
+from src.storage.sql.connection import create_engine, normalize_url
+
+
+PRIMARY_URL = os.getenv("TEST_DATABASE_URL")
+REPLICA_URL = os.getenv("TEST_DATABASE_REPLICA_URL")
+
+pytestmark = pytest.mark.skipif(not (PRIMARY_URL and REPLICA_URL), reason="TEST_DATABASE_URL and "
+                                                                         "TEST_DATABASE_REPLICA_URL are not set")
+
+
+@pytest.mark.asyncio
+async def test_replica_is_read_only_and_receives_writes():
+    primary = create_engine(normalize_url(PRIMARY_URL))
+    replica = create_engine(normalize_url(REPLICA_URL)).execution_options(isolation_level="AUTOCOMMIT")
+    marker = str(uuid.uuid4())
+    try:
+        async with primary.begin() as conn:
+            assert not await conn.scalar(text("SELECT pg_is_in_recovery()"))
+            await conn.execute(text("CREATE TABLE IF NOT EXISTS replica_routing_test (marker text)"))
+            await conn.execute(text("INSERT INTO replica_routing_test VALUES (:marker)"), {"marker": marker})
+
+        async with replica.connect() as conn:
+            assert await conn.scalar(text("SELECT pg_is_in_recovery()"))
+            for _ in range(50):
+                try:
+                    if await conn.scalar(text("SELECT count(*) FROM replica_routing_test WHERE marker = :marker"),
+                                         {"marker": marker}):
+                        break
+                except ProgrammingError:
+                    # таблица еще не дошла до реплики
+                    pass
+                await asyncio.sleep(0.1)
+            else:
+                pytest.fail("Write did not reach the replica")
+    finally:
+        await primary.dispose()
+        await replica.dispose()
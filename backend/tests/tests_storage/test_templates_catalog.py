@@ -0,0 +1,67 @@
+import pytest
+import pytest_asyncio
+
+from benchmarks.local_chroma import LocalAsyncChromaClient, HashingEmbeddingFunction
+from benchmarks.retrieval import load_templates_fixture, seed_chroma_templates_async
+from src.storage.chroma.chroma_templates_repo import ChromaTemplatesRepository
+from src.storage.chroma.chroma_templates_catalog import ChromaTemplatesCatalog
+
+
+@pytest_asyncio.fixture
+async def seeded_client():
+    embedding = HashingEmbeddingFunction()
+    client = LocalAsyncChromaClient(embedding)
+    templates, queries = load_templates_fixture()
+    await seed_chroma_templates_async(client, "test_templates_catalog", templates)
+    yield client, embedding, queries
+    await client.delete_collection("test_templates_catalog")
+
+
+class TestChromaTemplatesCatalog:
+
+    @pytest.mark.asyncio
+    async def test_ranking_matches_chroma(self, seeded_client):
+        client, embedding, queries = seeded_client
+        repo = ChromaTemplatesRepository(client)
+        repo._COLLECTION_NAME = "test_templates_catalog"
+        await repo.init_async()
+        catalog = ChromaTemplatesCatalog(client, "test_templates_catalog", embedding)
+        await catalog.init_async()
+
+        for query in queries:
+            expected = [t.id for t in await repo.find_templates_async(query.query)]
+            actual = [t.id for t in await catalog.find_templates_async(query.query)]
+            # у hashing векторайзера много равных расстояний в хвосте, порядок при равенстве не определен
+            assert actual[0] == expected[0]
+            assert len(actual) == len(expected)
+
+    @pytest.mark.asyncio
+    async def test_get_and_exclude(self, seeded_client):
+        client, embedding, _ = seeded_client
+        catalog = ChromaTemplatesCatalog(client, "test_templates_catalog", embedding)
+        await catalog.init_async()
+
+        free_template = await catalog.get_template_async("free_template")
+        assert free_template.fields["content"].agent_instructions == "Основной текст обращения"
+
+        found = await catalog.find_templates_async("обращение в свободной форме", exclude_ids=["free_template"], n_results=10)
+        assert "free_template" not in [t.id for t in found]
+        assert len(found) == 6
+
+        with pytest.raises(KeyError):
+            await catalog.get_template_async("missing")
+
+    @pytest.mark.asyncio
+    async def test_invalidate_reloads(self, seeded_client):
+        client, embedding, _ = seeded_client
+        catalog = ChromaTemplatesCatalog(client, "test_templates_catalog", embedding)
+        await catalog.init_async()
+
+        collection = await client.get_or_create_collection("test_templates_catalog")
+        await collection.delete(ids=["git_overtime"])
+        # без уведомления каталог отдает старый снимок
+        assert (await catalog.get_template_async("git_overtime")).id == "git_overtime"
+
+        catalog.invalidate()
+        with pytest.raises(KeyError):
+            await catalog.get_template_async("git_overtime")
@@ -0,0 +1,131 @@
+import json
+
+import docx
+import pytest
+import pytest_asyncio
+
+from benchmarks.local_chroma import HashingEmbeddingFunction, LocalAsyncChromaClient
+from src.storage.chroma.chroma_templates_ingestion import ingest_templates_async, TemplatesReloader
+from src.core.chats.types import ChatMessage
+from src.core.templates.types import TemplateFileChange
+from src.core.templates.content_service import TemplateContentService
+from src.core.templates.rendering_service import TemplateRenderingService
+from src.storage.chroma.chroma_templates_catalog import ChromaTemplatesCatalog
+from src.storage.chroma.chroma_templates_repo import ChromaTemplatesRepository
+from src.storage.filesystem.fs_templates_storage import FilesystemTemplatesStorage
+
+
+COLLECTION = "test_ingest_templates"
+
+
+def _write_docx(path, text: str):
+    document = docx.Document()
+    document.add_paragraph(text)
+    document.save(path)
+
+
+def _metadata(filename: str, fields: list[str]) -> dict:
+    return {
+        "type": "strict",
+        "title": filename,
+        "storage_filename": filename,
+        "fields": json.dumps([{"key": key, "agent_instructions": key} for key in fields]),
+    }
+
+
+@pytest_asyncio.fixture
+async def setup(tmp_path):
+    _write_docx(tmp_path / "valid.docx", "Прошу {{ request }} в срок до {{ date }}")
+    _write_docx(tmp_path / "undeclared.docx", "Работник {{ employee }} просит {{ request }}")
+    _write_docx(tmp_path / "orphan.docx", "Никем не используется")
+
+    client = LocalAsyncChromaClient(HashingEmbeddingFunction())
+    collection = await client.get_or_create_collection(COLLECTION)
+    await collection.upsert(
+        ids=["valid", "undeclared", "missing"],
+        documents=["valid", "undeclared", "missing"],
+        metadatas=[_metadata("valid.docx", ["request", "date", "unused"]),
+                   _metadata("undeclared.docx", ["request"]),
+                   _metadata("missing.docx", [])],
+    )
+
+    repository = ChromaTemplatesRepository(client)
+    repository._COLLECTION_NAME = COLLECTION
+    await repository.init_async()
+    yield repository, TemplateContentService(FilesystemTemplatesStorage(tmp_path)), client
+
+    await client.delete_collection(COLLECTION)
+    client.close()
+
+
+class TestIngestTemplates:
+
+    @pytest.mark.asyncio
+    async def test_validates_and_saves(self, setup):
+        repository, content_service, _ = setup
+        results, orphans = await ingest_templates_async(repository, content_service)
+        by_id = {r.template.id: r for r in results}
+
+        assert by_id["valid"].saved and not by_id["valid"].errors
+        assert by_id["valid"].warnings == ["field 'unused' is not used in the document"]
+        assert by_id["undeclared"].errors == ["placeholder 'employee' is not declared in fields"]
+        assert not by_id["undeclared"].saved
+        assert by_id["missing"].errors == ["template file not found"]
+        assert orphans == ["orphan.docx"]
+
+        valid = await repository.get_template_async("valid")
+        assert valid.text == "Прошу {{ request }} в срок до {{ date }}"
+        assert valid.content_hash == by_id["valid"].content.content_hash
+        assert (await repository.get_template_async("undeclared")).text is None
+
+    @pytest.mark.asyncio
+    async def test_unchanged_templates_are_skipped(self, setup):
+        repository, content_service, _ = setup
+        await ingest_templates_async(repository, content_service)
+        results, _ = await ingest_templates_async(repository, content_service)
+
+        assert not any(r.saved for r in results)
+
+    @pytest.mark.asyncio
+    async def test_prompt_text_does_not_open_docx(self, setup, tmp_path):
+        repository, content_service, _ = setup
+        await ingest_templates_async(repository, content_service)
+        (tmp_path / "valid.docx").unlink()
+
+        rendering_service = TemplateRenderingService(content_service)
+        text = await rendering_service.extract_text_async(await repository.get_template_async("valid"))
+        rendering_service.shutdown()
+
+        assert text == "Прошу {{ request }} в срок до {{ date }}"
+
+    @pytest.mark.asyncio
+    async def test_generates_digests_once(self, setup):
+        repository, content_service, _ = setup
+
+        class _DigestLLM:
+            calls = 0
+
+            async def invoke_async(self, messages, weak_model: bool = False, json_output: bool = False):
+                _DigestLLM.calls += 1
+                return ChatMessage.from_ai('{"addressee": "ГИТ", "purpose": "Жалоба"}')
+
+        await ingest_templates_async(repository, content_service, llm=_DigestLLM())
+        await ingest_templates_async(repository, content_service, llm=_DigestLLM())
+
+        # только для шаблона без ошибок и только в первый раз
+        assert _DigestLLM.calls == 1
+        digest = (await repository.get_template_async("valid")).digest
+        assert digest.startswith("Название: valid.docx\nАдресат: ГИТ\nНазначение: Жалоба")
+
+    @pytest.mark.asyncio
+    async def test_reloader_applies_changed_file(self, setup, tmp_path):
+        repository, content_service, client = setup
+        await ingest_templates_async(repository, content_service)
+        catalog = ChromaTemplatesCatalog(client, COLLECTION, HashingEmbeddingFunction())
+        await catalog.init_async()
+        reloader = TemplatesReloader(repository, content_service, catalog)
+
+        _write_docx(tmp_path / "valid.docx", "Прошу суд {{ request }} до {{ date }}")
+        await reloader.on_changes_async([TemplateFileChange("valid.docx")])
+
+        assert (await catalog.get_template_async("valid")).text == "Прошу суд {{ request }} до {{ date }}"
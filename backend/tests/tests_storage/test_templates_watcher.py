@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from src.core.templates.types import TemplateFileChange
+from src.storage.filesystem.fs_templates_watcher import FilesystemTemplatesWatcher
+
+
+async def _wait_for_changes(watcher: FilesystemTemplatesWatcher, action, timeout: float = 5) -> set[TemplateFileChange]:
+    received: set[TemplateFileChange] = set()
+    event = asyncio.Event()
+
+    async def _on_changes(changes):
+        received.update(changes)
+        event.set()
+
+    watcher.subscribe(_on_changes)
+    watcher.start()
+    try:
+        # даем наблюдателю сделать первый снимок / подписаться на inotify
+        await asyncio.sleep(0.3)
+        action()
+        await asyncio.wait_for(event.wait(), timeout)
+    finally:
+        await watcher.stop_async()
+    return received
+
+
+class TestFilesystemTemplatesWatcher:
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("mode", ["poll", "auto"])
+    async def test_reports_added_file(self, tmp_path, mode):
+        watcher = FilesystemTemplatesWatcher(tmp_path, mode, poll_interval=0.1)
+        received = await _wait_for_changes(watcher, lambda: (tmp_path / "claim.docx").write_bytes(b"docx"))
+
+        assert TemplateFileChange("claim.docx") in received
+
+    @pytest.mark.asyncio
+    async def test_polling_reports_modified_and_deleted(self, tmp_path):
+        (tmp_path / "claim.docx").write_bytes(b"docx")
+        (tmp_path / "old.docx").write_bytes(b"docx")
+        (tmp_path / "notes.txt").write_bytes(b"txt")
+
+        def _action():
+            (tmp_path / "claim.docx").write_bytes(b"new docx")
+            (tmp_path / "old.docx").unlink()
+            (tmp_path / "notes.txt").write_bytes(b"new txt")
+
+        watcher = FilesystemTemplatesWatcher(tmp_path, "poll", poll_interval=0.1)
+        received = await _wait_for_changes(watcher, _action)
+
+        assert received == {TemplateFileChange("claim.docx"), TemplateFileChange("old.docx", deleted=True)}
+
+    def test_unknown_mode(self, tmp_path):
+        with pytest.raises(ValueError):
+            FilesystemTemplatesWatcher(tmp_path, "fanotify")
@@ -0,0 +1,112 @@
+import uuid
+
+import pytest
+from unittest.mock import AsyncMock
+
+from src.core.users.types import UserInfo
+from src.storage.cache.cached_repositories import CachedUserRepository
+from src.storage.cache.ttl_cache import TTLCache, UserInfoCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_user() -> UserInfo:
+    return UserInfo(id=uuid.uuid4(), email="user@example.com", sso_provider="google", sso_id="1",
+                    first_name="Иван", last_name="Иванов", avatar_url="")
+
+
+class TestTTLCache:
+
+    def test_entry_expires(self):
+        clock = FakeClock()
+        cache = TTLCache(max_entries=10, ttl=60, clock=clock)
+        cache.put("a", 1, cache.generation)
+        clock.now = 59
+        assert cache.get("a") == 1
+
+        clock.now = 60
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_expires_in_shortens_ttl(self):
+        clock = FakeClock()
+        cache = TTLCache(max_entries=10, ttl=60, clock=clock)
+        cache.put("a", 1, cache.generation, expires_in=5)
+        clock.now = 5
+        assert cache.get("a") is None
+
+    def test_put_after_invalidation_is_ignored(self):
+        cache = TTLCache(max_entries=10, ttl=60)
+        generation = cache.generation
+        cache.invalidate("a")
+        cache.put("a", "stale", generation)
+        assert cache.get("a") is None
+
+    def test_lru_eviction(self):
+        cache = TTLCache(max_entries=2, ttl=60)
+        for key in ("a", "b"):
+            cache.put(key, key, cache.generation)
+        cache.get("a")
+        cache.put("c", "c", cache.generation)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "a"
+
+
+class TestCachedUserRepository:
+
+    @pytest.mark.asyncio
+    async def test_get_by_id_hits_source_once(self):
+        user = make_user()
+        inner = AsyncMock()
+        inner.get_by_id.return_value = user
+        repo = CachedUserRepository(inner, UserInfoCache(max_entries=10, ttl=60))
+
+        for _ in range(3):
+            assert await repo.get_by_id(str(user.id)) == user
+
+        inner.get_by_id.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_missing_user_is_not_cached(self):
+        inner = AsyncMock()
+        inner.get_by_id.return_value = None
+        repo = CachedUserRepository(inner, UserInfoCache(max_entries=10, ttl=60))
+
+        await repo.get_by_id("missing")
+        await repo.get_by_id("missing")
+
+        assert inner.get_by_id.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_write_invalidates_user(self):
+        user = make_user()
+        inner = AsyncMock()
+        inner.get_by_id.return_value = user
+        inner.get_or_create.return_value = user
+        cache = UserInfoCache(max_entries=10, ttl=60)
+        repo = CachedUserRepository(inner, cache)
+
+        await repo.get_by_id(str(user.id))
+        await repo.get_or_create(user)
+        await repo.get_by_id(str(user.id))
+
+        assert inner.get_by_id.await_count == 2
+        assert cache.stats.invalidations == 1
+
+    @pytest.mark.asyncio
+    async def test_cached_value_is_copied(self):
+        user = make_user()
+        inner = AsyncMock()
+        inner.get_by_id.return_value = user
+        repo = CachedUserRepository(inner, UserInfoCache(max_entries=10, ttl=60))
+
+        (await repo.get_by_id(str(user.id))).first_name = "Петр"
+
+        assert (await repo.get_by_id(str(user.id))).first_name == "Иван"
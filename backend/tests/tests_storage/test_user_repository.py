@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.core.users.types import UserSSOInfo
+from src.storage.sql.base import Base
+from src.storage.sql.models import User
+from src.storage.sql.user_repository import UserRepository
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+def _sso_info(first_name: str = "Иван") -> UserSSOInfo:
+    return UserSSOInfo(email="user@example.com", sso_provider="google", sso_id="42",
+                       first_name=first_name, last_name="Иванов", avatar_url="")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_logins_converge_on_one_row(session_factory):
+    async def _login():
+        async with session_factory() as session:
+            user = await UserRepository(session).get_or_create(_sso_info())
+            await session.commit()
+            return user.id
+
+    ids = await asyncio.gather(*(_login() for _ in range(10)))
+
+    assert len(set(ids)) == 1
+    async with session_factory() as session:
+        assert len((await session.execute(select(User))).scalars().all()) == 1
+
+
+@pytest.mark.asyncio
+async def test_repeated_login_updates_profile(session_factory):
+    async with session_factory() as session:
+        repo = UserRepository(session)
+        created = await repo.get_or_create(_sso_info())
+        updated = await repo.get_or_create(_sso_info(first_name="Пётр"))
+        await session.commit()
+
+    assert updated.id == created.id
+    assert updated.first_name == "Пётр"
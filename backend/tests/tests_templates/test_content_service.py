@@ -0,0 +1,84 @@
+import io
+import os
+
+import docx
+import pytest
+
+from src.core.templates.content_service import TemplateContentService
+from src.core.templates.types import Template
+from src.storage.filesystem.fs_templates_storage import FilesystemTemplatesStorage
+
+
+class _CountingStorage(FilesystemTemplatesStorage):
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.opened = 0
+
+    def open_template_file(self, filename: str):
+        self.opened += 1
+        return super().open_template_file(filename)
+
+
+def _write_template(path, text: str):
+    document = docx.Document()
+    document.add_paragraph(text)
+    document.save(path)
+
+
+def _template(filename: str) -> Template:
+    return Template(filename, filename, filename, {})
+
+
+def _render_text(service: TemplateContentService, template: Template, values: dict[str, str]) -> str:
+    output = io.BytesIO()
+    service.fill_with_values(template, values, output)
+    return docx.Document(io.BytesIO(output.getvalue())).paragraphs[0].text
+
+
+@pytest.fixture
+def storage(tmp_path):
+    _write_template(tmp_path / "claim.docx", "Прошу {{ request }}")
+    _write_template(tmp_path / "other.docx", "Другой шаблон")
+    return _CountingStorage(tmp_path)
+
+
+class TestTemplateContentService:
+
+    def test_parses_file_once(self, storage):
+        service = TemplateContentService(storage, cache_size=4)
+        template = _template("claim.docx")
+
+        assert service.extract_text(template) == "Прошу {{ request }}"
+        assert _render_text(service, template, {"request": "выплатить"}) == "Прошу выплатить"
+        assert _render_text(service, template, {"request": "восстановить"}) == "Прошу восстановить"
+        assert service.extract_text(template) == "Прошу {{ request }}"
+        assert storage.opened == 1
+
+    def test_reparses_changed_file(self, storage, tmp_path):
+        service = TemplateContentService(storage, cache_size=4)
+        template = _template("claim.docx")
+        service.extract_text(template)
+
+        _write_template(tmp_path / "claim.docx", "Прошу суд {{ request }}")
+        # mtime может не измениться при быстрой перезаписи, размер меняется всегда
+        os.utime(tmp_path / "claim.docx", ns=(0, 0))
+
+        assert service.extract_text(template) == "Прошу суд {{ request }}"
+        assert storage.opened == 2
+
+    def test_cache_is_bounded(self, storage):
+        service = TemplateContentService(storage, cache_size=1)
+        service.extract_text(_template("claim.docx"))
+        service.extract_text(_template("other.docx"))
+        service.extract_text(_template("claim.docx"))
+
+        assert storage.opened == 3
+
+    def test_disabled_cache(self, storage):
+        service = TemplateContentService(storage)
+        template = _template("claim.docx")
+        service.extract_text(template)
+        service.extract_text(template)
+
+        assert storage.opened == 2
@@ -0,0 +1,41 @@
+import io
+
+import docx
+import pytest
+
+from src.core.templates.content_service import TemplateContentService
+from src.core.templates.rendering_service import TemplateRenderingService
+from src.core.templates.types import Template
+from src.storage.filesystem.fs_templates_storage import FilesystemTemplatesStorage
+
+
+@pytest.fixture
+def content_service(tmp_path):
+    document = docx.Document()
+    document.add_paragraph("Прошу {{ request }}")
+    document.save(tmp_path / "claim.docx")
+    return TemplateContentService(FilesystemTemplatesStorage(tmp_path), cache_size=4)
+
+
+TEMPLATE = Template("claim", "claim", "claim.docx", {})
+
+
+class TestTemplateRenderingService:
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("executor_type", ["thread", "process"])
+    async def test_render_and_extract(self, content_service, executor_type):
+        service = TemplateRenderingService(content_service, executor_type, workers=2)
+        try:
+            output = io.BytesIO()
+            await service.fill_with_values_async(TEMPLATE, {"request": "выплатить"}, output)
+            texts = await service.extract_texts_async([TEMPLATE, TEMPLATE])
+        finally:
+            service.shutdown()
+
+        assert docx.Document(io.BytesIO(output.getvalue())).paragraphs[0].text == "Прошу выплатить"
+        assert texts == ["Прошу {{ request }}"] * 2
+
+    def test_unknown_executor(self, content_service):
+        with pytest.raises(ValueError):
+            TemplateRenderingService(content_service, "fiber")